@@ -0,0 +1,238 @@
+import itertools
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agents import Handoff, Model, ModelResponse, Tool, Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseCreatedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemAddedEvent,
+    ResponseOutputItemDoneEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+
+class ScriptError(Exception):
+    """The run asked for a turn that the script does not have or cannot play."""
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def request_size(
+    system_instructions: Optional[str],
+    input: Any,
+    tools: List[Tool],
+    handoffs: List[Handoff],
+) -> int:
+    """Bytes of the instructions, conversation and tool schemas of one model request."""
+    parts = [system_instructions or "", _encode(input)]
+    for tool in tools:
+        parts.append(
+            _encode(
+                [
+                    tool.name,
+                    getattr(tool, "description", ""),
+                    getattr(tool, "params_json_schema", None),
+                ]
+            )
+        )
+    for handoff in handoffs:
+        parts.append(
+            _encode(
+                [handoff.tool_name, handoff.tool_description, handoff.input_json_schema]
+            )
+        )
+    return sum(len(part.encode()) for part in parts)
+
+
+class ScriptedModel(Model):
+    """
+    Stand-in for the OpenAI model that replays a recorded sequence of turns, so
+    the agents and their tools run without network access. Each turn is one of:
+        - {"agent": key, "tool_calls": [{"name": tool, "arguments": {...}}, ...]}
+        - {"agent": key, "handoff": key of the agent to transfer to}
+        - {"agent": key, "message": final answer}
+    'agent' is the key (as in main.build_agents) of the agent expected to take
+    the turn; 'agent_names' maps those keys to the agent names.
+
+    The size of every request, as it would be sent to the API, is appended to
+    'prompt_bytes'. Both Runner.run() and Runner.run_streamed() are supported;
+    streamed messages are sent one word per text delta.
+    """
+
+    def __init__(self, agent_names: Dict[str, str]):
+        self.agent_names = agent_names
+        self.load([])
+
+    def load(self, turns: List[Dict[str, Any]], label: str = "script") -> None:
+        self.turns = turns
+        self.label = label
+        self.position = 0
+        self.prompt_bytes: List[int] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.position == len(self.turns)
+
+    def check_agent(self, agent_name: str) -> None:
+        """Fails when the agent about to call the model is not the scripted one."""
+        if self.finished:
+            raise ScriptError(
+                f"{self.label}: {agent_name!r} called after the last turn"
+            )
+        expected = self.turns[self.position]["agent"]
+        if self.agent_names[expected] != agent_name:
+            raise ScriptError(
+                f"{self.label}: turn {self.position + 1} expects {expected!r}, "
+                f"got {agent_name!r}"
+            )
+
+    def _call_id(self, index: int) -> str:
+        return f"call_{self.label}_{self.position}_{index}"
+
+    def _output(
+        self, turn: Dict[str, Any], tools: List[Tool], handoffs: List[Handoff]
+    ) -> List[Any]:
+        if "message" in turn:
+            return [
+                ResponseOutputMessage(
+                    id=f"msg_{self.label}_{self.position}",
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[
+                        ResponseOutputText(
+                            type="output_text", text=turn["message"], annotations=[]
+                        )
+                    ],
+                )
+            ]
+
+        if "handoff" in turn:
+            target = self.agent_names[turn["handoff"]]
+            handoff = next((h for h in handoffs if h.agent_name == target), None)
+            if handoff is None:
+                raise ScriptError(f"{self.label}: no handoff to {target!r}")
+            calls = [{"name": handoff.tool_name, "arguments": {}}]
+        else:
+            available = {tool.name for tool in tools}
+            calls = turn["tool_calls"]
+            for call in calls:
+                if call["name"] not in available:
+                    raise ScriptError(
+                        f"{self.label}: tool {call['name']!r} is not available "
+                        f"to {turn['agent']!r}"
+                    )
+
+        return [
+            ResponseFunctionToolCall(
+                id=f"fc_{self._call_id(index)}",
+                call_id=self._call_id(index),
+                type="function_call",
+                status="completed",
+                name=call["name"],
+                arguments=_encode(call.get("arguments", {})),
+            )
+            for index, call in enumerate(calls)
+        ]
+
+    def _play_turn(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        tools: List[Tool],
+        handoffs: List[Handoff],
+    ) -> List[Any]:
+        if self.finished:
+            raise ScriptError(f"{self.label}: the model was called after the last turn")
+        self.prompt_bytes.append(
+            request_size(system_instructions, input, tools, handoffs)
+        )
+        output = self._output(self.turns[self.position], tools, handoffs)
+        self.position += 1
+        return output
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        model_settings: Any,
+        tools: List[Tool],
+        output_schema: Any,
+        handoffs: List[Handoff],
+        tracing: Any,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        output = self._play_turn(system_instructions, input, tools, handoffs)
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+    async def stream_response(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        model_settings: Any,
+        tools: List[Tool],
+        output_schema: Any,
+        handoffs: List[Handoff],
+        tracing: Any,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        response_id = f"resp_{self.label}_{self.position}"
+        output = self._play_turn(system_instructions, input, tools, handoffs)
+        response = Response(
+            id=response_id,
+            created_at=0,
+            model="scripted",
+            object="response",
+            output=output,
+            parallel_tool_calls=True,
+            tool_choice="auto",
+            tools=[],
+            top_p=None,
+            status="completed",
+        )
+        sequence = itertools.count()
+
+        yield ResponseCreatedEvent(
+            type="response.created",
+            response=response.model_copy(
+                update={"output": [], "status": "in_progress"}
+            ),
+            sequence_number=next(sequence),
+        )
+        for index, item in enumerate(output):
+            yield ResponseOutputItemAddedEvent(
+                type="response.output_item.added",
+                item=item,
+                output_index=index,
+                sequence_number=next(sequence),
+            )
+            if isinstance(item, ResponseOutputMessage):
+                for word in re.findall(r"\S+\s*", item.content[0].text):
+                    yield ResponseTextDeltaEvent(
+                        type="response.output_text.delta",
+                        item_id=item.id,
+                        output_index=index,
+                        content_index=0,
+                        delta=word,
+                        logprobs=[],
+                        sequence_number=next(sequence),
+                    )
+            yield ResponseOutputItemDoneEvent(
+                type="response.output_item.done",
+                item=item,
+                output_index=index,
+                sequence_number=next(sequence),
+            )
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            response=response,
+            sequence_number=next(sequence),
+        )
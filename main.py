@@ -1,6 +1,10 @@
 import asyncio
+import logging
+from dataclasses import replace
+from functools import lru_cache
+from typing import Dict
 
-from agents import RunConfig, Runner
+from agents import Agent, Model, RunConfig, Runner
 from openai.types.responses import ResponseTextDeltaEvent
 
 from project.core.agents.adder import Adder_Agent
@@ -9,80 +13,111 @@ from project.core.agents.deleter import Deleter_Agent
 from project.core.agents.triage import Triage_Agent
 from project.core.agents.updater import Updater_Agent
 from project.core.agents_tools.database_tools import (
+    aggregate_records,
     database_tables_info,
     delete_a_data,
     find_records,
     find_records_with_complex_conditions,
+    find_related_records,
+    find_similar_values,
     get_tokens_count,
     insert_data,
+    sales_summary,
+    semantic_search,
     update_data,
 )
 from project.core.agents_tools.extra_tools import retrieve_date
-from project.core.ai_clients import gpt_4o_model_openai
+from project.core.ai_clients import get_gpt_4o_model
+from project.core.settings import get_settings
+from project.core.tool_metrics import tool_metrics
+from project.database.vector_index import vector_index
 
-triage_agent = Triage_Agent(
-    handoffs=[], tools=[retrieve_date], model=gpt_4o_model_openai
-)
 
-analyzer_agent = Analyzer_Agent(
-    handoffs=[],
-    tools=[
-        retrieve_date,
-        database_tables_info,
-        find_records,
-        find_records_with_complex_conditions,
-        get_tokens_count,
-    ],
-    model=gpt_4o_model_openai,
-)
+def build_agents(model: Model) -> Dict[str, Agent]:
+    """Builds the agents, all running on 'model', and their handoffs."""
+    triage_agent = Triage_Agent(handoffs=[], tools=[retrieve_date], model=model)
 
-adder_agent = Adder_Agent(
-    handoffs=[],
-    tools=[
-        retrieve_date,
-        database_tables_info,
-        insert_data,
-    ],
-    model=gpt_4o_model_openai,
-)
+    analyzer_agent = Analyzer_Agent(
+        handoffs=[],
+        tools=[
+            retrieve_date,
+            database_tables_info,
+            find_records,
+            find_records_with_complex_conditions,
+            find_related_records,
+            find_similar_values,
+            semantic_search,
+            aggregate_records,
+            sales_summary,
+            get_tokens_count,
+        ],
+        model=model,
+    )
 
-deleter_agent = Deleter_Agent(
-    handoffs=[],
-    tools=[
-        retrieve_date,
-        database_tables_info,
-        find_records,
-        find_records_with_complex_conditions,
-        delete_a_data,
-    ],
-    model=gpt_4o_model_openai,
-)
+    adder_agent = Adder_Agent(
+        handoffs=[],
+        tools=[
+            retrieve_date,
+            database_tables_info,
+            insert_data,
+        ],
+        model=model,
+    )
 
-updater_agent = Updater_Agent(
-    handoffs=[],
-    tools=[
-        retrieve_date,
-        database_tables_info,
-        update_data,
-        find_records,
-        find_records_with_complex_conditions,
-    ],
-    model=gpt_4o_model_openai,
-)
+    deleter_agent = Deleter_Agent(
+        handoffs=[],
+        tools=[
+            retrieve_date,
+            database_tables_info,
+            find_records,
+            find_records_with_complex_conditions,
+            delete_a_data,
+        ],
+        model=model,
+    )
+
+    updater_agent = Updater_Agent(
+        handoffs=[],
+        tools=[
+            retrieve_date,
+            database_tables_info,
+            update_data,
+            find_records,
+            find_records_with_complex_conditions,
+        ],
+        model=model,
+    )
+
+    triage_agent.handoffs = [analyzer_agent, adder_agent, deleter_agent, updater_agent]
+    analyzer_agent.handoffs = [triage_agent, adder_agent, deleter_agent, updater_agent]
+    adder_agent.handoffs = [triage_agent, analyzer_agent, deleter_agent, updater_agent]
+    deleter_agent.handoffs = [triage_agent, analyzer_agent, adder_agent, updater_agent]
+    updater_agent.handoffs = [triage_agent, analyzer_agent, adder_agent, deleter_agent]
+
+    return {
+        "triage": triage_agent,
+        "analyzer": analyzer_agent,
+        "adder": adder_agent,
+        "deleter": deleter_agent,
+        "updater": updater_agent,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_agents() -> Dict[str, Agent]:
+    """Builds the agents on gpt-4o on first use, not at import."""
+    return build_agents(get_gpt_4o_model())
 
-triage_agent.handoffs = [analyzer_agent, adder_agent, deleter_agent, updater_agent]
-analyzer_agent.handoffs = [triage_agent, adder_agent, deleter_agent, updater_agent]
-adder_agent.handoffs = [triage_agent, analyzer_agent, deleter_agent, updater_agent]
-deleter_agent.handoffs = [triage_agent, analyzer_agent, adder_agent, updater_agent]
-updater_agent.handoffs = [triage_agent, analyzer_agent, adder_agent, deleter_agent]
 
 config = RunConfig(tracing_disabled=True)
 
 
-async def call_streaming():
+async def call_streaming(conversation_id: str = "demo"):
     result = Runner.run_streamed(
-        analyzer_agent,
+        get_agents()["analyzer"],
         input="Hay alguna venta que haya hecho el empleado Carlos Lara?el 2 de enero del 2025.",
+        # The group_id labels the tool metrics of the conversation
+        run_config=replace(config, group_id=conversation_id),
     )
     async for event in result.stream_events():
         if event.type == "raw_response_event" and isinstance(
@@ -91,4 +126,32 @@ async def call_streaming():
             print(event.data.delta, end="", flush=True)
 
 
-print(asyncio.run(call_streaming()))
+def configure_logging() -> None:
+    """Sends the application logs, among them one JSON line per tool call, to stderr."""
+    logging.basicConfig(
+        level=get_settings().LOG_LEVEL,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+
+
+async def shutdown() -> None:
+    """
+    Saves what is only kept in memory: the last changes to the vector index and,
+    when METRICS_FILE is set, the tool metrics.
+    """
+    await vector_index.flush()
+    metrics_file = get_settings().METRICS_FILE
+    if metrics_file:
+        tool_metrics.write_prometheus(metrics_file)
+
+
+async def main() -> None:
+    configure_logging()
+    try:
+        await call_streaming()
+    finally:
+        await shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -66,6 +66,7 @@ class Adder_Agent(Agent):
     </PROCESS_2>
     <PROCESS_3>Verify all required fields (non-nullable fields in the table definition) are present in the `params` dictionary before calling the function.</PROCESS_3>
     <PROCESS_4>Call 'insert_data' ONLY after receiving explicit confirmation from the user on the data shown in PROCESS_2.</PROCESS_4>
+    <PROCESS_5>To add several records at once, pass a list of dictionaries as `params` in a single call. To add a record with its children (e.g. a sale with its lines), nest the children under the relationship name, e.g. "params": {"fecha": "...", "cliente_id": "...", "empleado_id": "...", "monto": 100, "detalles": [{"insumo_id": "...", "cantidad": 2, "precio": 50}]}; their link to the parent is filled in automatically. Never make one call per record.</PROCESS_5>
     </INSERTION_PROCESS>
 
     <REQUEST_ROUTING>
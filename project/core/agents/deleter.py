@@ -47,7 +47,7 @@ class Deleter_Agent(Agent):
 
     <SEARCH_HANDLING>
     <SIMPLE_SEARCH>Use 'find_records' for equality-based criteria.</SIMPLE_SEARCH>
-    <COMPLEX_SEARCH>Use 'find_records_with_complex_conditions' for operators like eq, neq, gt, gte, lt, lte, like, starts_with, ends_with.
+    <COMPLEX_SEARCH>Use 'find_records_with_complex_conditions' for operators like eq, neq, gt, gte, lt, lte, between ([start, end] values, dates as YYYY-MM-DD), like, starts_with, ends_with.
        - Example: {"model_name": "producto", "conditions": [{"field": "precio", "operator": "gt", "value": 100}]}
        - If complex search yields no results, inform the user. You may ask if they want to try different criteria or be transferred to the Analyzer Agent for broader analysis (mentioning potential full database load).
     </COMPLEX_SEARCH>
@@ -66,6 +66,7 @@ class Deleter_Agent(Agent):
     <DATABASE_INFO>Use `database_tables_info` to validate tables and get field names.</DATABASE_INFO>
     <RECORD_FINDING>Use `find_records` for simple searches.</RECORD_FINDING>
     <COMPLEX_RECORD_FINDING>Use `find_records_with_complex_conditions` for advanced searches.</COMPLEX_RECORD_FINDING>
+    <PAGINATION>Search results come in pages: if 'next_cursor' is not null, pass it as 'cursor' to see the remaining matches.</PAGINATION>
     <DELETE_DATA>Use `delete_a_data` to delete a specific record *after* user confirmation.</DELETE_DATA>
     <DATE_RETRIEVAL>If month, year, date or date information is required to process the request, use the `retrieve_date` function to retrieve it.</DATE_RETRIEVAL>
     </TOOL_USAGE>
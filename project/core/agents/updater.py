@@ -91,6 +91,7 @@ class Updater_Agent(Agent):
     <DATABASE_INFO>Use `database_tables_info` to validate tables, get field names, types, and constraints.</DATABASE_INFO>
     <RECORD_FINDING>Use `find_records` for simple searches to locate the record to update.</RECORD_FINDING>
     <COMPLEX_RECORD_FINDING>Use `find_records_with_complex_conditions` for advanced searches to locate the record.</COMPLEX_RECORD_FINDING>
+    <PAGINATION>Search results come in pages: if 'next_cursor' is not null, pass it as 'cursor' to see the remaining matches.</PAGINATION>
     <UPDATE_DATA>Use `update_data` to apply changes to a specific record *after* user confirmation and validation.</UPDATE_DATA>
     <DATE_RETRIEVAL>If month, year, date or date information is required to process the request, use the `retrieve_date` function to retrieve it.</DATE_RETRIEVAL>
     </TOOL_USAGE>
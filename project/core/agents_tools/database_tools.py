@@ -1,90 +1,376 @@
 import json
-from typing import Any, Dict, List, Union
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple, Union
 from uuid import UUID
 
 from agents import function_tool
-from sqlalchemy import func
+from sqlalchemy import (
+    and_,
+    any_,
+    bindparam,
+    delete,
+    desc,
+    func,
+    insert,
+    inspect,
+    union_all,
+    update,
+)
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import Session, select
+from sqlalchemy.orm import RelationshipDirection, aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from project.core.tool_metrics import instrument
+from project.database.columnar import RESULT_FORMATS, records_to_columnar
+from project.database.config import get_async_engine
+from project.database.events import notify_table_write
+from project.database.exporter import DEFAULT_MAX_BYTES, SnapshotExporter
+from project.database.fuzzy_index import DEFAULT_MATCHES, MAX_MATCHES, fuzzy_index
+from project.database.model_registry import MODEL_NAMES, MODEL_REGISTRY
+from project.database.pagination import (
+    decode_cursor,
+    encode_cursor,
+    estimate_row_count,
+    page_size,
+)
+from project.database.query_builder import (
+    MODEL_META,
+    ModelMeta,
+    Shape,
+    condition_clauses,
+    filtered_statement,
+    get_model_meta,
+    page_statement,
+    prepare_conditions,
+    projection,
+)
+from project.database.result_cache import MISSING, make_cache_key, result_cache
+from project.database.rollups import (
+    ROLLUPS,
+    ensure_rollups_fresh,
+    lock_rollups,
+    mark_rollups_stale,
+    refresh_changed,
+    refresh_rollups,
+    rollups_fed_by,
+    track_changes,
+)
+from project.database.schema import encode_schema, table_names
+from project.database.token_stats import token_estimator
+from project.database.vector_index import SEMANTIC_FIELDS, vector_index
+from project.utils.utils import normalized_sql, parse_date
+
+AGGREGATE_FUNCTIONS = {
+    "count": func.count,
+    "sum": func.sum,
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max,
+}
+
+SALES_PERIODS = ("day", "month", "total")
+
+# Fields of the keyed model returned next to the totals of each rollup report
+ROLLUP_LABELS = {
+    "empleado": ("nombre", "apellido_paterno", "tipo"),
+    "cliente": ("nombre",),
+    "insumo": ("descripcion", "presentacion"),
+}
+
+
+def _equality_filters(model_meta: ModelMeta, criteria: Dict[str, Any]) -> List[Any]:
+    """
+    Compiles exact-match criteria into WHERE clauses for bulk statements, with
+    their values bound. They are 'eq' conditions, normalized and coerced as in
+    find_records_with_complex_conditions.
+
+    Raises:
+        ValueError: If a field does not exist in the model or a value is invalid.
+    """
+    for field in criteria:
+        if field not in model_meta.fields:
+            raise ValueError(
+                f"Field '{field}' does not exist in the model '{model_meta.name}'."
+            )
+    shape, params = prepare_conditions(
+        model_meta,
+        [
+            {"field": field, "operator": "eq", "value": value}
+            for field, value in criteria.items()
+        ],
+    )
+    return condition_clauses(model_meta, shape, params=params)
+
 
-from project.core.ai_clients import anthropic_client
-from project.database.config import engine
-from project.database.model_registry import MODEL_REGISTRY
-from project.utils.utils import normalize_text
+def _to_json_value(value: Any) -> Any:
+    """Converts UUIDs, dates and Decimals into JSON-friendly values."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
 
 
+def _result_format(data: Dict[str, Any]) -> str:
+    result_format = str(data.get("format") or "records").lower()
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(
+            f"Invalid format '{result_format}'. Available: {', '.join(RESULT_FORMATS)}"
+        )
+    return result_format
+
+
+def _format_result(result: Dict[str, Any], result_format: str) -> Dict[str, Any]:
+    """
+    Returns a finder result tagged with its "format": as is for "records", or
+    with its 'records' replaced by the to_columnar() table for "columnar". Both
+    formats are dicts, so callers and the result size accounting treat them alike.
+    """
+    if result_format == "records":
+        return {"format": result_format, **result}
+    return {
+        "format": result_format,
+        **records_to_columnar(result["records"]),
+        **{key: value for key, value in result.items() if key != "records"},
+    }
+
+
+def _requires_orm_delete(model_class: Any) -> bool:
+    """
+    Returns True when a relationship of the model cascades deletes to its children.
+    Those cascades are applied by the ORM unit of work, not by a bulk DELETE.
+    """
+    return any(
+        relationship.cascade.delete
+        for relationship in inspect(model_class).relationships
+    )
+
+
+def _versioned_update(
+    model_class: Any, filters: List[Any], new_values: Dict[str, Any], columns: List[str]
+) -> Any:
+    """
+    An UPDATE returning, for each updated row, the values of 'columns' before
+    (labeled old_<column>) and after it. The old values come from a FOR UPDATE
+    subquery joined on the id, which locks the rows before they are read.
+    """
+    table = model_class.__table__
+    old = (
+        select(*[table.c[name] for name in columns])
+        .where(*filters)
+        .with_for_update()
+        .subquery("old")
+    )
+    return (
+        update(model_class)
+        .where(table.c.id == old.c.id)
+        .values(**new_values)
+        .execution_options(synchronize_session=False)
+        .returning(
+            *[old.c[name].label(f"old_{name}") for name in columns],
+            *[table.c[name] for name in columns],
+        )
+    )
+
+
+def _record_to_dict(record: Any, fields_info: Dict[str, Dict]) -> Dict[str, Any]:
+    """Converts a model instance into a JSON-friendly dict of its registry fields."""
+    if hasattr(record, "to_dict"):
+        return record.to_dict()
+
+    record_dict = {}
+    for field_name in fields_info.keys():
+        if hasattr(record, field_name):
+            # Convert UUIDs and dates to strings for JSON serialization
+            record_dict[field_name] = _to_json_value(getattr(record, field_name))
+    return record_dict
+
+
+async def _fetch_page(
+    session: AsyncSession,
+    model_meta: ModelMeta,
+    shape: Shape,
+    params: Dict[str, Any],
+    size: int,
+    after_id: Optional[UUID],
+    fields: Tuple[str, ...],
+) -> Dict[str, Any]:
+    """
+    Streams one keyset page (ordered by primary key) of the cached statement for
+    the filter shape through a server-side cursor, so only the rows of the
+    requested page are held in memory. Records only hold the given fields.
+    """
+    total_estimate = await estimate_row_count(
+        session, filtered_statement(model_meta, shape), params
+    )
+
+    page_params = {**params, "limit": size + 1}
+    if after_id is not None:
+        page_params["after"] = after_id
+
+    records = []
+    last_id = None
+    has_more = False
+    result = await session.stream(
+        page_statement(model_meta, shape, after_id is not None, fields),
+        page_params,
+        execution_options={"yield_per": size + 1},
+    )
+    async for row in result.mappings():
+        if len(records) == size:
+            has_more = True
+            continue
+        # Convert UUIDs and dates to strings for JSON serialization
+        records.append({field: _to_json_value(row[field]) for field in fields})
+        last_id = row["id"]
+
+    return {
+        "records": records,
+        "next_cursor": encode_cursor(last_id) if has_more else None,
+        "total_estimate": total_estimate,
+    }
+
+
+@instrument
 @function_tool(strict_mode=False)
-def database_tables_info() -> dict[str, dict[str, Any]]:
+async def database_tables_info(
+    tables: Optional[List[str]] = None, include_row_counts: bool = False
+) -> str:
     """Use this function to retrieve the user's database information.
     Returns the database's tables to personalize assistance.
+
+    Args:
+        tables: Names of the tables to describe. All tables when omitted.
+        include_row_counts: Adds "rows", the estimated number of records of each table.
+
+    Returns:
+        str: A JSON object of table name -> {"fields": field -> type ("?" marks an
+            optional field), "fk": field -> referenced table, "rel": relationship
+            -> related table ("[]" when it holds several records)}, or an error message.
     """
-    return MODEL_REGISTRY
+    try:
+        row_counts = None
+        if include_row_counts:
+            names = table_names(tables)
+            async with AsyncSession(get_async_engine()) as session:
+                row_counts = {
+                    name: (await token_estimator.table_stats(session, name))[0]
+                    for name in names
+                }
+        return encode_schema(tables, row_counts)
+
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except SQLAlchemyError as e:
+        return f"An error occurred while accessing the database: {str(e)}"
 
 
-def get_full_database() -> Union[Dict[str, List[Dict]], str]:
+async def get_full_database(
+    output_format: Literal["ndjson", "columnar"] = "ndjson",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> str:
     """
-    Retrieves all records from all tables in the database.
+    Exports all records from all tables in the database as a compact snapshot.
+    Tables are streamed and encoded chunk by chunk, so at most 'max_bytes' of
+    encoded data is ever held in memory.
+
+    Args:
+        output_format: "ndjson" (one record per line) or "columnar" (one chunk of
+            rows per line, with the field names written once per chunk and
+            repeated values dictionary-encoded).
+        max_bytes: Size budget of the snapshot.
 
     Returns:
-        Union[Dict[str, List[Dict]], str]: If data is found, returns a dictionary where:
-            - keys are the model names (table names)
-            - values are lists of dictionaries containing the records for each table
+        str: The snapshot, one JSON document per line, ending with a
+            {"truncated": true, ...} line when the budget cut it short.
         If no data is found in any table, returns the string "No data found in the database."
         Handles database errors gracefully by returning an error message.
     """
-    try:
-        with Session(engine) as session:
-            all_data = {}
+    cache_key = make_cache_key("get_full_database", output_format, max_bytes)
+    snapshot = result_cache.get(cache_key)
+    if snapshot is not MISSING:
+        return snapshot
+    generation = result_cache.generation(MODEL_REGISTRY)
 
-            for model_name, model_info in MODEL_REGISTRY.items():
-                model_class = model_info["model"]
-                fields = model_info["fields"]
+    exporter = SnapshotExporter(output_format=output_format, max_bytes=max_bytes)
+    try:
+        async with AsyncSession(get_async_engine()) as session:
+            chunks = [chunk async for chunk in exporter.chunks(session)]
 
-                records = session.exec(select(model_class)).all()
+    except SQLAlchemyError as e:
+        return f"An error occurred while accessing the database: {str(e)}"
 
-                records_json = []
-                if records:
-                    for record in records:
-                        record_dict = {}
-                        for field_name in fields.keys():
-                            record_dict[field_name] = getattr(record, field_name)
-                        records_json.append(record_dict)
+    if not chunks:
+        return "No data found in the database."
+
+    if exporter.truncated:
+        chunks.append(
+            json.dumps(
+                {
+                    "truncated": True,
+                    "rows_exported": exporter.rows_written,
+                    "bytes_exported": exporter.bytes_written,
+                }
+            )
+        )
+    snapshot = "\n".join(chunks)
+    result_cache.set(cache_key, MODEL_REGISTRY.keys(), snapshot, generation)
+    return snapshot
 
-                all_data[model_name] = records_json
 
-            if not any(all_data.values()):
-                return "No data found in the database."
+@instrument
+@function_tool(strict_mode=False)
+async def get_tokens_count() -> Union[Dict[str, Any], str]:
+    """
+    Estimates the tokens needed to load the full database, without reading it.
+    Uses cached per-table row counts and average row sizes.
 
-            return all_data
+    Returns:
+        Union[Dict[str, Any], str]: {"tokens": estimated tokens of the whole
+            database, "budget_tokens": the most get_full_database loads,
+            "exceeds_budget": true when the full database would be truncated},
+            or an error message.
+    """
+    try:
+        async with AsyncSession(get_async_engine()) as session:
+            estimate = await token_estimator.estimate(session)
+        return {
+            key: estimate[key] for key in ("tokens", "budget_tokens", "exceeds_budget")
+        }
 
     except SQLAlchemyError as e:
         return f"An error occurred while accessing the database: {str(e)}"
 
 
+@instrument
 @function_tool(strict_mode=False)
-async def get_tokens_count() -> Union[List[Dict], str]:
-    data = get_full_database()
-    response = await anthropic_client.messages.count_tokens(
-        model="claude-3-7-sonnet-20250219",
-        messages=[{"role": "user", "content": f"{data}"}],
-    )
-    return response.model_dump().get("input_tokens")
-
-
-@function_tool(strict_mode=False)
-def find_records(data: Any) -> Union[List[Dict], str]:
+async def find_records(data: Any) -> Union[Dict[str, Any], str]:
     """
     Searches for records in the database based on the provided model and criteria.
     Supports mass operations by allowing empty or partial criteria.
+    Results are paginated: pass the returned 'next_cursor' back to get the next page.
 
     Args:
         data: Can be either:
-            - A dictionary with 'model_name' and 'criteria' keys
+            - A dictionary with 'model_name' and 'criteria' keys, and optionally
+              'fields' (the fields to return, all by default), 'limit' (page
+              size, default 50, max 500), 'cursor' and 'format' ("records" or
+              "columnar")
             - A JSON string containing those keys
             - A dictionary with a 'data' key containing either of the above
 
     Returns:
-        Union[List[Dict], str]: A list of dictionaries representing matching records, or an error message.
+        Union[Dict[str, Any], str]: A page with 'format', 'records' (list of
+            dictionaries), 'next_cursor' (None on the last page) and
+            'total_estimate' (approximate number of matching records), or an error
+            message. With the "columnar" format, 'records' is replaced by
+            'columns', 'rows' and 'dictionaries'.
     """
     try:
         # Parsing input data
@@ -103,78 +389,64 @@ def find_records(data: Any) -> Union[List[Dict], str]:
         if not model_name:
             return "Error: 'model_name' key is required in the input."
 
-        model_info = MODEL_REGISTRY.get(model_name.lower())
-        if not model_info:
+        model_meta = get_model_meta(model_name)
+        if not model_meta:
             available_models = ", ".join(MODEL_REGISTRY.keys())
             return f"Error: Model not found. Available models: {available_models}"
 
-        model_class = model_info["model"]
-        fields_info = model_info["fields"]
-
-        # Validate and convert criteria fields (if any provided)
-        for field, value in criteria.items():
-            if field not in fields_info:
+        try:
+            fields = projection(model_meta, data.get("fields"))
+            size = page_size(data.get("limit"))
+            after_id = decode_cursor(data.get("cursor"))
+            result_format = _result_format(data)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        for field in criteria:
+            if field not in model_meta.fields:
                 return f"Error: Field '{field}' does not exist in the model '{model_name}'."
 
-            field_type = fields_info[field]["type"]
-            try:
-                # Convert UUID strings to UUID objects
-                if field_type == "UUID" and isinstance(value, str):
-                    criteria[field] = UUID(value)
-                # Handle optional fields
-                elif field_type.startswith("Optional[") and value is not None:
-                    inner_type = field_type[9:-1]  # Extract type from Optional[type]
-                    if inner_type == "str":
-                        criteria[field] = normalize_text(str(value))
-                    # Add more type conversions as needed
-                elif field_type == "str" and value is not None:
-                    criteria[field] = normalize_text(str(value))
-            except ValueError as e:
-                return f"Error: Invalid value for field '{field}': {str(e)}"
-
-        with Session(engine) as session:
-            query = select(model_class)
-
-            # Apply filters only if criteria is provided
-            for field, value in criteria.items():
-                field_info = fields_info[field]
-
-                # Handle string searches with LIKE
-                if field_info["type"] == "str" and isinstance(value, str):
-                    query = query.where(
-                        func.lower(getattr(model_class, field)).like(f"%{value}%")
-                    )
-                # Handle foreign key relationships
-                elif "foreign_key" in field_info:
-                    query = query.where(getattr(model_class, field) == value)
-                # Handle other types with exact matching
-                else:
-                    query = query.where(getattr(model_class, field) == value)
-
-            records = session.exec(query).all()
-
-            if not records:
-                criteria_desc = (
-                    "all records" if not criteria else f"criteria {criteria}"
+        # Strings are searched by substring (LIKE), other types by exact match
+        conditions = [
+            {
+                "field": field,
+                "operator": (
+                    "like"
+                    if model_meta.fields[field].is_string and isinstance(value, str)
+                    else "eq"
+                ),
+                "value": value,
+            }
+            for field, value in criteria.items()
+        ]
+        try:
+            shape, params = prepare_conditions(model_meta, conditions)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        cache_key = make_cache_key(
+            "find_records", model_meta.name, shape, params, fields, size, after_id
+        )
+        page = result_cache.get(cache_key)
+        if page is MISSING:
+            generation = result_cache.generation([model_meta.name])
+            async with AsyncSession(get_async_engine()) as session:
+                page = await _fetch_page(
+                    session,
+                    model_meta,
+                    shape,
+                    params,
+                    size,
+                    after_id,
+                    fields,
                 )
-                return f"No records found in {model_name} matching {criteria_desc}."
+            result_cache.set(cache_key, [model_meta.name], page, generation)
+
+        if not page["records"]:
+            criteria_desc = "all records" if not criteria else f"criteria {criteria}"
+            return f"No records found in {model_name} matching {criteria_desc}."
 
-            result = []
-            for record in records:
-                if hasattr(record, "to_dict"):
-                    result.append(record.to_dict())
-                else:
-                    record_dict = {}
-                    for field_name in fields_info.keys():
-                        if hasattr(record, field_name):
-                            value = getattr(record, field_name)
-                            # Convert UUID to string for JSON serialization
-                            if isinstance(value, UUID):
-                                value = str(value)
-                            record_dict[field_name] = value
-                    result.append(record_dict)
-
-            return result
+        return _format_result(page, result_format)
 
     except json.JSONDecodeError as e:
         return f"Error parsing JSON: {str(e)}"
@@ -182,8 +454,25 @@ def find_records(data: Any) -> Union[List[Dict], str]:
         return f"Error searching records: {str(e)}"
 
 
+@instrument
 @function_tool(strict_mode=False)
-def find_records_with_complex_conditions(data: Any) -> Union[List[Dict], str]:
+async def find_records_with_complex_conditions(
+    data: Any,
+) -> Union[Dict[str, Any], str]:
+    """
+    Searches for records matching a list of conditions ('field', 'operator', 'value').
+    Results are paginated: pass the returned 'next_cursor' back to get the next page.
+
+    Args:
+        data: A dictionary (or JSON string) with 'model_name' and 'conditions', and
+            optionally 'fields' (the fields to return, all by default), 'limit'
+            (page size, default 50, max 500), 'cursor' and 'format' ("records"
+            or "columnar", as in 'find_records').
+
+    Returns:
+        Union[Dict[str, Any], str]: A page with 'format', 'records', 'next_cursor'
+            and 'total_estimate', or an error message.
+    """
     try:
         if isinstance(data, str):
             data = json.loads(data)
@@ -194,98 +483,185 @@ def find_records_with_complex_conditions(data: Any) -> Union[List[Dict], str]:
         if not model_name or not conditions:
             return "Error: Both 'model_name' and 'conditions' are required."
 
-        model_info = MODEL_REGISTRY.get(model_name.lower())
-        if not model_info:
+        model_meta = get_model_meta(model_name)
+        if not model_meta:
             return (
                 f"Error: Model not found. Available: {', '.join(MODEL_REGISTRY.keys())}"
             )
 
+        try:
+            fields = projection(model_meta, data.get("fields"))
+            size = page_size(data.get("limit"))
+            after_id = decode_cursor(data.get("cursor"))
+            result_format = _result_format(data)
+            shape, params = prepare_conditions(model_meta, conditions)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        cache_key = make_cache_key(
+            "find_records_with_complex_conditions",
+            model_meta.name,
+            shape,
+            params,
+            fields,
+            size,
+            after_id,
+        )
+        page = result_cache.get(cache_key)
+        if page is MISSING:
+            generation = result_cache.generation([model_meta.name])
+            async with AsyncSession(get_async_engine()) as session:
+                page = await _fetch_page(
+                    session,
+                    model_meta,
+                    shape,
+                    params,
+                    size,
+                    after_id,
+                    fields,
+                )
+            result_cache.set(cache_key, [model_meta.name], page, generation)
+
+        if not page["records"]:
+            return "No records found matching conditions"
+
+        return _format_result(page, result_format)
+
+    except json.JSONDecodeError as e:
+        return f"Error parsing JSON: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@instrument
+@function_tool(strict_mode=False)
+async def find_similar_values(data: Any) -> Union[Dict[str, Any], str]:
+    """
+    Finds the stored values of a text field closest to a given value ("did you mean"),
+    ignoring case and accents. Use it when a search by name finds nothing, instead of
+    loading every value of the field.
+
+    Args:
+        data: A dictionary (or JSON string) with 'model_name', 'field' (a text field)
+            and 'value', and optionally 'limit' (number of matches, default 5, max 50).
+
+    Returns:
+        Union[Dict[str, Any], str]: 'matches', a list of {'value', 'score'} sorted by
+            similarity (1 is an exact match), or a message.
+    """
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        model_name = data.get("model_name")
+        field = data.get("field")
+        value = data.get("value")
+
+        if not model_name or not field or not value:
+            return "Error: 'model_name', 'field' and 'value' are required."
+
+        model_meta = get_model_meta(model_name)
+        if not model_meta:
+            return f"Error: Model not found. Available: {', '.join(MODEL_META.keys())}"
+
+        text_fields = [
+            field_name
+            for field_name, field_meta in model_meta.fields.items()
+            if field_meta.is_string
+        ]
+        if field not in text_fields:
+            return (
+                f"Error: '{field}' is not a text field of {model_name}. "
+                f"Text fields: {', '.join(text_fields)}"
+            )
+
+        try:
+            limit = min(int(data.get("limit") or DEFAULT_MATCHES), MAX_MATCHES)
+        except (TypeError, ValueError):
+            return f"Error: Invalid limit '{data.get('limit')}'"
+
+        async with AsyncSession(get_async_engine()) as session:
+            matches = await fuzzy_index.search(
+                session, model_meta.name, field, str(value), max(limit, 1)
+            )
+
+        if not matches:
+            return f"No values of {model_name}.{field} are similar to '{value}'"
+
+        return {
+            "matches": [{"value": match, "score": score} for match, score in matches]
+        }
+
+    except json.JSONDecodeError as e:
+        return f"Error parsing JSON: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@instrument
+@function_tool(strict_mode=False)
+async def semantic_search(data: Any) -> Union[Dict[str, Any], str]:
+    """
+    Finds the records whose text is closest in meaning to a free-text query, for
+    descriptions that a 'like' filter cannot match (e.g. "galletas de chocolate"
+    for a product described as "GALLETA CHOCOLATADA 200G").
+
+    Args:
+        data: A dictionary (or JSON string) with 'model_name' ('insumo' or
+            'promocion') and 'query', and optionally 'limit' (number of records,
+            default 5, max 50).
+
+    Returns:
+        Union[Dict[str, Any], str]: 'records', the closest records best first, each
+            with its 'score' (cosine similarity, 1 is identical), or a message.
+    """
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        model_name = str(data.get("model_name") or "").lower()
+        query = data.get("query")
+
+        if not model_name or not query:
+            return "Error: Both 'model_name' and 'query' are required."
+
+        if model_name not in SEMANTIC_FIELDS:
+            return (
+                f"Error: Semantic search is not available for '{model_name}'. "
+                f"Available: {', '.join(SEMANTIC_FIELDS)}"
+            )
+
+        try:
+            limit = min(int(data.get("limit") or DEFAULT_MATCHES), MAX_MATCHES)
+        except (TypeError, ValueError):
+            return f"Error: Invalid limit '{data.get('limit')}'"
+
+        model_info = MODEL_REGISTRY[model_name]
         model_class = model_info["model"]
-        fields_info = model_info["fields"]
-
-        with Session(engine) as session:
-            query = select(model_class)
-
-            for condition in conditions:
-                field = condition.get("field")
-                operator = condition.get("operator")
-                value = condition.get("value")
-
-                if field not in fields_info:
-                    return f"Error: Invalid field '{field}'"
-
-                field_type = fields_info[field]["type"]
-                field_attr = getattr(model_class, field)
-
-                try:
-                    if field_type == "UUID" and isinstance(value, str):
-                        value = UUID(value)
-                    elif field_type == "str" and value is not None:
-                        value = normalize_text(str(value))
-
-                    match operator:
-                        case "eq":
-                            if field_type == "str":
-                                query = query.where(func.lower(field_attr) == value)
-                            else:
-                                query = query.where(field_attr == value)
-                        case "neq":
-                            if field_type == "str":
-                                query = query.where(func.lower(field_attr) != value)
-                            else:
-                                query = query.where(field_attr != value)
-                        case "gt":
-                            query = query.where(field_attr > value)
-                        case "gte":
-                            query = query.where(field_attr >= value)
-                        case "lt":
-                            query = query.where(field_attr < value)
-                        case "lte":
-                            query = query.where(field_attr <= value)
-                        case "like":
-                            if field_type == "str":
-                                query = query.where(
-                                    func.lower(field_attr).like(f"%{value}%")
-                                )
-                            else:
-                                query = query.where(field_attr.like(f"%{value}%"))
-                        case "starts_with":
-                            if field_type == "str":
-                                query = query.where(
-                                    func.lower(field_attr).like(f"{value}%")
-                                )
-                            else:
-                                query = query.where(field_attr.like(f"{value}%"))
-                        case "ends_with":
-                            if field_type == "str":
-                                query = query.where(
-                                    func.lower(field_attr).like(f"%{value}")
-                                )
-                            else:
-                                query = query.where(field_attr.like(f"%{value}"))
-                        case _:
-                            return f"Error: Invalid operator '{operator}'"
-
-                except ValueError as e:
-                    return f"Error converting value for field '{field}': {str(e)}"
-
-            records = session.exec(query).all()
-
-            if not records:
-                return "No records found matching conditions"
-
-            return [
-                (
-                    record.to_dict()
-                    if hasattr(record, "to_dict")
-                    else {
-                        k: str(v) if isinstance(v, UUID) else v
-                        for k, v in record.__dict__.items()
-                        if not k.startswith("_")
-                    }
+
+        async with AsyncSession(get_async_engine()) as session:
+            matches = await vector_index.search(
+                session, model_name, str(query), max(limit, 1)
+            )
+            scores = {UUID(record_id): score for record_id, score in matches}
+            records = (
+                await session.exec(
+                    select(model_class).where(model_class.id.in_(list(scores)))
                 )
-                for record in records
+            ).all()
+
+        if not records:
+            return f"No {model_name} records match '{query}'"
+
+        return {
+            "records": [
+                {
+                    **_record_to_dict(record, model_info["fields"]),
+                    "score": scores[record.id],
+                }
+                for record in sorted(records, key=lambda record: -scores[record.id])
             ]
+        }
 
     except json.JSONDecodeError as e:
         return f"Error parsing JSON: {str(e)}"
@@ -293,17 +669,468 @@ def find_records_with_complex_conditions(data: Any) -> Union[List[Dict], str]:
         return f"Error: {str(e)}"
 
 
+def _aggregate_query(
+    model_meta: ModelMeta,
+    aggregates: List[Dict[str, Any]],
+    group_by: List[str],
+    conditions: List[Dict[str, Any]],
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Builds the GROUP BY query of aggregate_records, ordered by the group fields,
+    and its parameters. Each aggregate is labeled '<function>_<field>', or
+    'count' for a count without field.
+
+    Raises:
+        ValueError: If a field, a function or a condition is invalid, or two
+            aggregates have the same label.
+    """
+    model_class = model_meta.model_class
+    fields_meta = model_meta.fields
+
+    invalid_fields = [field for field in group_by if field not in fields_meta]
+    if invalid_fields:
+        raise ValueError(f"Invalid fields for group_by: {', '.join(invalid_fields)}")
+
+    columns = [getattr(model_class, field) for field in group_by]
+    labels = set(group_by)
+    for aggregate in aggregates:
+        function = str(aggregate.get("function", "")).lower()
+        field = aggregate.get("field")
+
+        if function not in AGGREGATE_FUNCTIONS:
+            raise ValueError(
+                f"Invalid aggregate function '{function}'. "
+                f"Available: {', '.join(AGGREGATE_FUNCTIONS)}"
+            )
+        if function == "count" and not field:
+            label, column = "count", func.count()
+        else:
+            if field not in fields_meta:
+                raise ValueError(f"Invalid field '{field}'")
+            if function in ("sum", "avg") and not fields_meta[field].is_numeric:
+                raise ValueError(
+                    f"'{function}' requires a numeric field, got '{field}'"
+                )
+            label = f"{function}_{field}"
+            column = AGGREGATE_FUNCTIONS[function](getattr(model_class, field))
+
+        # Rows are mappings, so a repeated label would hide one of the values
+        if label in labels:
+            raise ValueError(f"Aggregate '{label}' is requested more than once")
+        labels.add(label)
+        columns.append(column.label(label))
+
+    shape, params = prepare_conditions(model_meta, conditions)
+    # Plain SQLAlchemy select: rows keep their labels even with a single column
+    query = sa_select(*columns).where(*condition_clauses(model_meta, shape))
+    if group_by:
+        group_columns = [getattr(model_class, field) for field in group_by]
+        query = query.group_by(*group_columns).order_by(*group_columns)
+    return query, params
+
+
+@instrument
 @function_tool(strict_mode=False)
-def insert_data(model_and_params: Dict[str, Any]) -> str:
+async def aggregate_records(data: Any) -> Union[List[Dict], str]:
+    """
+    Computes summary statistics in the database with a single GROUP BY query.
+    Only the summary rows are returned, never the underlying records.
+
+    Args:
+        data: A dictionary (or JSON string) containing:
+            - model_name (str): Name of the model/table to summarize.
+            - aggregates (list): Items with 'function' (count, sum, avg, min, max)
+              and 'field' ('field' is optional for count), each pair at most once.
+            - group_by (list, optional): Fields to group the summary by.
+            - conditions (list, optional): Same conditions accepted by
+              'find_records_with_complex_conditions'.
+            - limit (int, optional): Maximum number of summary rows (default 50, max 500).
+
+    Returns:
+        Union[List[Dict], str]: One dictionary per group with the group fields and
+            the aggregates (named '<function>_<field>', or 'count'), or an error message.
+    """
     try:
-        if isinstance(model_and_params, str):
-            model_and_params = json.loads(model_and_params)
+        if isinstance(data, str):
+            data = json.loads(data)
 
-        model_name = model_and_params.get("model_name")
-        model_params = model_and_params.get("params", {})
+        model_name = data.get("model_name")
+        aggregates = data.get("aggregates", [])
+        group_by = data.get("group_by", [])
+        conditions = data.get("conditions", [])
 
-        if not model_name:
-            return "Error: Model name is required."
+        if not model_name or not aggregates:
+            return "Error: Both 'model_name' and 'aggregates' are required."
+
+        model_meta = get_model_meta(model_name)
+        if not model_meta:
+            return f"Error: Model not found. Available: {', '.join(MODEL_META.keys())}"
+
+        try:
+            size = page_size(data.get("limit"))
+            query, params = _aggregate_query(
+                model_meta, aggregates, group_by, conditions
+            )
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        query = query.limit(size)
+        async with AsyncSession(get_async_engine()) as session:
+            rows = (await session.exec(query, params=params)).mappings().all()
+
+        if not rows:
+            return "No records found matching conditions"
+
+        return [
+            {key: _to_json_value(value) for key, value in row.items()} for row in rows
+        ]
+
+    except json.JSONDecodeError as e:
+        return f"Error parsing JSON: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def _rollup_query(
+    report: str,
+    period: str,
+    order_by: Optional[str],
+    start: Any,
+    end: Any,
+    ids: List[UUID],
+) -> Any:
+    """Totals of one rollup per record of its model, and per day or month."""
+    rollup = ROLLUPS[report]
+    table = rollup.table
+    model_class = MODEL_REGISTRY[report]["model"]
+    key = rollup.key_columns[0]
+
+    totals = {
+        column.name: func.sum(column).label(column.name)
+        for column in table.columns
+        if not column.primary_key
+    }
+    if order_by is not None and order_by not in totals:
+        raise ValueError(
+            f"Invalid order_by '{order_by}'. Available: {', '.join(totals)}"
+        )
+
+    periods = []
+    if period == "day":
+        periods = [table.c.fecha]
+    elif period == "month":
+        periods = [
+            func.extract("year", table.c.fecha).label("year"),
+            func.extract("month", table.c.fecha).label("month"),
+        ]
+    group = [
+        key,
+        *(getattr(model_class, field) for field in ROLLUP_LABELS[report]),
+        *periods,
+    ]
+
+    query = (
+        sa_select(*group, *totals.values())
+        .join_from(table, model_class, key == model_class.id)
+        .group_by(*group)
+    )
+    if start is not None:
+        query = query.where(table.c.fecha >= start)
+    if end is not None:
+        query = query.where(table.c.fecha <= end)
+    if ids:
+        query = query.where(key.in_(ids))
+
+    # Without an explicit order, periods come in order and the biggest amount first
+    amount = totals["importe" if report == "insumo" else "monto"]
+    if order_by is None:
+        ordering = [*periods, desc(amount)]
+    else:
+        ordering = [desc(totals[order_by]), *periods]
+    return query.order_by(*ordering)
+
+
+def _targets_query(start: Any, end: Any, ids: List[UUID]) -> Any:
+    """Sales of each employee of a target's 'tipo_empleado' within its dates."""
+    meta_class = MODEL_REGISTRY["meta_ventas"]["model"]
+    empleado_class = MODEL_REGISTRY["empleado"]["model"]
+    daily = ROLLUPS["empleado"].table
+    sold = func.coalesce(func.sum(daily.c.monto), 0.0).label("vendido")
+
+    query = (
+        sa_select(
+            meta_class.id.label("meta_id"),
+            meta_class.tipo_empleado,
+            meta_class.monto_venta,
+            meta_class.bono_especial,
+            meta_class.fecha_inicio,
+            meta_class.fecha_fin,
+            empleado_class.id.label("empleado_id"),
+            empleado_class.nombre,
+            empleado_class.apellido_paterno,
+            sold,
+        )
+        .join_from(
+            meta_class,
+            empleado_class,
+            normalized_sql(empleado_class.tipo)
+            == normalized_sql(meta_class.tipo_empleado),
+        )
+        .outerjoin(
+            daily,
+            and_(
+                daily.c.empleado_id == empleado_class.id,
+                daily.c.fecha.between(meta_class.fecha_inicio, meta_class.fecha_fin),
+            ),
+        )
+        .group_by(meta_class.id, empleado_class.id)
+        .order_by(meta_class.fecha_inicio.desc(), sold.desc())
+    )
+    if start is not None:
+        query = query.where(meta_class.fecha_fin >= start)
+    if end is not None:
+        query = query.where(meta_class.fecha_inicio <= end)
+    if ids:
+        query = query.where(meta_class.id.in_(ids))
+    return query
+
+
+@instrument
+@function_tool(strict_mode=False)
+async def sales_summary(data: Any) -> Union[List[Dict], str]:
+    """
+    Answers sales questions from daily totals kept up to date by the write tools,
+    so the cost does not grow with the number of sales: sales per employee, per
+    client or per product, and the progress of employees against their targets.
+
+    Args:
+        data: A dictionary (or JSON string) containing:
+            - report (str): 'empleado' (sales per employee), 'cliente' (sales per
+              client), 'insumo' (units and amount sold per product) or
+              'meta_ventas' (sales of each employee against the targets of their
+              'tipo').
+            - period (str, optional): 'day', 'month' or 'total' (default). Not used
+              by 'meta_ventas', which always covers the dates of each target.
+            - fecha_inicio, fecha_fin (str, optional): Inclusive date range. For
+              'meta_ventas', the targets that overlap it.
+            - ids (list, optional): Only these employees, clients, products or targets.
+            - order_by (str, optional): Total to sort by, biggest first: 'ventas' or
+              'monto' ('lineas', 'cantidad' or 'importe' for 'insumo').
+            - limit (int, optional): Maximum number of rows (default 50, max 500).
+
+    Returns:
+        Union[List[Dict], str]: One dictionary per row with the record id, its
+            descriptive fields, the period ('fecha' or 'mes') and the totals; for
+            'meta_ventas' also 'vendido', 'progreso' (vendido / monto_venta) and
+            'alcanzada'. Or an error message.
+    """
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        report = str(data.get("report", "")).lower()
+        period = str(data.get("period") or "total").lower()
+        order_by = data.get("order_by")
+
+        reports = [*ROLLUPS, "meta_ventas"]
+        if report not in reports:
+            return f"Error: Invalid report '{report}'. Available: {', '.join(reports)}"
+        if period not in SALES_PERIODS:
+            return (
+                f"Error: Invalid period '{period}'. "
+                f"Available: {', '.join(SALES_PERIODS)}"
+            )
+
+        try:
+            start = (
+                parse_date(data["fecha_inicio"]) if data.get("fecha_inicio") else None
+            )
+            end = parse_date(data["fecha_fin"]) if data.get("fecha_fin") else None
+            ids = [UUID(str(record_id)) for record_id in data.get("ids") or []]
+            size = page_size(data.get("limit"))
+
+            if report == "meta_ventas":
+                query = _targets_query(start, end, ids)
+            else:
+                query = _rollup_query(report, period, order_by, start, end, ids)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        async with AsyncSession(get_async_engine()) as session:
+            await ensure_rollups_fresh(session)
+            rows = (await session.exec(query.limit(size))).mappings().all()
+
+        if not rows:
+            return "No records found matching conditions"
+
+        results = []
+        for row in rows:
+            result = {key: _to_json_value(value) for key, value in row.items()}
+            if "year" in result:
+                result["mes"] = (
+                    f"{int(result.pop('year')):04d}-{int(result.pop('month')):02d}"
+                )
+            if report == "meta_ventas":
+                target = result["monto_venta"]
+                result["progreso"] = (
+                    round(result["vendido"] / target, 4) if target else None
+                )
+                result["alcanzada"] = result["vendido"] >= target
+            results.append(result)
+        return results
+
+    except json.JSONDecodeError as e:
+        return f"Error parsing JSON: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def _related_query(
+    model_name: str, path: List[str], conditions: List[Dict[str, Any]]
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Builds the query of find_related_records: 'model_name' joined along 'path',
+    one labelled column per field of each step, filtered by 'conditions' and
+    ordered by the ids of the steps. Returns the query and its parameters.
+
+    A condition applies to the step named by its 'step' (position in the path,
+    0 for 'model_name'), or else by its 'model'; a model that appears more than
+    once in the path must be addressed by 'step'.
+
+    Raises:
+        ValueError: If the path, a condition or the step it names is invalid.
+    """
+    # Resolve the path into (model name, aliased class) steps
+    current_name = model_name
+    current_alias = aliased(MODEL_REGISTRY[model_name]["model"])
+    steps = [(current_name, current_alias)]
+    joins = []
+    for relationship_name in path:
+        current_info = MODEL_REGISTRY[current_name]
+        if relationship_name not in current_info["relationships"]:
+            raise ValueError(
+                f"'{current_name}' has no relationship '{relationship_name}'. "
+                f"Available: {', '.join(current_info['relationships'])}"
+            )
+
+        related_class = (
+            inspect(current_info["model"])
+            .relationships[relationship_name]
+            .mapper.class_
+        )
+        related_alias = aliased(related_class)
+        joins.append(getattr(current_alias, relationship_name).of_type(related_alias))
+        current_name = MODEL_NAMES[related_class]
+        current_alias = related_alias
+        steps.append((current_name, current_alias))
+
+    # Flatten every step into labelled columns, suffixing repeated models
+    columns = []
+    seen = {}
+    for step_name, step_alias in steps:
+        prefix = step_name
+        if step_name in seen:
+            prefix = f"{step_name}_{seen[step_name] + 1}"
+        seen[step_name] = seen.get(step_name, 0) + 1
+        columns.extend(
+            getattr(step_alias, field).label(f"{prefix}.{field}")
+            for field in MODEL_REGISTRY[step_name]["fields"]
+        )
+
+    query = sa_select(*columns).select_from(steps[0][1])
+    for join in joins:
+        query = query.join(join)
+
+    params = {}
+    for index, condition in enumerate(conditions):
+        step = condition.get("step")
+        if step is not None:
+            if (
+                not isinstance(step, int)
+                or isinstance(step, bool)
+                or not 0 <= step < len(steps)
+            ):
+                raise ValueError(
+                    f"'step' must be a position in the path, from 0 ('{model_name}') "
+                    f"to {len(steps) - 1}"
+                )
+            condition_model = steps[step][0]
+            if str(condition.get("model", condition_model)).lower() != condition_model:
+                raise ValueError(
+                    f"Step {step} of the path is '{condition_model}', "
+                    f"not '{condition['model']}'"
+                )
+        elif "model" not in condition:
+            # Conditions without a model apply where the path starts
+            step, condition_model = 0, model_name
+        else:
+            condition_model = str(condition["model"]).lower()
+            positions = [
+                position
+                for position, (step_name, _) in enumerate(steps)
+                if step_name == condition_model
+            ]
+            if not positions:
+                raise ValueError(f"Model '{condition_model}' is not part of the path")
+            if len(positions) > 1:
+                raise ValueError(
+                    f"Model '{condition_model}' appears more than once in the path "
+                    f"(steps {', '.join(map(str, positions))}); add a 'step' to the "
+                    "condition to choose one"
+                )
+            step = positions[0]
+
+        # Each condition gets its own parameter prefix, as models may repeat
+        prefix = f"c{index}_"
+        shape, condition_params = prepare_conditions(
+            MODEL_META[condition_model], [condition], prefix
+        )
+        params.update(condition_params)
+        query = query.where(
+            *condition_clauses(
+                MODEL_META[condition_model], shape, steps[step][1], prefix
+            )
+        )
+
+    return query.order_by(*(step_alias.id for _, step_alias in steps)), params
+
+
+@instrument
+@function_tool(strict_mode=False)
+async def find_related_records(data: Any) -> Union[Dict[str, Any], str]:
+    """
+    Follows a path of relationships from one model and returns the joined records
+    in a single query, instead of one search per related table.
+
+    Args:
+        data: A dictionary (or JSON string) containing:
+            - model_name (str): Model where the path starts (e.g. "empleado").
+            - path (list): Relationship names to follow, as listed in
+              'database_tables_info' (e.g. ["ventas", "detalles", "insumo"]).
+            - conditions (list, optional): Same conditions accepted by
+              'find_records_with_complex_conditions', plus a 'model' key naming the
+              model of the path they apply to (defaults to 'model_name'). For a
+              model that appears more than once in the path, use a 'step' key
+              instead: its position in the path, 0 being 'model_name'.
+            - limit (int, optional): Maximum number of rows (default 50, max 500).
+            - format (str, optional): "records" (default) or "columnar", as in
+              'find_records'.
+
+    Returns:
+        Union[Dict[str, Any], str]: 'format', 'records' with one flattened row per
+            joined combination (keys are '<model>.<field>') and 'has_more', or an
+            error message.
+    """
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        model_name = data.get("model_name")
+        path = data.get("path", [])
+        conditions = data.get("conditions", [])
+
+        if not model_name or not path:
+            return "Error: Both 'model_name' and 'path' are required."
 
         model_info = MODEL_REGISTRY.get(model_name.lower())
         if not model_info:
@@ -311,57 +1138,244 @@ def insert_data(model_and_params: Dict[str, Any]) -> str:
                 f"Error: Model not found. Available: {', '.join(MODEL_REGISTRY.keys())}"
             )
 
-        model_class = model_info["model"]
-        fields = model_info["fields"]
+        try:
+            size = page_size(data.get("limit"))
+            result_format = _result_format(data)
+            query, params = _related_query(model_name.lower(), path, conditions)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        query = query.limit(size + 1)
+        async with AsyncSession(get_async_engine()) as session:
+            rows = (await session.exec(query, params=params)).mappings().all()
+
+        if not rows:
+            return "No records found matching conditions"
+
+        return _format_result(
+            {
+                "records": [
+                    {key: _to_json_value(value) for key, value in row.items()}
+                    for row in rows[:size]
+                ],
+                "has_more": len(rows) > size,
+            },
+            result_format,
+        )
+
+    except json.JSONDecodeError as e:
+        return f"Error parsing JSON: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def _collect_insert_rows(
+    model_name: str,
+    records: List[Dict[str, Any]],
+    rows_by_model: Dict[str, List[Dict[str, Any]]],
+    parent_key: Optional[Tuple[str, UUID]] = None,
+) -> None:
+    """
+    Validates the records of one model and appends their column values to
+    rows_by_model, parents before children. Nested lists under a one-to-many
+    relationship name (e.g. 'detalles' of a 'venta') are collected recursively
+    with their foreign key pointing at the new parent.
+
+    Raises:
+        ValueError: If a record has unknown or missing fields, or a malformed UUID.
+    """
+    model_info = MODEL_REGISTRY[model_name]
+    model_class = model_info["model"]
+    fields = model_info["fields"]
+    relationships = inspect(model_class).relationships
+
+    for index, params in enumerate(records):
+        location = f"{model_name} #{index + 1}"
+        params = dict(params)
+        if parent_key is not None:
+            params[parent_key[0]] = parent_key[1]
+
+        children = {
+            name: params.pop(name)
+            for name in list(params)
+            if name in relationships
+            and relationships[name].direction is RelationshipDirection.ONETOMANY
+        }
+
+        invalid_fields = [field for field in params if field not in fields]
+        if invalid_fields:
+            raise ValueError(
+                f"Invalid fields for {location}: {', '.join(invalid_fields)}"
+            )
 
-        # Validate required fields
         missing_params = [
             field_name
             for field_name, details in fields.items()
-            if details["required"] and field_name not in model_params
+            if details["required"] and field_name not in params
         ]
         if missing_params:
-            return f"Missing parameters: {', '.join(missing_params)}"
-
-        # Validate foreign keys
-        with Session(engine) as session:
-            for field_name, field_info in fields.items():
-                if "foreign_key" in field_info and field_name in model_params:
-                    ref_table, ref_field = field_info["foreign_key"].split(".")
-                    ref_model = MODEL_REGISTRY[ref_table]["model"]
-                    ref_exists = session.exec(
-                        select(ref_model).where(
-                            getattr(ref_model, ref_field) == model_params[field_name]
+            raise ValueError(
+                f"Missing parameters for {location}: {', '.join(missing_params)}"
+            )
+
+        # Convert UUIDs, dates and numbers given as strings
+        for field_name, value in params.items():
+            try:
+                params[field_name] = fields[field_name]["coerce"](value)
+            except ValueError as e:
+                raise ValueError(
+                    f"Invalid value for {field_name} in {location}: {str(e)}"
+                ) from None
+
+        row = model_class(**params).model_dump()
+        rows_by_model.setdefault(model_name, []).append(row)
+
+        for relationship_name, child_records in children.items():
+            relationship = relationships[relationship_name]
+            (_, child_column), *_ = relationship.local_remote_pairs
+            _collect_insert_rows(
+                MODEL_NAMES[relationship.mapper.class_],
+                child_records if isinstance(child_records, list) else [child_records],
+                rows_by_model,
+                (child_column.key, row["id"]),
+            )
+
+
+async def _find_missing_references(
+    session: AsyncSession, rows_by_model: Dict[str, List[Dict[str, Any]]]
+) -> List[str]:
+    """
+    Checks every foreign key value of the batch that does not point at a record of
+    the batch itself, with one 'WHERE id = ANY(...)' query per referenced table.
+    """
+    new_ids = {
+        (model_name, "id"): {row["id"] for row in rows}
+        for model_name, rows in rows_by_model.items()
+    }
+
+    references: Dict[Tuple[str, str], Set[Any]] = {}
+    for model_name, rows in rows_by_model.items():
+        for field_name, field_info in MODEL_REGISTRY[model_name]["fields"].items():
+            if "references" not in field_info:
+                continue
+            target = (
+                field_info["references"],
+                field_info["foreign_key"].split(".", 1)[1],
+            )
+            references.setdefault(target, set()).update(
+                row[field_name]
+                for row in rows
+                if row.get(field_name) is not None
+                and row[field_name] not in new_ids.get(target, ())
+            )
+
+    missing = []
+    for (ref_model_name, column_name), values in references.items():
+        if not values:
+            continue
+        ref_column = getattr(MODEL_REGISTRY[ref_model_name]["model"], column_name)
+        found = set(
+            (
+                await session.exec(
+                    select(ref_column).where(
+                        ref_column
+                        == any_(
+                            bindparam(
+                                "ref_values", list(values), type_=ARRAY(ref_column.type)
+                            )
                         )
-                    ).first()
+                    )
+                )
+            ).all()
+        )
+        missing.extend(
+            f"{ref_model_name} with {column_name}={value}" for value in values - found
+        )
+    return missing
+
+
+@instrument
+@function_tool(strict_mode=False)
+async def insert_data(model_and_params: Dict[str, Any]) -> str:
+    """
+    Inserts one or many records, optionally with their children, in one transaction.
+
+    Args:
+        model_and_params: A dictionary containing:
+            - model_name: Name of the model/table to insert into.
+            - params: A dictionary with the field values of one record, or a list of
+              them. A record may nest its children under a relationship name, e.g.
+              a 'venta' with "detalles": [{...}, {...}]; their foreign key to the
+              new parent is filled in automatically.
+
+    Returns:
+        str: A message with the number of records inserted per model, or an error.
+    """
+    try:
+        if isinstance(model_and_params, str):
+            model_and_params = json.loads(model_and_params)
+
+        model_name = model_and_params.get("model_name")
+        model_params = model_and_params.get("params", {})
+
+        if not model_name:
+            return "Error: Model name is required."
 
-                    if not ref_exists:
-                        return f"Error: Referenced {ref_table} with {ref_field}={model_params[field_name]} not found"
+        model_info = MODEL_REGISTRY.get(model_name.lower())
+        if not model_info:
+            return (
+                f"Error: Model not found. Available: {', '.join(MODEL_REGISTRY.keys())}"
+            )
 
-            # Convert UUIDs
-            for field_name, value in model_params.items():
-                if fields[field_name]["type"] == "UUID" and isinstance(value, str):
-                    try:
-                        model_params[field_name] = UUID(value)
-                    except ValueError:
-                        return f"Invalid UUID format for {field_name}"
+        records = model_params if isinstance(model_params, list) else [model_params]
+        if not records:
+            return "Error: No records to insert."
 
-            instance = model_class(**model_params)
-            session.add(instance)
-            session.commit()
+        rows_by_model: Dict[str, List[Dict[str, Any]]] = {}
+        try:
+            _collect_insert_rows(model_name.lower(), records, rows_by_model)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        async with AsyncSession(get_async_engine()) as session:
+            if any(rollups_fed_by(table_name) for table_name in rows_by_model):
+                await lock_rollups(session)
+
+            # Validate foreign keys
+            missing = await _find_missing_references(session, rows_by_model)
+            if missing:
+                return f"Error: Referenced records not found: {', '.join(missing)}"
+
+            # One executemany per model, parents first
+            for table_name, rows in rows_by_model.items():
+                await session.exec(
+                    insert(MODEL_REGISTRY[table_name]["model"]), params=rows
+                )
+            await refresh_rollups(session, rows_by_model)
+            await session.commit()
+
+        for table_name, rows in rows_by_model.items():
+            notify_table_write(table_name, "insert", rows)
 
-        return f"Successfully inserted {model_class.__name__}"
+        return "Successfully inserted " + ", ".join(
+            f"{len(rows)} {MODEL_REGISTRY[table_name]['model'].__name__}"
+            for table_name, rows in rows_by_model.items()
+        )
 
     except Exception as e:
         return f"Error: {str(e)}"
 
 
+@instrument
 @function_tool(strict_mode=False)
-def delete_a_data(data: Any) -> str:
+async def delete_a_data(data: Any) -> str:
     """
     Deletes records from the database based on the provided model and criteria.
     Supports mass deletion when no criteria is provided.
 
+    The criteria are compiled into a single DELETE ... WHERE statement; records are
+    only loaded one by one when a relationship of the model cascades deletes.
+
     Args:
         data (Any): A dictionary containing:
             - model_name (str): Name of the model/table to delete data from.
@@ -382,59 +1396,83 @@ def delete_a_data(data: Any) -> str:
     if not model_name:
         return "Error: 'model_name' key is required in the input."
 
-    model_info = MODEL_REGISTRY.get(model_name.lower())
-    if not model_info:
-        available_models = ", ".join(MODEL_REGISTRY.keys())
+    model_meta = get_model_meta(model_name)
+    if not model_meta:
+        available_models = ", ".join(MODEL_META.keys())
         return f"Error: Model not found. Available models: {available_models}"
 
-    model_class = model_info["model"]
-    fields_info = model_info["fields"]
+    model_class = model_meta.model_class
 
     try:
-        with Session(engine) as session:
-            query = select(model_class)
-
-            # Aplicar filtros solo si hay criterios
-            if criteria:
-                for field, value in criteria.items():
-                    if field not in fields_info:
-                        return f"Error: Field '{field}' does not exist in the model '{model_name}'."
-
-                    field_type = fields_info[field]["type"]
-                    # Aplicar lower() solo para campos de tipo string
-                    if field_type == "str" and isinstance(value, str):
-                        query = query.where(
-                            func.lower(getattr(model_class, field)) == value.lower()
-                        )
-                    else:
-                        query = query.where(getattr(model_class, field) == value)
+        filters = _equality_filters(model_meta, criteria)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+
+    # The rollups fed by the model are refreshed for the deleted rows; without
+    # criteria they are rebuilt on their next read instead
+    rollups = rollups_fed_by(model_name.lower())
+    changed = None
 
-            records = session.exec(query).all()
+    try:
+        async with AsyncSession(get_async_engine()) as session:
+            if rollups:
+                await lock_rollups(session)
+            if _requires_orm_delete(model_class):
+                records = (
+                    await session.exec(select(model_class).where(*filters))
+                ).all()
+                for record in records:
+                    await session.delete(record)
+                count = len(records)
+            elif rollups and filters:
+                changed = await track_changes(session, model_name.lower(), rollups)
+                columns = [column.name for column in changed.columns]
+                deleted = (
+                    delete(model_class)
+                    .where(*filters)
+                    .returning(*[model_class.__table__.c[name] for name in columns])
+                    .cte("deleted")
+                )
+                result = await session.exec(
+                    insert(changed).from_select(columns, sa_select(deleted))
+                )
+                count = result.rowcount
+            else:
+                result = await session.exec(
+                    delete(model_class)
+                    .where(*filters)
+                    .execution_options(synchronize_session=False)
+                )
+                count = result.rowcount
 
-            if not records:
+            if not count:
                 criteria_desc = (
                     "all records" if not criteria else f"criteria {criteria}"
                 )
                 return f"No records found in {model_name} matching {criteria_desc}."
 
-            count = 0
-            for record in records:
-                session.delete(record)
-                count += 1
-
-            session.commit()
+            if changed is not None:
+                await refresh_changed(session, model_name.lower(), rollups, changed)
+            elif rollups:
+                await mark_rollups_stale(session, rollups)
+            await session.commit()
+            notify_table_write(model_name.lower(), "delete")
             return f"Done! {count} records were deleted from {model_name}."
 
     except Exception as e:
         return f"Error deleting data: {str(e)}"
 
 
+@instrument
 @function_tool(strict_mode=False)
-def update_data(model_and_params: Dict[str, Any]) -> str:
+async def update_data(model_and_params: Dict[str, Any]) -> str:
     """
     Updates records in the database based on criteria.
     Supports mass updates when no identifier is provided.
 
+    The identifier and the updates are compiled into a single
+    UPDATE ... SET ... WHERE statement, so no record is loaded into memory.
+
     Args:
         model_and_params: A dictionary containing:
             - model_name: Name of the model/table to update
@@ -457,40 +1495,71 @@ def update_data(model_and_params: Dict[str, Any]) -> str:
     if not all([model_name, updates]):
         return "Error: model_name and updates are required."
 
-    model_info = MODEL_REGISTRY.get(model_name.lower())
-    if not model_info:
-        available_models = ", ".join(MODEL_REGISTRY.keys())
+    model_meta = get_model_meta(model_name)
+    if not model_meta:
+        available_models = ", ".join(MODEL_META.keys())
         return f"Error: Model not found. Available models: {available_models}"
 
-    model_class = model_info["model"]
-    fields_info = model_info["fields"]
+    model_class = model_meta.model_class
 
-    invalid_fields = [field for field in updates if field not in fields_info]
+    invalid_fields = [field for field in updates if field not in model_meta.fields]
     if invalid_fields:
         return f"Error: Invalid fields for update: {', '.join(invalid_fields)}"
 
     try:
-        with Session(engine) as session:
-            query = select(model_class)
-
-            # Aplicar filtros solo si hay identificador
-            if identifier:
-                for field, value in identifier.items():
-                    if field not in fields_info:
-                        return f"Error: Field '{field}' does not exist in the model '{model_name}'."
-
-                    field_type = fields_info[field]["type"]
-                    # Aplicar lower() solo para campos de tipo string
-                    if field_type == "str" and isinstance(value, str):
-                        query = query.where(
-                            func.lower(getattr(model_class, field)) == value.lower()
-                        )
-                    else:
-                        query = query.where(getattr(model_class, field) == value)
+        filters = _equality_filters(model_meta, identifier)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+
+    new_values = {}
+    for field, new_value in updates.items():
+        field_meta = model_meta.fields[field]
+        try:
+            new_value = field_meta.convert(new_value)
+        except ValueError as e:
+            return f"Error: Invalid value for field '{field}': {str(e)}"
+        # Convertir a minúsculas solo si es un campo string
+        if field_meta.is_string and new_value is not None:
+            new_value = new_value.lower()
+        new_values[field] = new_value
+
+    # Only the rollups that depend on an updated field are refreshed, for the rows
+    # of both the old and the new values; without an identifier they are rebuilt
+    # on their next read instead
+    rollups = rollups_fed_by(model_name.lower(), new_values)
+    changed = None
 
-            records = session.exec(query).all()
+    try:
+        async with AsyncSession(get_async_engine()) as session:
+            if rollups:
+                await lock_rollups(session)
+            if rollups and filters:
+                changed = await track_changes(session, model_name.lower(), rollups)
+                columns = [column.name for column in changed.columns]
+                updated = _versioned_update(
+                    model_class, filters, new_values, columns
+                ).cte("updated")
+                result = await session.exec(
+                    insert(changed).from_select(
+                        columns,
+                        union_all(
+                            sa_select(*[updated.c[f"old_{name}"] for name in columns]),
+                            sa_select(*[updated.c[name] for name in columns]),
+                        ),
+                    )
+                )
+                # Two versions, old and new, of each updated record
+                count = result.rowcount // 2
+            else:
+                result = await session.exec(
+                    update(model_class)
+                    .where(*filters)
+                    .values(**new_values)
+                    .execution_options(synchronize_session=False)
+                )
+                count = result.rowcount
 
-            if not records:
+            if not count:
                 identifier_desc = (
                     "any records"
                     if not identifier
@@ -498,17 +1567,12 @@ def update_data(model_and_params: Dict[str, Any]) -> str:
                 )
                 return f"No {identifier_desc} found to update"
 
-            count = 0
-            for record in records:
-                for field, new_value in updates.items():
-                    field_type = fields_info[field]["type"]
-                    # Convertir a minúsculas solo si es un campo string
-                    if field_type == "str" and isinstance(new_value, str):
-                        new_value = new_value.lower()
-                    setattr(record, field, new_value)
-                count += 1
-
-            session.commit()
+            if changed is not None:
+                await refresh_changed(session, model_name.lower(), rollups, changed)
+            elif rollups:
+                await mark_rollups_stale(session, rollups)
+            await session.commit()
+            notify_table_write(model_name.lower(), "update")
             return f"Done! {count} records were updated in {model_name}."
 
     except Exception as e:
@@ -2,7 +2,10 @@ from datetime import datetime
 
 from agents import function_tool
 
+from project.core.tool_metrics import instrument
 
+
+@instrument
 @function_tool(strict_mode=False)
 def retrieve_date():
     date = datetime.now().strftime("%Y-%m-%d")
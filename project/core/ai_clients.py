@@ -1,16 +1,23 @@
+from functools import lru_cache
+
 from agents import AsyncOpenAI, OpenAIChatCompletionsModel
-from anthropic import AsyncAnthropic
 
-from project.core.settings import settings
+from project.core.settings import get_settings
+
+# Clients are built on first use and then shared, so importing this module does
+# not read the settings.
+
+
+@lru_cache(maxsize=None)
+def get_openai_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=get_settings().OPENAI_API_KEY)
+
 
-anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+@lru_cache(maxsize=None)
+def get_gpt_4o_model() -> OpenAIChatCompletionsModel:
+    return OpenAIChatCompletionsModel(model="gpt-4o", openai_client=get_openai_client())
 
-gpt_4o_model_openai = OpenAIChatCompletionsModel(
-    model="gpt-4o",
-    openai_client=AsyncOpenAI(api_key=settings.OPENAI_API_KEY),
-)
 
-gpt_4o_mini_model_openai = OpenAIChatCompletionsModel(
-    model="gpt-4o",
-    openai_client=AsyncOpenAI(api_key=settings.OPENAI_API_KEY),
-)
+@lru_cache(maxsize=None)
+def get_gpt_4o_mini_model() -> OpenAIChatCompletionsModel:
+    return OpenAIChatCompletionsModel(model="gpt-4o", openai_client=get_openai_client())
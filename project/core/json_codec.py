@@ -0,0 +1,17 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional, installed with the 'speed' extra
+    orjson = None
+
+
+def encode_json(value: Any) -> str:
+    """
+    Compact JSON; UUIDs, dates and Decimals are written as plain strings.
+    Encoded with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
@@ -1,4 +1,5 @@
-from typing import Literal
+from functools import lru_cache
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,15 +9,38 @@ class Settings(BaseSettings):
     DB_CONNECTION: str
 
     # AI API Keys
-    ANTHROPIC_API_KEY: str
     OPENAI_API_KEY: str
 
     # Environment setting (e.g., "dev", "prod")
     ENVIRONMENT: Literal["dev", "prod"] = "dev"
 
+    # Connection pool of each engine (SQL statements are only logged in "dev")
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 disables it
+
+    # Read-through cache of finder results (0 disables it)
+    RESULT_CACHE_SIZE: int = 256
+    RESULT_CACHE_TTL_SECONDS: float = 300.0
+
+    # Directory where the semantic search embeddings are saved
+    VECTOR_INDEX_DIR: str = ".vector_index"
+
+    # Level of the application logs; the tool calls are logged at INFO
+    LOG_LEVEL: str = "INFO"
+    # File the tool metrics are written to on exit, in the Prometheus text format
+    # (e.g. for the textfile collector of node_exporter); unset disables it
+    METRICS_FILE: Optional[str] = None
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="ignore"
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Reads the settings on first use, so importing a module does not require them."""
+    return Settings()
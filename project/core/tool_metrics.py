@@ -0,0 +1,380 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+
+from project.core.json_codec import encode_json
+
+logger = logging.getLogger(__name__)
+
+# Average bytes of compact JSON per token; UUIDs and numbers tokenize poorly,
+# so this is on the conservative side of the usual ~4 bytes per token.
+BYTES_PER_TOKEN = 3.0
+# Label value of calls made outside an agent run, or of runs without a group_id
+UNKNOWN = "unknown"
+# Conversations whose totals are kept, least recently active dropped first
+MAX_CONVERSATIONS = 1000
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RESULT_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ERROR_PREFIXES = ("Error", "An error occurred")
+
+# Totals of a set of calls, also the numeric fields of ToolCall.as_dict()
+TOTALS = (
+    "calls",
+    "errors",
+    "seconds",
+    "db_seconds",
+    "statements",
+    "rows_returned",
+    "rows_written",
+    "result_bytes",
+    "result_tokens",
+)
+
+
+class ToolCall:
+    """Measurements of one tool call, filled in while it runs."""
+
+    def __init__(self, tool: str, agent: str, conversation: str):
+        self.tool = tool
+        self.agent = agent
+        self.conversation = conversation
+        self.seconds = 0.0
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.rows_returned = 0
+        self.rows_written = 0
+        self.result_bytes = 0
+        self.result_tokens = 0
+        self.error = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "tool": self.tool,
+            "agent": self.agent,
+            "conversation": self.conversation,
+            "calls": 1,
+            "errors": int(self.error),
+            "seconds": round(self.seconds, 6),
+            "db_seconds": round(self.db_seconds, 6),
+            "statements": self.statements,
+            "rows_returned": self.rows_returned,
+            "rows_written": self.rows_written,
+            "result_bytes": self.result_bytes,
+            "result_tokens": self.result_tokens,
+        }
+
+
+# The call running in the current task; the statements it sends are added to it
+_current_call: ContextVar[Optional[ToolCall]] = ContextVar(
+    "current_tool_call", default=None
+)
+
+
+def _add_totals(totals: Dict[str, float], call: Dict[str, Any]) -> None:
+    for name in TOTALS:
+        totals[name] = round(totals.get(name, 0) + call[name], 6)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape_label(v)}"' for n, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms, rendered in the Prometheus text format.
+    Each metric has a fixed list of label names; its series are keyed by the
+    tuple of label values. Counters and gauges kept elsewhere (e.g. by the
+    connection pools) are added with callback() and read when rendered.
+    """
+
+    def __init__(self):
+        # name -> (type, help, label names, buckets)
+        self._metrics: Dict[str, Tuple[str, str, Tuple[str, ...], Tuple]] = {}
+        self._series: Dict[str, Dict[Tuple[str, ...], Any]] = {}
+        self._callbacks: Dict[str, Callable[[], Dict[Tuple[str, ...], float]]] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str]) -> None:
+        self._metrics[name] = ("counter", help, tuple(labels), ())
+        self._series[name] = {}
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]
+    ) -> None:
+        self._metrics[name] = ("histogram", help, tuple(labels), tuple(buckets))
+        self._series[name] = {}
+
+    def callback(
+        self,
+        name: str,
+        kind: str,
+        help: str,
+        labels: Sequence[str],
+        read: Callable[[], Dict[Tuple[str, ...], float]],
+    ) -> None:
+        """
+        Adds a counter or gauge whose series (label values -> value) are returned
+        by read() each time the metrics are rendered; clear() leaves them alone.
+        """
+        if kind not in ("counter", "gauge"):
+            raise ValueError(f"Unsupported callback metric type: {kind}")
+        self._metrics[name] = (kind, help, tuple(labels), ())
+        self._callbacks[name] = read
+
+    def inc(self, name: str, labels: Tuple[str, ...], value: float = 1) -> None:
+        series = self._series[name]
+        series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: Tuple[str, ...], value: float) -> None:
+        buckets = self._metrics[name][3]
+        series = self._series[name].get(labels)
+        if series is None:
+            # Per bucket counts (not cumulative), then sum and count
+            series = self._series[name][labels] = [[0] * len(buckets), 0.0, 0]
+        for position, bound in enumerate(buckets):
+            if value <= bound:
+                series[0][position] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def clear(self) -> None:
+        for series in self._series.values():
+            series.clear()
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help, label_names, buckets) in self._metrics.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            read = self._callbacks.get(name)
+            series = read() if read is not None else self._series[name]
+            for labels, value in sorted(series.items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(label_names, labels)} {value}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    bucket_labels = _format_labels(label_names, labels, le=str(bound))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                bucket_labels = _format_labels(label_names, labels, le="+Inf")
+                lines.append(f"{name}_bucket{bucket_labels} {count}")
+                lines.append(f"{name}_sum{_format_labels(label_names, labels)} {total}")
+                lines.append(
+                    f"{name}_count{_format_labels(label_names, labels)} {count}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+class ToolMetrics:
+    """
+    Records every instrumented tool call: a structured log line, the Prometheus
+    metrics labeled by tool and agent, and running totals per agent and per
+    conversation. The database time, statements and rows of a call are those of
+    the statements it sends through an attached engine.
+    """
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        labels = ("tool", "agent")
+        self.registry.counter(
+            "agent_tool_calls_total", "Tool calls.", ("tool", "agent", "status")
+        )
+        self.registry.histogram(
+            "agent_tool_call_duration_seconds",
+            "Wall time of the tool calls.",
+            labels,
+            DURATION_BUCKETS,
+        )
+        self.registry.counter(
+            "agent_tool_db_seconds_total", "Time spent in SQL statements.", labels
+        )
+        self.registry.counter(
+            "agent_tool_db_statements_total", "SQL statements sent.", labels
+        )
+        self.registry.counter(
+            "agent_tool_rows_returned_total",
+            "Rows returned by the database (server-side cursors not included).",
+            labels,
+        )
+        self.registry.counter(
+            "agent_tool_rows_written_total",
+            "Rows inserted, updated or deleted.",
+            labels,
+        )
+        self.registry.histogram(
+            "agent_tool_result_bytes",
+            "Size of the serialized tool results.",
+            labels,
+            RESULT_BYTES_BUCKETS,
+        )
+        self.registry.counter(
+            "agent_tool_result_tokens_total",
+            "Estimated tokens of the tool results sent to the model.",
+            labels,
+        )
+        self._agents: Dict[str, Dict[str, float]] = {}
+        self._conversations: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def attach(self, engine: Engine) -> None:
+        """Listens to the statements of a sync engine (or an async engine's sync_engine)."""
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, *_):
+            if _current_call.get() is not None:
+                conn.info.setdefault("tool_query_started", []).append(
+                    time.perf_counter()
+                )
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            call = _current_call.get()
+            started = conn.info.get("tool_query_started")
+            if call is None or not started:
+                return
+            call.db_seconds += time.perf_counter() - started.pop()
+            call.statements += 1
+            writes = context.isinsert or context.isupdate or context.isdelete
+            if writes and executemany:
+                call.rows_written += len(parameters)
+            elif cursor.rowcount > 0:
+                if writes:
+                    call.rows_written += cursor.rowcount
+                else:
+                    call.rows_returned += cursor.rowcount
+
+        @event.listens_for(engine, "handle_error")
+        def _handle_error(exception_context) -> None:
+            # A failed statement never reaches after_cursor_execute
+            connection = exception_context.connection
+            started = connection.info.get("tool_query_started") if connection else None
+            if started:
+                started.pop()
+
+    def record(self, call: ToolCall) -> None:
+        labels = (call.tool, call.agent)
+        registry = self.registry
+        registry.inc(
+            "agent_tool_calls_total", (*labels, "error" if call.error else "ok")
+        )
+        registry.observe("agent_tool_call_duration_seconds", labels, call.seconds)
+        registry.inc("agent_tool_db_seconds_total", labels, call.db_seconds)
+        registry.inc("agent_tool_db_statements_total", labels, call.statements)
+        registry.inc("agent_tool_rows_returned_total", labels, call.rows_returned)
+        registry.inc("agent_tool_rows_written_total", labels, call.rows_written)
+        registry.observe("agent_tool_result_bytes", labels, call.result_bytes)
+        registry.inc("agent_tool_result_tokens_total", labels, call.result_tokens)
+
+        values = call.as_dict()
+        _add_totals(self._agents.setdefault(call.agent, {}), values)
+        conversation = self._conversations.pop(call.conversation, None)
+        if conversation is None:
+            conversation = {"totals": {}, "agents": {}, "tools": {}}
+        _add_totals(conversation["totals"], values)
+        _add_totals(conversation["agents"].setdefault(call.agent, {}), values)
+        _add_totals(conversation["tools"].setdefault(call.tool, {}), values)
+        self._conversations[call.conversation] = conversation
+        while len(self._conversations) > MAX_CONVERSATIONS:
+            self._conversations.popitem(last=False)
+
+        logger.info(json.dumps({"event": "tool_call", **values}))
+
+    def agent_totals(self) -> Dict[str, Dict[str, float]]:
+        """Totals of every call, per agent."""
+        return {agent: dict(totals) for agent, totals in self._agents.items()}
+
+    def conversation_totals(self, conversation: str) -> Optional[Dict[str, Any]]:
+        """
+        Totals of the calls of one conversation, overall, per agent and per tool;
+        None when it made no call, or is no longer among the MAX_CONVERSATIONS kept.
+        """
+        stats = self._conversations.get(conversation)
+        if stats is None:
+            return None
+        return {
+            "totals": dict(stats["totals"]),
+            "agents": {name: dict(totals) for name, totals in stats["agents"].items()},
+            "tools": {name: dict(totals) for name, totals in stats["tools"].items()},
+        }
+
+    def render_prometheus(self) -> str:
+        return self.registry.render()
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Writes the metrics in the Prometheus text format, e.g. for the textfile
+        collector of node_exporter. The file is replaced atomically.
+        """
+        target = Path(path)
+        temporary = target.with_name(target.name + ".tmp")
+        temporary.write_text(self.render_prometheus(), encoding="utf-8")
+        temporary.replace(target)
+
+    def reset(self) -> None:
+        self.registry.clear()
+        self._agents.clear()
+        self._conversations.clear()
+
+
+tool_metrics = ToolMetrics()
+
+
+def instrument(tool: Any) -> Any:
+    """
+    Records every call of a FunctionTool in tool_metrics. Use it above
+    @function_tool. The agent comes from the tool context, the conversation from
+    the group_id of the RunConfig of the run.
+
+    Results that are not strings are sent to the model as compact JSON
+    (encode_json) rather than as the Python repr the SDK would send, and their
+    size is measured on that JSON.
+    """
+    invoke_tool = tool.on_invoke_tool
+
+    async def on_invoke_tool(context: Any, arguments: str) -> Any:
+        agent = getattr(context, "agent", None)
+        run_config = getattr(context, "run_config", None)
+        call = ToolCall(
+            tool.name,
+            getattr(agent, "name", None) or UNKNOWN,
+            getattr(run_config, "group_id", None) or UNKNOWN,
+        )
+        token = _current_call.set(call)
+        started = time.perf_counter()
+        try:
+            output = await invoke_tool(context, arguments)
+        except BaseException:
+            call.error = True
+            raise
+        else:
+            if isinstance(output, str):
+                call.error = output.startswith(ERROR_PREFIXES)
+            else:
+                output = encode_json(output)
+            call.result_bytes = len(output.encode())
+            call.result_tokens = round(call.result_bytes / BYTES_PER_TOKEN)
+            return output
+        finally:
+            call.seconds = time.perf_counter() - started
+            _current_call.reset(token)
+            tool_metrics.record(call)
+
+    tool.on_invoke_tool = on_invoke_tool
+    return tool
@@ -0,0 +1,62 @@
+from datetime import date
+from typing import Any, Dict, List, Sequence
+from uuid import UUID
+
+RESULT_FORMATS = ("records", "columnar")
+
+# A column is dictionary-encoded when each of its values appears, on average, at
+# least this many times; below that the dictionary costs more than it saves
+DICTIONARY_MIN_REPEATS = 2
+
+# Types whose repeated values are worth replacing by an index
+DICTIONARY_TYPES = (str, UUID, date)
+
+
+def to_columnar(
+    columns: Sequence[str], rows: Sequence[Sequence[Any]], dictionary: bool = True
+) -> Dict[str, Any]:
+    """
+    Tabular form of a result: the column names once, then each row as an array
+    of values in column order.
+
+    With 'dictionary', every text, UUID or date column whose values repeat (such
+    as 'linea' or a foreign key) is dictionary-encoded: its distinct values are
+    listed once under "dictionaries"[column] and the rows hold their index in that
+    list instead. Nulls are kept as null.
+    """
+    table = {"columns": list(columns), "rows": [list(row) for row in rows]}
+    if not dictionary:
+        return table
+
+    dictionaries = {}
+    for position, column in enumerate(table["columns"]):
+        values = [row[position] for row in table["rows"] if row[position] is not None]
+        if not values or not all(
+            isinstance(value, DICTIONARY_TYPES) for value in values
+        ):
+            continue
+        distinct = list(dict.fromkeys(values))
+        if len(values) < DICTIONARY_MIN_REPEATS * len(distinct):
+            continue
+
+        indexes = {value: index for index, value in enumerate(distinct)}
+        for row in table["rows"]:
+            if row[position] is not None:
+                row[position] = indexes[row[position]]
+        dictionaries[column] = distinct
+
+    if dictionaries:
+        table["dictionaries"] = dictionaries
+    return table
+
+
+def records_to_columnar(
+    records: List[Dict[str, Any]], dictionary: bool = True
+) -> Dict[str, Any]:
+    """to_columnar() of a list of dicts; the columns are the keys of the first one."""
+    columns = list(records[0]) if records else []
+    return to_columnar(
+        columns,
+        [[record.get(column) for column in columns] for record in records],
+        dictionary,
+    )
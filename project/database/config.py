@@ -1,19 +1,158 @@
+import logging
+import shlex
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import Engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, create_engine
 
-from project.core.settings import settings
+import project.database.rollups  # noqa: F401  (registers the rollup tables in the metadata)
+from project.core.settings import get_settings
+from project.core.tool_metrics import tool_metrics
+from project.database.indexes import create_search_indexes
+from project.database.migrations import migrate_date_columns
+from project.database.pool_metrics import (
+    PoolMetrics,
+    register_pool_metrics,
+    timed_pool_class,
+)
+
+logger = logging.getLogger(__name__)
+
+engine_metrics = PoolMetrics()
+async_engine_metrics = PoolMetrics()
+
+# Query arguments of the connection URL that asyncpg.connect() accepts as they are
+# (prepared_statement_cache_size is read by the SQLAlchemy dialect itself)
+ASYNCPG_QUERY_ARGS = (
+    "ssl",
+    "direct_tls",
+    "passfile",
+    "target_session_attrs",
+    "krbsrvname",
+    "gsslib",
+    "prepared_statement_cache_size",
+)
+
+
+def _pool_options() -> Dict[str, Any]:
+    settings = get_settings()
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        # Formatting and logging every statement is only worth it while developing
+        "echo": settings.ENVIRONMENT == "dev",
+    }
+
+
+def asyncpg_url(url: URL) -> Tuple[URL, Dict[str, Any]]:
+    """
+    Adapts a libpq connection URL, as used by the sync engine, to asyncpg, which
+    rejects the query arguments it does not know. Returns the URL without them and
+    the connect_args they translate to: sslmode becomes ssl, connect_timeout
+    timeout, and application_name and the '-c name=value' settings of options
+    become server_settings. Other libpq arguments are dropped with a warning.
+    """
+    connect_args: Dict[str, Any] = {}
+    server_settings: Dict[str, str] = {}
+    query = {}
+    for name, value in url.query.items():
+        # Repeated arguments come as a tuple; the last one wins, as in libpq
+        if isinstance(value, tuple):
+            value = value[-1]
+        if name in ASYNCPG_QUERY_ARGS:
+            query[name] = value
+        elif name == "sslmode":
+            query["ssl"] = value
+        elif name == "connect_timeout":
+            connect_args["timeout"] = float(value)
+        elif name == "application_name":
+            server_settings["application_name"] = value
+        elif name == "options":
+            words = shlex.split(value)
+            for flag, setting in zip(words, words[1:]):
+                if flag == "-c" and "=" in setting:
+                    setting_name, setting_value = setting.split("=", 1)
+                    server_settings[setting_name] = setting_value
+        else:
+            logger.warning(
+                "Ignoring '%s' of DB_CONNECTION: asyncpg has no such argument", name
+            )
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+    return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+
+# Engines are built on first use: importing the tools must not load the settings,
+# the database drivers or open a pool.
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Sync engine, used to create and migrate the schema."""
+    settings = get_settings()
+    engine = create_engine(
+        settings.DB_CONNECTION,
+        poolclass=timed_pool_class(QueuePool, engine_metrics),
+        connect_args=(
+            {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+            if settings.DB_STATEMENT_TIMEOUT_MS
+            else {}
+        ),
+        **_pool_options(),
+    )
+    engine_metrics.attach(engine)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """
+    Same database, reached through asyncpg so the agent tools never block the
+    event loop.
+    """
+    settings = get_settings()
+    url, connect_args = asyncpg_url(make_url(settings.DB_CONNECTION))
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args.setdefault("server_settings", {})["statement_timeout"] = str(
+            settings.DB_STATEMENT_TIMEOUT_MS
+        )
+    async_engine = create_async_engine(
+        url,
+        poolclass=timed_pool_class(AsyncAdaptedQueuePool, async_engine_metrics),
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+    async_engine_metrics.attach(async_engine.sync_engine)
+    tool_metrics.attach(async_engine.sync_engine)
+    return async_engine
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Pool counters and current state of the engines built so far."""
+    stats = {}
+    if get_engine.cache_info().currsize:
+        stats["engine"] = engine_metrics.snapshot(get_engine().pool)
+    if get_async_engine.cache_info().currsize:
+        stats["async_engine"] = async_engine_metrics.snapshot(
+            get_async_engine().sync_engine.pool
+        )
+    return stats
 
-postgres_url = settings.DB_CONNECTION
-connect_args = {
-    "check_same_thread": False
-}  # check_same_thread is for SQLite, not PostgreSQL
 
-engine = create_engine(
-    postgres_url, echo=True
-)  # To display the logs of the SQLModel queries
+# The pool metrics are exported with the tool metrics
+register_pool_metrics(tool_metrics.registry, lambda: pool_stats())
 
 
 def create_db_and_tables():
+    engine = get_engine()
     SQLModel.metadata.create_all(engine)
+    migrate_date_columns(engine)
+    create_search_indexes(engine)
 
 
 if __name__ == "__main__":
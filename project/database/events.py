@@ -0,0 +1,25 @@
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+WriteOperation = Literal["insert", "update", "delete"]
+
+# listener(model_name, operation, records): records holds the written rows when
+# they are known (inserts); bulk updates and deletes only report the table.
+WriteListener = Callable[[str, WriteOperation, Optional[List[Dict[str, Any]]]], None]
+
+_write_listeners: List[WriteListener] = []
+
+
+def on_table_write(listener: WriteListener) -> WriteListener:
+    """Registers a listener called after a write tool commits. Usable as a decorator."""
+    _write_listeners.append(listener)
+    return listener
+
+
+def notify_table_write(
+    model_name: str,
+    operation: WriteOperation,
+    records: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+    """Tells every registered listener that a table of MODEL_REGISTRY changed."""
+    for listener in _write_listeners:
+        listener(model_name, operation, records)
@@ -0,0 +1,119 @@
+from typing import Any, AsyncIterator, Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.core.json_codec import encode_json
+from project.database.columnar import to_columnar
+from project.database.model_registry import MODEL_REGISTRY
+
+# Roughly 100k tokens: a full snapshot must still fit in the model's context
+DEFAULT_MAX_BYTES = 400_000
+DEFAULT_MAX_ROWS = 20_000
+DEFAULT_CHUNK_ROWS = 500
+
+
+class SnapshotExporter:
+    """
+    Streams every table of MODEL_REGISTRY as compact JSON chunks through
+    server-side cursors, stopping as soon as the byte or row budget is spent.
+
+    Two formats are supported, both one JSON document per line:
+        - "ndjson": one object per record, tagged with its table in "_table".
+        - "columnar": one object per chunk with "table", "columns" and "rows"
+          (the field names are written once per chunk instead of once per record),
+          and "dictionaries" for the dictionary-encoded columns (see to_columnar).
+
+    After iterating, 'truncated' tells whether the budget cut the snapshot short.
+    """
+
+    def __init__(
+        self,
+        output_format: Literal["ndjson", "columnar"] = "ndjson",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ):
+        if output_format not in ("ndjson", "columnar"):
+            raise ValueError(f"Unsupported snapshot format '{output_format}'")
+
+        self.output_format = output_format
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.chunk_rows = chunk_rows
+        self.bytes_written = 0
+        self.rows_written = 0
+        self.truncated = False
+
+    def _fits(self, size: int) -> bool:
+        return (
+            self.rows_written < self.max_rows
+            and self.bytes_written + size <= self.max_bytes
+        )
+
+    async def chunks(self, session: AsyncSession) -> AsyncIterator[str]:
+        """Yields the snapshot table by table, one chunk of lines at a time."""
+        for model_name, model_info in MODEL_REGISTRY.items():
+            model_class = model_info["model"]
+            fields = list(model_info["fields"].keys())
+            columns = [getattr(model_class, field) for field in fields]
+
+            result = await session.stream(
+                select(*columns).execution_options(yield_per=self.chunk_rows)
+            )
+            try:
+                async for partition in result.partitions():
+                    chunk = self._encode_partition(model_name, fields, partition)
+                    if chunk:
+                        yield chunk
+                    if self.truncated:
+                        return
+            finally:
+                await result.close()
+
+    def _encode_partition(
+        self, model_name: str, fields: list[str], partition: Any
+    ) -> str:
+        if self.output_format == "ndjson":
+            lines = []
+            for row in partition:
+                line = encode_json({"_table": model_name, **dict(zip(fields, row))})
+                size = len(line.encode()) + 1
+                if not self._fits(size):
+                    self.truncated = True
+                    break
+                lines.append(line)
+                self.bytes_written += size
+                self.rows_written += 1
+            return "\n".join(lines)
+
+        # Rows are budgeted on their plain encoding, then the chunk on its actual
+        # size (plus its newline): dictionary encoding usually makes it smaller,
+        # but not always, e.g. when the dictionaries hold short values
+        header = encode_json({"table": model_name, "columns": fields, "rows": []})
+        start_bytes = self.bytes_written
+        self.bytes_written += len(header.encode()) + 1
+        rows = []
+        for row in partition:
+            size = len(encode_json(list(row)).encode()) + 1
+            if not self._fits(size):
+                self.truncated = True
+                break
+            rows.append(list(row))
+            self.bytes_written += size
+            self.rows_written += 1
+
+        self.bytes_written = start_bytes
+        budget = self.max_bytes - start_bytes
+        while rows:
+            chunk = encode_json({"table": model_name, **to_columnar(fields, rows)})
+            size = len(chunk.encode()) + 1
+            if size <= budget:
+                self.bytes_written += size
+                return chunk
+            # Over budget: keep the share of the rows that fits, at least one less
+            self.truncated = True
+            keep = min(len(rows) - 1, len(rows) * budget // size)
+            self.rows_written -= len(rows) - keep
+            rows = rows[:keep]
+        return ""
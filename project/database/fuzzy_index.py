@@ -0,0 +1,160 @@
+import heapq
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from project.database.events import on_table_write
+from project.database.model_registry import MODEL_REGISTRY
+from project.utils.utils import normalize_text, normalize_texts
+
+# Matches returned by a search, also by the semantic search of vector_index
+DEFAULT_MATCHES = 5
+MAX_MATCHES = 50
+# Minimum trigram similarity of a match, as pg_trgm's default threshold
+DEFAULT_THRESHOLD = 0.3
+BUILD_CHUNK_ROWS = 5000
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of each word, padded like pg_trgm: two spaces before, one after."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FieldIndex:
+    """
+    Trigram index of the distinct values of one text field. Values are stored
+    normalized (lowercase, without accents) next to one original spelling.
+    """
+
+    __slots__ = ("values", "grams", "postings")
+
+    def __init__(self):
+        self.values: Dict[str, str] = {}
+        self.grams: Dict[str, Set[str]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+
+    def add(self, values: Iterable[Any]) -> None:
+        values = [value for value in values if value is not None]
+        for value, key in zip(values, normalize_texts(values)):
+            if key in self.values:
+                continue
+            self.values[key] = str(value)
+            self.grams[key] = trigrams(key)
+            for gram in self.grams[key]:
+                self.postings.setdefault(gram, set()).add(key)
+
+    def search(
+        self, value: str, limit: int, threshold: float
+    ) -> List[Tuple[str, float]]:
+        """Returns up to 'limit' (original value, similarity) pairs, best first."""
+        query_grams = trigrams(normalize_text(value))
+        if not query_grams:
+            return []
+
+        # Only values sharing at least one trigram with the query are scored
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = (
+            (count / (len(query_grams) + len(self.grams[key]) - count), key)
+            for key, count in shared.items()
+        )
+        return [
+            (self.values[key], round(score, 3))
+            for score, key in heapq.nlargest(limit, scored)
+            if score >= threshold
+        ]
+
+
+class FuzzyIndex:
+    """
+    In-memory trigram indexes of text fields, built from the database on the first
+    search of each field. Inserted values are added as they are written; updates
+    and deletes drop the indexes of their table, which are rebuilt on next use.
+
+    Every write also bumps the generation of its table. An index whose table was
+    written while it was being built may miss that write, so it serves the search
+    that built it but is not kept.
+    """
+
+    def __init__(self):
+        self._fields: Dict[Tuple[str, str], FieldIndex] = {}
+        self._generations: Dict[str, int] = {}
+        # Bumped by invalidate() without a table, which concerns every table
+        self._epoch = 0
+
+    def _generation(self, model_name: str) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(model_name, 0)
+
+    def _bump(self, model_name: str) -> None:
+        self._generations[model_name] = self._generations.get(model_name, 0) + 1
+
+    def invalidate(self, model_name: Optional[str] = None) -> None:
+        """Drops the indexes of one table, or of every table."""
+        if model_name is None:
+            self._epoch += 1
+        else:
+            self._bump(model_name)
+        for key in list(self._fields):
+            if model_name is None or key[0] == model_name:
+                del self._fields[key]
+
+    def add_records(self, model_name: str, records: List[Dict[str, Any]]) -> None:
+        """Adds the values of new records to the indexes built for their table."""
+        self._bump(model_name)
+        for (indexed_model, field), field_index in self._fields.items():
+            if indexed_model == model_name:
+                field_index.add(record.get(field) for record in records)
+
+    async def field_index(
+        self, session: AsyncSession, model_name: str, field: str
+    ) -> FieldIndex:
+        key = (model_name, field)
+        if key in self._fields:
+            return self._fields[key]
+
+        generation = self._generation(model_name)
+        column = getattr(MODEL_REGISTRY[model_name]["model"], field)
+        field_index = FieldIndex()
+        result = await session.stream_scalars(
+            select(column).where(column.is_not(None)).distinct(),
+            execution_options={"yield_per": BUILD_CHUNK_ROWS},
+        )
+        async for values in result.partitions():
+            field_index.add(values)
+
+        if self._generation(model_name) == generation:
+            self._fields[key] = field_index
+        return field_index
+
+    async def search(
+        self,
+        session: AsyncSession,
+        model_name: str,
+        field: str,
+        value: str,
+        limit: int = DEFAULT_MATCHES,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> List[Tuple[str, float]]:
+        field_index = await self.field_index(session, model_name, field)
+        return field_index.search(value, limit, threshold)
+
+
+fuzzy_index = FuzzyIndex()
+
+
+@on_table_write
+def _update_fuzzy_index(
+    model_name: str, operation: str, records: Optional[List[Dict[str, Any]]]
+) -> None:
+    if operation == "insert" and records is not None:
+        fuzzy_index.add_records(model_name, records)
+    else:
+        fuzzy_index.invalidate(model_name)
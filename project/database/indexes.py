@@ -0,0 +1,75 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import DDL, Engine, Index, event
+from sqlmodel import SQLModel
+
+from project.database.models import (
+    Cliente,
+    Concurso,
+    Empleado,
+    Insumo,
+    MetaVentas,
+    Promocion,
+)
+from project.utils.utils import normalized_sql
+
+# Fields compared with normalized_sql(column) == value (update/delete identifiers,
+# 'eq'/'neq' conditions): a B-tree index on the normalized column serves those
+# lookups. The index expression is recomputed by PostgreSQL on every insert and
+# update, so no shadow column has to be kept in sync.
+NORMALIZED_INDEXED_FIELDS: Dict[Any, List[str]] = {
+    Insumo: ["descripcion", "linea", "sublinea"],
+    Cliente: ["nombre", "nit"],
+    Empleado: ["nombre", "apellido_paterno", "apellido_materno", "tipo"],
+    Promocion: ["linea"],
+    MetaVentas: ["tipo_empleado"],
+}
+
+# Free-text fields searched with normalized_sql(column).like('%value%'): only a
+# pg_trgm GIN index on the normalized column avoids a sequential scan for those.
+TRIGRAM_INDEXED_FIELDS: Dict[Any, List[str]] = {
+    Insumo: ["descripcion", "presentacion", "linea", "sublinea"],
+    Cliente: ["nombre", "contacto"],
+    Empleado: ["nombre", "apellido_paterno", "apellido_materno"],
+    Promocion: ["titulo_promocion"],
+    Concurso: ["descripcion"],
+}
+
+# Index objects bound to a column attach themselves to its table, so
+# SQLModel.metadata.create_all() builds them together with new tables.
+SEARCH_INDEXES: List[Index] = [
+    Index(
+        f"ix_{model_class.__tablename__}_{field}_norm",
+        normalized_sql(getattr(model_class, field)),
+    )
+    for model_class, fields in NORMALIZED_INDEXED_FIELDS.items()
+    for field in fields
+] + [
+    Index(
+        f"ix_{model_class.__tablename__}_{field}_norm_trgm",
+        normalized_sql(getattr(model_class, field)).label(f"{field}_norm"),
+        postgresql_using="gin",
+        postgresql_ops={f"{field}_norm": "gin_trgm_ops"},
+    )
+    for model_class, fields in TRIGRAM_INDEXED_FIELDS.items()
+    for field in fields
+]
+
+# gin_trgm_ops comes from the pg_trgm extension, which must exist first
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def create_search_indexes(engine: Engine) -> None:
+    """
+    Creates every index declared on the models that is missing from the database.
+    create_all() skips tables that already exist, and their indexes with them.
+    """
+    with engine.begin() as connection:
+        connection.execute(DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
@@ -0,0 +1,114 @@
+import logging
+import re
+from typing import Any, List
+
+from sqlalchemy import Date, Engine, String, inspect, text
+from sqlmodel import SQLModel
+
+import project.database.models  # noqa: F401  (registers the tables in the metadata)
+from project.utils.utils import parse_date
+
+logger = logging.getLogger(__name__)
+
+# The text formats parse_date accepts, and the SQL that converts each of them
+# whatever the DateStyle of the server: an ISO date, possibly followed by a time,
+# or a day-first date
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}([T ].*)?$")
+DAY_FIRST_DATE = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
+_TEXT_TO_DATE = """CASE
+    WHEN btrim({column}) ~ '^\\d{{4}}-\\d{{2}}-\\d{{2}}([T ].*)?$'
+        THEN to_date(left(btrim({column}), 10), 'YYYY-MM-DD')
+    WHEN btrim({column}) ~ '^\\d{{1,2}}/\\d{{1,2}}/\\d{{4}}$'
+        THEN to_date(btrim({column}), 'DD/MM/YYYY')
+END"""
+
+# Examples of unparseable values reported per column
+MAX_REPORTED_VALUES = 10
+
+
+def _convertible(value: str) -> bool:
+    """True when _TEXT_TO_DATE converts the value to the date parse_date gives."""
+    value = value.strip()
+    if not (ISO_DATE.match(value) or DAY_FIRST_DATE.match(value)):
+        return False
+    try:
+        parse_date(value[:10] if ISO_DATE.match(value) else value)
+    except ValueError:
+        return False
+    return True
+
+
+def _unparseable_values(
+    connection: Any, table_name: str, column_name: str
+) -> List[str]:
+    # Date columns hold few distinct values, one per day at most
+    values = connection.execute(
+        text(
+            f'SELECT DISTINCT "{column_name}" FROM "{table_name}" '
+            f'WHERE "{column_name}" IS NOT NULL'
+        )
+    ).scalars()
+    return [value for value in values if not _convertible(str(value))]
+
+
+def migrate_date_columns(engine: Engine) -> list[str]:
+    """
+    Converts the date columns that older databases still store as text into real
+    DATE columns, parsing the existing values in place with the rules of
+    parse_date (ISO or day-first), independently of the server's DateStyle.
+    Columns that are already dates are left untouched, so it is safe to run on
+    every start.
+
+    A column holding values that cannot be parsed is not converted: the values
+    are logged as a warning, and the other columns are still migrated, so the
+    application starts. Fix the values and restart to convert it.
+
+    Returns:
+        list[str]: The 'table.column' names that were converted.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    migrated = []
+
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            current_types = {
+                column["name"]: column["type"]
+                for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if not isinstance(column.type, Date):
+                    continue
+                current_type = current_types.get(column.name)
+                if isinstance(current_type, Date):
+                    continue
+
+                using = f'"{column.name}"::date'
+                if isinstance(current_type, String):
+                    unparseable = _unparseable_values(
+                        connection, table.name, column.name
+                    )
+                    if unparseable:
+                        logger.warning(
+                            "Not converting %s.%s to DATE: %d distinct values are not "
+                            "dates in YYYY-MM-DD or DD/MM/YYYY format, e.g. %s",
+                            table.name,
+                            column.name,
+                            len(unparseable),
+                            unparseable[:MAX_REPORTED_VALUES],
+                        )
+                        continue
+                    using = _TEXT_TO_DATE.format(column=f'"{column.name}"')
+
+                connection.execute(
+                    text(
+                        f'ALTER TABLE "{table.name}" ALTER COLUMN "{column.name}" '
+                        f"TYPE DATE USING {using}"
+                    )
+                )
+                migrated.append(f"{table.name}.{column.name}")
+
+    return migrated
@@ -1,162 +1,132 @@
-from project.database.models import (
-    Cliente,
-    ClienteVisita,
-    ClienteVisitaVenta,
-    Concurso,
-    ConcursoGanadores,
-    DetalleVenta,
-    Empleado,
-    Insumo,
-    MetaVentas,
-    Promocion,
-    PromocionDetalle,
-    Venta,
+import re
+from typing import Any, Callable, Dict, Type
+from uuid import UUID
+
+from sqlalchemy import Column, Date, Integer, Numeric, String, Uuid, inspect
+from sqlmodel import SQLModel
+
+from project.database import models
+from project.utils.utils import parse_date
+
+# Column types checked in order against the column type, or the type a
+# TypeDecorator (such as sqlmodel's AutoString) wraps
+TYPE_NAMES = (
+    (Uuid, "UUID"),
+    (String, "str"),
+    (Date, "date"),
+    (Integer, "int"),
+    (Numeric, "float"),
 )
 
-MODEL_REGISTRY = {
-    "insumo": {
-        "model": Insumo,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "descripcion": {"required": True, "type": "str"},
-            "presentacion": {"required": False, "type": "str", "default": None},
-            "linea": {"required": True, "type": "str"},
-            "sublinea": {"required": True, "type": "str"},
-            "precio": {"required": True, "type": "float"},
-        },
-        "relationships": ["detalles_venta", "promociones_detalle"],
-    },
-    "cliente": {
-        "model": Cliente,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "nombre": {"required": True, "type": "str"},
-            "calle": {"required": True, "type": "str"},
-            "num_ext": {"required": True, "type": "int"},
-            "num_int": {"required": False, "type": "int", "default": None},
-            "colonia": {"required": True, "type": "str"},
-            "municipio": {"required": True, "type": "str"},
-            "codigo_postal": {"required": True, "type": "int"},
-            "estado": {"required": True, "type": "str"},
-            "telefono": {"required": True, "type": "int"},
-            "nit": {"required": True, "type": "str"},
-            "contacto": {"required": False, "type": "str", "default": None},
-        },
-        "relationships": ["ventas", "visitas_venta", "visitas"],
-    },
-    "empleado": {
-        "model": Empleado,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "nombre": {"required": True, "type": "str"},
-            "apellido_paterno": {"required": True, "type": "str"},
-            "apellido_materno": {"required": True, "type": "str"},
-            "tipo": {"required": True, "type": "str"},
-        },
-        "relationships": ["ventas", "visitas_venta", "concursos_ganadores"],
-    },
-    "venta": {
-        "model": Venta,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "fecha": {"required": True, "type": "str"},
-            "cliente_id": {"required": True, "type": "UUID"},
-            "monto": {"required": True, "type": "float"},
-            "empleado_id": {"required": True, "type": "UUID"},
-        },
-        "relationships": ["detalles"],
-    },
-    "detalle_venta": {
-        "model": DetalleVenta,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},  # Added ID
-            "venta_id": {"required": True, "type": "UUID"},
-            "insumo_id": {"required": True, "type": "UUID"},
-            "cantidad": {"required": True, "type": "int"},
-            "precio": {"required": True, "type": "float"},
-        },
-        "relationships": [],
-    },
-    "cliente_visita": {
-        "model": ClienteVisita,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},  # Added ID
-            "cliente_id": {"required": True, "type": "UUID"},
-            "periodo_visita": {"required": True, "type": "str"},
-        },
-        "relationships": [],
-    },
-    "cliente_visita_venta": {
-        "model": ClienteVisitaVenta,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "fecha": {"required": True, "type": "str"},
-            "cliente_id": {"required": True, "type": "UUID"},
-            "empleado_id": {"required": True, "type": "UUID"},
-            "observacion": {
-                "required": False,
-                "type": "str",
-                "default": None,
-            },
-        },
-        "relationships": [],
-    },
-    "promocion": {
-        "model": Promocion,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "linea": {"required": True, "type": "str"},
-            "titulo_promocion": {"required": True, "type": "str"},
-            "fecha_inicio": {"required": True, "type": "str"},
-            "fecha_fin": {"required": True, "type": "str"},
-            "condiciones": {
-                "required": False,
-                "type": "str",
-                "default": None,
+
+def _keep(value: Any) -> Any:
+    return value
+
+
+def _to_str(value: Any) -> Any:
+    return str(value) if value is not None else None
+
+
+def _to_uuid(value: Any) -> Any:
+    return UUID(value) if isinstance(value, str) else value
+
+
+def _to_date(value: Any) -> Any:
+    return parse_date(value) if value is not None else None
+
+
+def _parse_str(convert: Callable[[str], Any]) -> Callable[[Any], Any]:
+    return lambda value: convert(value) if isinstance(value, str) else value
+
+
+# Converts a value given by the user or the model into the field's Python type.
+# Numbers given for text fields (e.g. a telefono) become text, as asyncpg does not
+# convert them; each tool decides how to normalize strings.
+COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "UUID": _to_uuid,
+    "str": _to_str,
+    "date": _to_date,
+    "int": _parse_str(int),
+    "float": _parse_str(float),
+}
+
+
+def column_type_name(column: Column) -> str:
+    column_type = getattr(column.type, "impl_instance", column.type)
+    for sql_type, name in TYPE_NAMES:
+        if isinstance(column_type, sql_type):
+            return name
+    return str(column.type).lower()
+
+
+def registry_name(model_class: Type[SQLModel]) -> str:
+    """Registry name of a model: its class name in snake_case (DetalleVenta -> detalle_venta)."""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", model_class.__name__).lower()
+
+
+def _table_models() -> Dict[str, Type[SQLModel]]:
+    """Table models of models.py, in definition order, by registry name."""
+    return {
+        registry_name(value): value
+        for value in vars(models).values()
+        if isinstance(value, type)
+        and issubclass(value, SQLModel)
+        and value.__module__ == models.__name__
+        and hasattr(value, "__table__")
+    }
+
+
+def _field_info(
+    model_class: Type[SQLModel], column: Column, table_names: Dict[str, str]
+) -> Dict[str, Any]:
+    field = model_class.model_fields[column.name]
+    type_name = column_type_name(column)
+    info = {
+        "required": field.is_required(),
+        "type": type_name,
+        "coerce": COERCERS.get(type_name, _keep),
+    }
+    if not info["required"] and field.default_factory is None:
+        info["default"] = field.default
+
+    for foreign_key in column.foreign_keys:
+        target = foreign_key.column
+        info["foreign_key"] = f"{target.table.name}.{target.name}"
+        info["references"] = table_names[target.table.name]
+    return info
+
+
+def build_model_registry() -> Dict[str, Dict[str, Any]]:
+    """
+    Builds the registry from the table models and their SQLModel metadata, so it
+    can never drift from models.py. Each model has:
+        - "model": the SQLModel class
+        - "fields": field -> {"required", "type", "coerce" (value -> field type),
+          and "default" when there is one; "foreign_key" ("table.column") and
+          "references" (registry name of the target) for foreign keys}
+        - "relationships": the relationship names of the model
+    """
+    table_models = _table_models()
+    table_names = {
+        model_class.__table__.name: model_name
+        for model_name, model_class in table_models.items()
+    }
+    return {
+        model_name: {
+            "model": model_class,
+            "fields": {
+                column.name: _field_info(model_class, column, table_names)
+                for column in model_class.__table__.columns
             },
-        },
-        "relationships": ["detalles"],
-    },
-    "promocion_detalle": {
-        "model": PromocionDetalle,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},  # Added ID
-            "promocion_id": {"required": True, "type": "UUID"},
-            "insumo_id": {"required": True, "type": "UUID"},
-            "descuento": {"required": True, "type": "float"},
-        },
-        "relationships": [],
-    },
-    "concurso": {
-        "model": Concurso,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "descripcion": {"required": True, "type": "str"},
-            "fecha_inicio": {"required": True, "type": "str"},
-            "fecha_fin": {"required": True, "type": "str"},
-            "premio": {"required": True, "type": "str"},
-        },
-        "relationships": ["ganadores"],
-    },
-    "concurso_ganadores": {
-        "model": ConcursoGanadores,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},  # Added id
-            "concurso_id": {"required": True, "type": "UUID"},
-            "empleado_id": {"required": True, "type": "UUID"},
-        },
-        "relationships": [],
-    },
-    "meta_ventas": {
-        "model": MetaVentas,
-        "fields": {
-            "id": {"required": False, "type": "UUID"},
-            "tipo_empleado": {"required": True, "type": "str"},
-            "monto_venta": {"required": True, "type": "float"},
-            "bono_especial": {"required": True, "type": "float"},
-            "fecha_inicio": {"required": True, "type": "str"},
-            "fecha_fin": {"required": True, "type": "str"},
-        },
-        "relationships": [],
-    },
+            "relationships": list(inspect(model_class).relationships.keys()),
+        }
+        for model_name, model_class in table_models.items()
+    }
+
+
+MODEL_REGISTRY = build_model_registry()
+
+# Model class -> registry name
+MODEL_NAMES = {
+    model_info["model"]: model_name for model_name, model_info in MODEL_REGISTRY.items()
 }
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List, Optional
 from uuid import UUID, uuid4
 
@@ -56,10 +57,10 @@ class Empleado(SQLModel, table=True):
 
 class Venta(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    fecha: str
-    cliente_id: UUID = Field(foreign_key="cliente.id")
+    fecha: date = Field(index=True)
+    cliente_id: UUID = Field(foreign_key="cliente.id", index=True)
     monto: float
-    empleado_id: UUID = Field(foreign_key="empleado.id")
+    empleado_id: UUID = Field(foreign_key="empleado.id", index=True)
 
     # Relationships
     empleado: "Empleado" = Relationship(back_populates="ventas")
@@ -69,8 +70,8 @@ class Venta(SQLModel, table=True):
 
 class DetalleVenta(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)  # Added primary key
-    venta_id: UUID = Field(foreign_key="venta.id")
-    insumo_id: UUID = Field(foreign_key="insumo.id")
+    venta_id: UUID = Field(foreign_key="venta.id", index=True)
+    insumo_id: UUID = Field(foreign_key="insumo.id", index=True)
     cantidad: int
     precio: float
 
@@ -81,7 +82,7 @@ class DetalleVenta(SQLModel, table=True):
 
 class ClienteVisita(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)  # Added primary Key
-    cliente_id: UUID = Field(foreign_key="cliente.id")
+    cliente_id: UUID = Field(foreign_key="cliente.id", index=True)
     periodo_visita: str
 
     # Relationships
@@ -90,9 +91,9 @@ class ClienteVisita(SQLModel, table=True):
 
 class ClienteVisitaVenta(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    fecha: str
-    cliente_id: UUID = Field(foreign_key="cliente.id")
-    empleado_id: UUID = Field(foreign_key="empleado.id")
+    fecha: date = Field(index=True)
+    cliente_id: UUID = Field(foreign_key="cliente.id", index=True)
+    empleado_id: UUID = Field(foreign_key="empleado.id", index=True)
     observacion: Optional[str] = Field(default=None)
 
     # Relationships
@@ -104,8 +105,8 @@ class Promocion(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     linea: str
     titulo_promocion: str
-    fecha_inicio: str
-    fecha_fin: str
+    fecha_inicio: date = Field(index=True)
+    fecha_fin: date = Field(index=True)
     condiciones: Optional[str] = Field(default=None)
 
     # Relationships
@@ -114,8 +115,8 @@ class Promocion(SQLModel, table=True):
 
 class PromocionDetalle(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)  # Added primary key.
-    promocion_id: UUID = Field(foreign_key="promocion.id")
-    insumo_id: UUID = Field(foreign_key="insumo.id")
+    promocion_id: UUID = Field(foreign_key="promocion.id", index=True)
+    insumo_id: UUID = Field(foreign_key="insumo.id", index=True)
     descuento: float
 
     # Relationships
@@ -126,8 +127,8 @@ class PromocionDetalle(SQLModel, table=True):
 class Concurso(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     descripcion: str
-    fecha_inicio: str
-    fecha_fin: str
+    fecha_inicio: date = Field(index=True)
+    fecha_fin: date = Field(index=True)
     premio: str
 
     # Relationships
@@ -136,8 +137,8 @@ class Concurso(SQLModel, table=True):
 
 class ConcursoGanadores(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)  # Added primary key
-    concurso_id: UUID = Field(foreign_key="concurso.id")
-    empleado_id: UUID = Field(foreign_key="empleado.id")
+    concurso_id: UUID = Field(foreign_key="concurso.id", index=True)
+    empleado_id: UUID = Field(foreign_key="empleado.id", index=True)
 
     # Relationships
     concurso: "Concurso" = Relationship(back_populates="ganadores")
@@ -149,5 +150,5 @@ class MetaVentas(SQLModel, table=True):
     tipo_empleado: str
     monto_venta: float
     bono_especial: float
-    fecha_inicio: str
-    fecha_fin: str
+    fecha_inicio: date = Field(index=True)
+    fecha_fin: date = Field(index=True)
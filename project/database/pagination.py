@@ -0,0 +1,81 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.visitors import InternalTraversal
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) wrapper, used to read the planner's row estimate. Its
+    cache key is the one of the wrapped statement, so the compiled EXPLAIN of a
+    cached statement is reused too.
+    """
+
+    inherit_cache = True
+    _traverse_internals = [("statement", InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def page_size(limit: Any) -> int:
+    """
+    Normalizes the requested page size to the range [1, MAX_PAGE_SIZE].
+
+    Raises:
+        ValueError: If the limit is not an integer.
+    """
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(last_id: UUID) -> str:
+    """Builds the opaque token that points right after the given primary key."""
+    payload = json.dumps({"after": str(last_id)}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[UUID]:
+    """
+    Returns the primary key a page token points after, or None for the first page.
+
+    Raises:
+        ValueError: If the token was not produced by encode_cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return UUID(payload["after"])
+    except (TypeError, KeyError, ValueError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+
+async def estimate_row_count(
+    session: Any, query: Any, params: Optional[Dict[str, Any]] = None
+) -> Optional[int]:
+    """
+    Returns the planner's estimate of the rows matched by the query.
+    It never scans the table, so it is cheap even on very large tables.
+    'params' holds the values of the query's bound parameters, if any.
+    """
+    plan = (await session.exec(Explain(query), params=params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (TypeError, KeyError, IndexError):
+        return None
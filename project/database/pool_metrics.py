@@ -0,0 +1,157 @@
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import Pool, QueuePool
+from sqlalchemy.util.queue import Empty
+
+from project.core.tool_metrics import MetricsRegistry
+
+
+class PoolMetrics:
+    """
+    Counters of one connection pool: checkouts, new connections, invalidations and
+    the time callers waited for a connection. Together with the pool's live
+    numbers they show whether the pool is sized for the concurrent agent sessions.
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+        self._checked_out = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def attach(self, engine: Engine) -> None:
+        """Listens to the pool events of a (sync) engine."""
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(*_: Any) -> None:
+            self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def _on_checkout(*_: Any) -> None:
+            self.checkouts += 1
+            self._checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self._checked_out)
+
+        @event.listens_for(engine, "checkin")
+        def _on_checkin(*_: Any) -> None:
+            self.checkins += 1
+            self._checked_out = max(self._checked_out - 1, 0)
+
+        @event.listens_for(engine, "invalidate")
+        def _on_invalidate(*_: Any) -> None:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        """Returns the counters together with the current state of the pool."""
+        stats = {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "peak_checked_out": self.peak_checked_out,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "wait_seconds_avg": (
+                round(self.wait_seconds_total / self.checkouts, 6)
+                if self.checkouts
+                else 0.0
+            ),
+        }
+        # Queue-based pools report their size and overflow; others do not
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        return stats
+
+
+# Prometheus name, type and help of each pool_stats() value
+PROMETHEUS_POOL_METRICS = {
+    "connects": ("db_pool_connects_total", "counter", "New DBAPI connections."),
+    "checkouts": ("db_pool_checkouts_total", "counter", "Connection checkouts."),
+    "checkins": ("db_pool_checkins_total", "counter", "Connection checkins."),
+    "invalidations": (
+        "db_pool_invalidations_total",
+        "counter",
+        "Invalidated connections.",
+    ),
+    "wait_seconds_total": (
+        "db_pool_wait_seconds_total",
+        "counter",
+        "Time checkouts spent waiting for a free connection.",
+    ),
+    "wait_seconds_max": (
+        "db_pool_wait_seconds_max",
+        "gauge",
+        "Longest wait for a free connection.",
+    ),
+    "peak_checked_out": (
+        "db_pool_peak_checked_out",
+        "gauge",
+        "Most connections checked out at once.",
+    ),
+    "size": ("db_pool_size", "gauge", "Configured pool size."),
+    "checkedin": ("db_pool_checked_in", "gauge", "Idle connections in the pool."),
+    "checkedout": ("db_pool_checked_out", "gauge", "Connections in use."),
+    "overflow": ("db_pool_overflow", "gauge", "Connections above the pool size."),
+}
+
+
+def register_pool_metrics(
+    registry: MetricsRegistry, pool_stats: Callable[[], Dict[str, Dict[str, Any]]]
+) -> None:
+    """Exports the values of pool_stats() through registry, labeled by engine."""
+
+    def read(key: str) -> Dict[Tuple[str, ...], float]:
+        return {
+            (engine,): values[key]
+            for engine, values in pool_stats().items()
+            if key in values
+        }
+
+    for key, (name, kind, help) in PROMETHEUS_POOL_METRICS.items():
+        registry.callback(name, kind, help, ("engine",), partial(read, key))
+
+
+def timed_pool_class(
+    pool_class: Type[QueuePool], metrics: PoolMetrics
+) -> Type[QueuePool]:
+    """
+    Returns a subclass of pool_class that records in metrics how long checkouts
+    waited for a connection to be returned to the pool. Only checkouts that find
+    no free connection are timed, and not the opening of new connections. Pools
+    keep their class when an engine recreates them, so the timing survives
+    engine.dispose().
+    """
+
+    class TimedQueue(pool_class._queue_class):
+        def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+            # Without 'block' the queue does not wait: the pool opens a connection
+            if not block:
+                return super().get(block, timeout)
+            # A connection already free is no wait
+            try:
+                return super().get(False)
+            except Empty:
+                pass
+            started = time.perf_counter()
+            try:
+                return super().get(block, timeout)
+            finally:
+                metrics.record_wait(time.perf_counter() - started)
+
+    class TimedPool(pool_class):
+        _queue_class = TimedQueue
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
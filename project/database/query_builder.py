@@ -0,0 +1,260 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, bindparam, cast
+from sqlmodel import select
+
+from project.database.model_registry import MODEL_REGISTRY
+from project.utils.utils import normalize_text, normalized_sql
+
+OPERATORS = (
+    "eq",
+    "neq",
+    "gt",
+    "gte",
+    "lt",
+    "lte",
+    "between",
+    "like",
+    "starts_with",
+    "ends_with",
+)
+PATTERN_OPERATORS = {
+    "like": "%{}%",
+    "starts_with": "{}%",
+    "ends_with": "%{}",
+}
+
+NULL_OPERATORS = ("is_null", "is_not_null")
+
+# A filter shape is the sequence of (field, operator) pairs of a query; the values
+# are bound parameters, so every query with the same shape shares one statement.
+Shape = Tuple[Tuple[str, str], ...]
+
+
+def _to_text(value: Any) -> Any:
+    return normalize_text(str(value)) if value is not None else None
+
+
+class FieldMeta:
+    """Precomputed facts about one registry field, resolved once at import."""
+
+    __slots__ = ("name", "type", "is_string", "is_numeric", "convert", "coerce")
+
+    def __init__(self, name: str, field_info: Dict[str, Any]):
+        self.name = name
+        self.type = field_info["type"]
+        self.is_string = self.type == "str"
+        self.is_numeric = self.type in ("int", "float")
+        # Values written to the column
+        self.convert = field_info["coerce"]
+        # Strings are compared against the normalized column, so they are normalized too
+        self.coerce = _to_text if self.is_string else self.convert
+
+
+class ModelMeta:
+    """Registry entry of a model with its field metadata ready for query building."""
+
+    __slots__ = ("name", "model_class", "fields")
+
+    def __init__(self, name: str, model_info: Dict[str, Any]):
+        self.name = name
+        self.model_class = model_info["model"]
+        self.fields = {
+            field_name: FieldMeta(field_name, field_info)
+            for field_name, field_info in model_info["fields"].items()
+        }
+
+
+MODEL_META: Dict[str, ModelMeta] = {
+    model_name: ModelMeta(model_name, model_info)
+    for model_name, model_info in MODEL_REGISTRY.items()
+}
+
+
+def prepare_conditions(
+    model_meta: ModelMeta, conditions: List[Dict[str, Any]], prefix: str = "c"
+) -> Tuple[Shape, Dict[str, Any]]:
+    """
+    Validates conditions and splits them into their shape and their bound values.
+
+    Raises:
+        ValueError: If a field or operator is unknown or a value cannot be converted.
+    """
+    shape = []
+    params = {}
+    for index, condition in enumerate(conditions):
+        field = condition.get("field")
+        operator = condition.get("operator")
+        value = condition.get("value")
+
+        field_meta = model_meta.fields.get(field)
+        if field_meta is None:
+            raise ValueError(f"Invalid field '{field}'")
+        if operator not in OPERATORS:
+            raise ValueError(f"Invalid operator '{operator}'")
+
+        name = f"{prefix}{index}"
+        try:
+            if operator == "between":
+                if not isinstance(value, (list, tuple)) or len(value) != 2:
+                    raise ValueError("'between' needs a [start, end] value")
+                params[name] = field_meta.coerce(value[0])
+                params[f"{name}_end"] = field_meta.coerce(value[1])
+            elif operator in PATTERN_OPERATORS:
+                params[name] = PATTERN_OPERATORS[operator].format(_to_text(value))
+            elif value is None and operator in ("eq", "neq"):
+                # NULL checks cannot be bound parameters: they change the shape
+                operator = "is_null" if operator == "eq" else "is_not_null"
+            else:
+                params[name] = field_meta.coerce(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for field '{field}': {str(e)}") from e
+
+        shape.append((field, operator))
+
+    return tuple(shape), params
+
+
+def condition_clauses(
+    model_meta: ModelMeta,
+    shape: Shape,
+    entity: Any = None,
+    prefix: str = "c",
+    params: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """
+    Builds the WHERE clauses of a shape with named bound parameters, holding
+    the values of 'params' when given (for statements that are not cached).
+    Strings compare against the normalized column; pattern operators on
+    non-string columns compare their text. 'entity' may be an aliased class.
+    """
+    entity = entity if entity is not None else model_meta.model_class
+
+    def bind(name: str) -> Any:
+        return bindparam(name, params[name]) if params is not None else bindparam(name)
+
+    clauses = []
+    for index, (field, operator) in enumerate(shape):
+        field_meta = model_meta.fields[field]
+        column = getattr(entity, field)
+        if field_meta.is_string:
+            column = normalized_sql(column)
+        elif operator in PATTERN_OPERATORS:
+            column = cast(column, String)
+
+        param = bind(f"{prefix}{index}") if operator not in NULL_OPERATORS else None
+        match operator:
+            case "eq":
+                clauses.append(column == param)
+            case "neq":
+                clauses.append(column != param)
+            case "gt":
+                clauses.append(column > param)
+            case "gte":
+                clauses.append(column >= param)
+            case "lt":
+                clauses.append(column < param)
+            case "lte":
+                clauses.append(column <= param)
+            case "between":
+                clauses.append(column.between(param, bind(f"{prefix}{index}_end")))
+            case "like" | "starts_with" | "ends_with":
+                clauses.append(column.like(param))
+            case "is_null":
+                clauses.append(getattr(entity, field).is_(None))
+            case "is_not_null":
+                clauses.append(getattr(entity, field).is_not(None))
+    return clauses
+
+
+class StatementCache:
+    """LRU cache of built statements, keyed by model and filter shape."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        statement = self._statements.get(key)
+        if statement is not None:
+            self.hits += 1
+            self._statements.move_to_end(key)
+            return statement
+
+        self.misses += 1
+        statement = build()
+        self._statements[key] = statement
+        if len(self._statements) > self.maxsize:
+            self._statements.popitem(last=False)
+        return statement
+
+
+statement_cache = StatementCache()
+
+
+def filtered_statement(model_meta: ModelMeta, shape: Shape) -> Any:
+    """SELECT of the model filtered by the shape, without ordering or limit."""
+    return statement_cache.get_or_build(
+        ("filtered", model_meta.name, shape),
+        lambda: select(model_meta.model_class).where(
+            *condition_clauses(model_meta, shape)
+        ),
+    )
+
+
+def projection(model_meta: ModelMeta, fields: Any = None) -> Tuple[str, ...]:
+    """
+    Validates the fields requested by a tool: a list of field names, or a single
+    name. Every field of the model when none are given.
+
+    Raises:
+        ValueError: If a field does not exist in the model.
+    """
+    if not fields:
+        return tuple(model_meta.fields)
+    if isinstance(fields, str):
+        fields = [fields]
+
+    invalid_fields = [field for field in fields if field not in model_meta.fields]
+    if invalid_fields:
+        raise ValueError(
+            f"Invalid fields for {model_meta.name}: {', '.join(map(str, invalid_fields))}. "
+            f"Available: {', '.join(model_meta.fields)}"
+        )
+    return tuple(dict.fromkeys(fields))
+
+
+def page_statement(
+    model_meta: ModelMeta,
+    shape: Shape,
+    after_cursor: bool,
+    fields: Tuple[str, ...],
+) -> Any:
+    """
+    Keyset page of the filtered rows, ordered by primary key. Only the columns of
+    'fields' are selected, plus 'id' for the cursor, so no model is hydrated.
+    Binds 'limit' and, when after_cursor is True, 'after' (last id of the previous page).
+    """
+
+    def build() -> Any:
+        model_class = model_meta.model_class
+        columns = fields if "id" in fields else ("id", *fields)
+        statement = select(*(getattr(model_class, field) for field in columns)).where(
+            *condition_clauses(model_meta, shape)
+        )
+        if after_cursor:
+            statement = statement.where(model_class.id > bindparam("after"))
+        return statement.order_by(model_class.id).limit(
+            bindparam("limit", type_=Integer)
+        )
+
+    return statement_cache.get_or_build(
+        ("page", model_meta.name, shape, after_cursor, fields), build
+    )
+
+
+def get_model_meta(model_name: Optional[str]) -> Optional[ModelMeta]:
+    return MODEL_META.get(model_name.lower()) if model_name else None
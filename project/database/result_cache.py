@@ -0,0 +1,143 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+from project.core.settings import get_settings
+from project.core.tool_metrics import MetricsRegistry, tool_metrics
+from project.database.events import on_table_write
+
+# Returned by ResultCache.get() on a miss, as None can be a cached result
+MISSING = object()
+
+# Prometheus name, type and help of each stats() value
+PROMETHEUS_CACHE_METRICS = {
+    "hits": ("result_cache_hits_total", "counter", "Tool results served from cache."),
+    "misses": ("result_cache_misses_total", "counter", "Tool result cache misses."),
+    "size": ("result_cache_entries", "gauge", "Tool results in the cache."),
+}
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Builds a key from normalized call arguments. Dict keys are sorted, so the same
+    criteria in a different order hit the same entry.
+    """
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+class ResultCache:
+    """
+    Read-through LRU cache of tool results with a time-to-live. Each entry is
+    tagged with the tables it read, and a write to any of them drops it, so a
+    result is never served after the data behind it changed in this process.
+
+    A write also bumps the generation of its table. A caller takes generation()
+    before running its query and passes it to set(), which discards the result
+    if a write committed meanwhile: that result may hold the old data, and would
+    otherwise be stored right after the invalidation meant to remove it.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        # None reads the value from the settings on the first store
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[float, FrozenSet[str], Any]] = (
+            OrderedDict()
+        )
+        self._generations: Dict[str, int] = {}
+        # Bumped by invalidate() without a table, which concerns every table
+        self._epoch = 0
+
+    def generation(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """The current generation of the tables, to pass to set()."""
+        return (
+            self._epoch,
+            *(self._generations.get(table, 0) for table in sorted(tables)),
+        )
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached result, or MISSING if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def set(
+        self,
+        key: Hashable,
+        tables: Iterable[str],
+        value: Any,
+        generation: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        """
+        Stores a result, tagged with the MODEL_REGISTRY names of the tables it read.
+        With the generation() taken before the query, the result is not stored if
+        one of the tables was written since.
+        """
+        tables = frozenset(tables)
+        if generation is not None and generation != self.generation(tables):
+            return
+        if self.maxsize is None or self.ttl is None:
+            settings = get_settings()
+            self.maxsize = (
+                settings.RESULT_CACHE_SIZE if self.maxsize is None else self.maxsize
+            )
+            self.ttl = (
+                settings.RESULT_CACHE_TTL_SECONDS if self.ttl is None else self.ttl
+            )
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, model_name: Optional[str] = None) -> None:
+        """Drops every result that read the table, or every result."""
+        if model_name is None:
+            self._epoch += 1
+            self._entries.clear()
+            return
+
+        self._generations[model_name] = self._generations.get(model_name, 0) + 1
+
+        for key in [
+            key for key, entry in self._entries.items() if model_name in entry[1]
+        ]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        """Exports stats() through registry, read each time it is rendered."""
+        for key, (name, kind, help) in PROMETHEUS_CACHE_METRICS.items():
+            registry.callback(
+                name, kind, help, (), lambda key=key: {(): self.stats()[key]}
+            )
+
+
+result_cache = ResultCache()
+
+# The cache metrics are exported with the tool metrics
+result_cache.register_metrics(tool_metrics.registry)
+
+
+@on_table_write
+def _invalidate_results(model_name: str, *_: Any) -> None:
+    result_cache.invalidate(model_name)
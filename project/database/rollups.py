@@ -0,0 +1,399 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    Float,
+    FromClause,
+    Integer,
+    Join,
+    MetaData,
+    Select,
+    String,
+    Table,
+    Uuid,
+    delete,
+    func,
+    select,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql import visitors
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from project.database.models import DetalleVenta, Venta
+
+# Keys recomputed per statement by an incremental refresh
+REFRESH_CHUNK_KEYS = 500
+# Advisory lock serializing full rebuilds against the writes that maintain the
+# rollups: writers take it shared, a rebuild exclusive. Writers are serialized
+# among themselves by per-key locks (Rollup.lock_keys).
+ROLLUP_LOCK_ID = 7_301_001
+
+
+class Rollup:
+    """
+    A table of daily sales totals, materialized from the base tables. 'keys' and
+    'measures' are the source expressions of its columns, in column order; the
+    rows are 'measures' grouped by 'keys' over 'from_clause'. 'sources' maps each
+    model whose writes change the totals to its id column.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        from_clause: FromClause,
+        keys: Sequence[Any],
+        measures: Sequence[Any],
+        sources: Dict[str, Any],
+    ):
+        self.table = table
+        self.from_clause = from_clause
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self.sources = sources
+        self.key_columns = list(table.primary_key.columns)
+        # Columns of each source table the rows depend on, by model name
+        self.columns = {
+            model_name: self._columns_of(id_column.table) | {id_column.name}
+            for model_name, id_column in sources.items()
+        }
+
+    def _columns_of(self, table: Table) -> Set[str]:
+        clauses = [*self.keys, *self.measures]
+        if isinstance(self.from_clause, Join):
+            clauses.append(self.from_clause.onclause)
+        names = set()
+        for clause in clauses:
+            for element in visitors.iterate(clause.__clause_element__()):
+                if isinstance(element, Column) and element.table is table:
+                    names.add(element.name)
+        return names
+
+    def source(self, *where: Any) -> Select:
+        return (
+            select(*self.keys, *self.measures)
+            .select_from(self.from_clause)
+            .where(*where)
+            .group_by(*self.keys)
+        )
+
+    def _upsert(self, *where: Any) -> Any:
+        statement = insert(self.table).from_select(
+            [column.name for column in self.table.columns], self.source(*where)
+        )
+        return statement.on_conflict_do_update(
+            index_elements=self.key_columns,
+            set_={
+                column.name: statement.excluded[column.name]
+                for column in self.table.columns
+                if not column.primary_key
+            },
+        )
+
+    def lock_keys(self, keys: Select) -> Select:
+        """
+        Takes an exclusive transaction lock on each key of 'keys', in key order so
+        that writers locking overlapping keys do not deadlock. Under READ
+        COMMITTED, a writer that waited recomputes the totals with the rows of
+        the one it waited for, instead of overwriting them with older totals.
+        """
+        ordered = keys.order_by(*keys.selected_columns).subquery()
+        lock = func.pg_advisory_xact_lock(
+            func.hashtext(self.table.name),
+            func.hashtext(func.concat_ws("|", *ordered.c)),
+        )
+        return select(func.count(lock)).select_from(ordered)
+
+    def _listed_keys(self, keys: List[Tuple]) -> Select:
+        listed = values(
+            *[Column(column.name, column.type) for column in self.key_columns],
+            name="listed_keys",
+        ).data(keys)
+        return select(*listed.c).distinct()
+
+    def _delete_vanished(self, *where: Any) -> Any:
+        """Deletes the rows among 'where' whose key no longer has base rows."""
+        in_source = (
+            select(*self.keys)
+            .select_from(self.from_clause)
+            .where(*[key == column for key, column in zip(self.keys, self.key_columns)])
+            .exists()
+        )
+        return delete(self.table).where(*where, ~in_source)
+
+    async def refresh(
+        self, session: AsyncSession, keys: Optional[List[Tuple]] = None
+    ) -> None:
+        """
+        Recomputes the rows of some keys from the base tables, or every row. A
+        refresh of some keys locks them first (lock_keys); one of every row must
+        hold lock_rollups exclusive.
+        """
+        if keys is None:
+            await session.exec(self._delete_vanished())
+            await session.exec(self._upsert())
+            return
+
+        # Sorted before chunking, so the locks are taken in key order across
+        # chunks too
+        keys = sorted(keys)
+        for start in range(0, len(keys), REFRESH_CHUNK_KEYS):
+            chunk = keys[start : start + REFRESH_CHUNK_KEYS]
+            await session.exec(self.lock_keys(self._listed_keys(chunk)))
+            await session.exec(
+                self._delete_vanished(tuple_(*self.key_columns).in_(chunk))
+            )
+            await session.exec(self._upsert(tuple_(*self.keys).in_(chunk)))
+
+    async def refresh_changed(
+        self, session: AsyncSession, model_name: str, changed: Table
+    ) -> None:
+        """
+        Recomputes the rows that the records in 'changed', a table of versions of
+        records of 'model_name' (see track_changes), contribute to. The keys are
+        resolved in SQL: nothing is loaded, whatever the number of records.
+        """
+        keys = self._keys_over(self.sources[model_name].table, changed)
+        await session.exec(self.lock_keys(keys))
+        await session.exec(self._delete_vanished(tuple_(*self.key_columns).in_(keys)))
+        await session.exec(self._upsert(tuple_(*self.keys).in_(keys)))
+
+    async def affected_keys(
+        self, session: AsyncSession, model_name: str, ids: List[Any]
+    ) -> List[Tuple]:
+        """Keys of the rows that records of 'model_name' contribute to."""
+        id_column = self.sources[model_name]
+        keys = set()
+        for start in range(0, len(ids), REFRESH_CHUNK_KEYS):
+            query = (
+                select(*self.keys)
+                .select_from(self.from_clause)
+                .where(id_column.in_(ids[start : start + REFRESH_CHUNK_KEYS]))
+                .distinct()
+            )
+            keys.update(tuple(row) for row in (await session.exec(query)).all())
+        return list(keys)
+
+    def _keys_over(self, table: Table, rows: FromClause) -> Select:
+        """The distinct keys of the rollup, with 'rows' in place of 'table'."""
+
+        def replace(element: Any) -> Any:
+            if element is table:
+                return rows
+            if isinstance(element, Column) and element.table is table:
+                return rows.c[element.name]
+            return None
+
+        keys = [
+            visitors.replacement_traverse(key.__clause_element__(), {}, replace)
+            for key in self.keys
+        ]
+        from_clause = visitors.replacement_traverse(self.from_clause, {}, replace)
+        return select(*keys).select_from(from_clause).distinct()
+
+
+def _sales_table(name: str, key: str) -> Table:
+    return Table(
+        name,
+        SQLModel.metadata,
+        Column(key, Uuid, primary_key=True),
+        Column("fecha", Date, primary_key=True, index=True),
+        Column("ventas", Integer, nullable=False),
+        Column("monto", Float, nullable=False),
+    )
+
+
+_detalle_with_fecha = DetalleVenta.__table__.join(
+    Venta.__table__, DetalleVenta.venta_id == Venta.id
+)
+
+# Rollups by the registry name of the model they are keyed by
+ROLLUPS: Dict[str, Rollup] = {
+    "empleado": Rollup(
+        _sales_table("rollup_ventas_empleado_dia", "empleado_id"),
+        Venta.__table__,
+        keys=(Venta.empleado_id, Venta.fecha),
+        measures=(func.count(), func.sum(Venta.monto)),
+        sources={"venta": Venta.id},
+    ),
+    "cliente": Rollup(
+        _sales_table("rollup_ventas_cliente_dia", "cliente_id"),
+        Venta.__table__,
+        keys=(Venta.cliente_id, Venta.fecha),
+        measures=(func.count(), func.sum(Venta.monto)),
+        sources={"venta": Venta.id},
+    ),
+    "insumo": Rollup(
+        Table(
+            "rollup_insumo_dia",
+            SQLModel.metadata,
+            Column("insumo_id", Uuid, primary_key=True),
+            Column("fecha", Date, primary_key=True, index=True),
+            Column("lineas", Integer, nullable=False),
+            Column("cantidad", Integer, nullable=False),
+            Column("importe", Float, nullable=False),
+        ),
+        _detalle_with_fecha,
+        keys=(DetalleVenta.insumo_id, Venta.fecha),
+        measures=(
+            func.count(),
+            func.sum(DetalleVenta.cantidad),
+            func.sum(DetalleVenta.cantidad * DetalleVenta.precio),
+        ),
+        sources={"venta": Venta.id, "detalle_venta": DetalleVenta.id},
+    ),
+}
+
+# Rollups that must be rebuilt from scratch. A missing row counts as stale, so a
+# new database, or a new rollup, is built on first use.
+rollup_state = Table(
+    "rollup_state",
+    SQLModel.metadata,
+    Column("name", String, primary_key=True),
+    Column("stale", Boolean, nullable=False),
+)
+
+
+async def _set_stale(session: AsyncSession, names: List[str], stale: bool) -> None:
+    statement = insert(rollup_state).values(
+        [{"name": name, "stale": stale} for name in names]
+    )
+    await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=[rollup_state.c.name],
+            set_={"stale": statement.excluded.stale},
+        )
+    )
+
+
+async def lock_rollups(session: AsyncSession, exclusive: bool = False) -> None:
+    """
+    Takes the rollup lock until the end of the transaction. Writes that maintain
+    the rollups take it shared, before their first statement; a full rebuild
+    takes it exclusive, so it waits for them and they wait for it. Writes of the
+    same (key, day) rows also wait for each other, on the locks of the keys.
+    """
+    lock = (
+        func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    )
+    await session.exec(select(lock(ROLLUP_LOCK_ID)))
+
+
+def rollups_fed_by(
+    model_name: str, fields: Optional[Iterable[str]] = None
+) -> List[Rollup]:
+    """
+    The rollups fed by a model, or, given the fields an update sets, those of them
+    that depend on one of the fields.
+    """
+    rollups = [rollup for rollup in ROLLUPS.values() if model_name in rollup.sources]
+    if fields is None:
+        return rollups
+    fields = set(fields)
+    return [rollup for rollup in rollups if fields & rollup.columns[model_name]]
+
+
+def tracked_columns(model_name: str, rollups: List[Rollup]) -> List[str]:
+    """Columns of the model that the rollups depend on, the id included."""
+    return sorted(set().union(*(rollup.columns[model_name] for rollup in rollups)))
+
+
+async def refresh_rollups(
+    session: AsyncSession, rows_by_model: Dict[str, List[Dict[str, Any]]]
+) -> None:
+    """
+    Updates the rollups for newly inserted rows, in the transaction that inserts
+    them, after lock_rollups: only the (key, day) rows the new records fall in
+    are recomputed.
+    """
+    for rollup in ROLLUPS.values():
+        keys = set()
+        for model_name, rows in rows_by_model.items():
+            if model_name in rollup.sources:
+                ids = [row["id"] for row in rows]
+                keys.update(await rollup.affected_keys(session, model_name, ids))
+        if keys:
+            await rollup.refresh(session, list(keys))
+
+
+def changed_rows_table(model_name: str, rollups: List[Rollup]) -> Table:
+    """
+    Temporary table, dropped on commit, for versions of the records of a model
+    that a write changes: the columns the rollups depend on (tracked_columns).
+    """
+    source = rollups[0].sources[model_name].table
+    return Table(
+        f"rollup_changed_{model_name}",
+        MetaData(),
+        *[
+            Column(name, source.c[name].type)
+            for name in tracked_columns(model_name, rollups)
+        ],
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+async def track_changes(
+    session: AsyncSession, model_name: str, rollups: List[Rollup]
+) -> Table:
+    """
+    Creates the changed_rows_table() of a write, after lock_rollups. The write
+    fills it from its RETURNING rows in the same statement, e.g.
+    WITH changed AS (DELETE ... RETURNING ...) INSERT INTO it SELECT ..., and
+    refresh_changed() then updates the rollups from it.
+    """
+    changed = changed_rows_table(model_name, rollups)
+    await session.exec(CreateTable(changed))
+    return changed
+
+
+async def refresh_changed(
+    session: AsyncSession, model_name: str, rollups: List[Rollup], changed: Table
+) -> None:
+    """
+    Updates the rollups for the updated or deleted records in 'changed', in the
+    transaction that writes them: the (key, day) rows of both their old and new
+    versions are recomputed, with two statements per rollup.
+    """
+    for rollup in rollups:
+        await rollup.refresh_changed(session, model_name, changed)
+
+
+async def mark_rollups_stale(session: AsyncSession, rollups: List[Rollup]) -> None:
+    """
+    Flags rollups for a rebuild on their next read, in the transaction of a
+    write whose rows are not tracked, such as one without filters: rebuilding
+    every row once is cheaper than tracking them all.
+    """
+    names = [name for name, rollup in ROLLUPS.items() if rollup in rollups]
+    await _set_stale(session, names, True)
+
+
+async def ensure_rollups_fresh(session: AsyncSession) -> List[str]:
+    """
+    Rebuilds the stale rollups and commits. Returns the names of those rebuilt.
+    """
+
+    async def stale_rollups() -> List[str]:
+        states = dict((await session.exec(select(rollup_state))).all())
+        return [name for name in ROLLUPS if states.get(name, True)]
+
+    if not await stale_rollups():
+        return []
+
+    # Concurrent readers rebuild one at a time; those that waited find the
+    # rollups fresh
+    await lock_rollups(session, exclusive=True)
+    stale = await stale_rollups()
+    for name in stale:
+        await ROLLUPS[name].refresh(session)
+    if stale:
+        await _set_stale(session, stale, False)
+    await session.commit()
+    return stale
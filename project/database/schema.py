@@ -0,0 +1,112 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import inspect
+
+from project.core.json_codec import encode_json
+from project.database.model_registry import MODEL_NAMES, MODEL_REGISTRY
+
+
+@lru_cache(maxsize=None)
+def table_schemas() -> Dict[str, Dict[str, Any]]:
+    """
+    Compact description of every MODEL_REGISTRY table, built once:
+        - "fields": field -> type, with a trailing "?" when the field is optional
+          (it has a default or accepts null)
+        - "fk": foreign key field -> referenced model
+        - "rel": relationship -> related model, with a trailing "[]" when it
+          holds several records
+    """
+    schemas = {}
+    for model_name, model_info in MODEL_REGISTRY.items():
+        fields_info = model_info["fields"]
+        fields = {
+            field_name: field_info["type"] + ("" if field_info["required"] else "?")
+            for field_name, field_info in fields_info.items()
+        }
+        foreign_keys = {
+            field_name: field_info["references"]
+            for field_name, field_info in fields_info.items()
+            if "references" in field_info
+        }
+        relationships = {
+            relationship.key: MODEL_NAMES[relationship.mapper.class_]
+            + ("[]" if relationship.uselist else "")
+            for relationship in inspect(model_info["model"]).relationships
+            if relationship.mapper.class_ in MODEL_NAMES
+        }
+
+        schemas[model_name] = {"fields": fields}
+        if foreign_keys:
+            schemas[model_name]["fk"] = foreign_keys
+        if relationships:
+            schemas[model_name]["rel"] = relationships
+    return schemas
+
+
+@lru_cache(maxsize=None)
+def _encoded_table_schemas() -> Dict[str, str]:
+    return {
+        model_name: encode_json(schema)
+        for model_name, schema in table_schemas().items()
+    }
+
+
+@lru_cache(maxsize=None)
+def _encoded_schema() -> str:
+    return _join_encoded(_encoded_table_schemas().items())
+
+
+def _join_encoded(items: Iterable) -> str:
+    return (
+        "{" + ",".join(f"{json.dumps(name)}:{encoded}" for name, encoded in items) + "}"
+    )
+
+
+def table_names(tables: Optional[Iterable[Any]] = None) -> List[str]:
+    """
+    The registry names of the requested tables, lowercased and without repeats;
+    every table when none are requested.
+
+    Raises:
+        ValueError: If a requested table is not in MODEL_REGISTRY.
+    """
+    if not tables:
+        return list(MODEL_REGISTRY)
+    names = list(dict.fromkeys(str(name).lower() for name in tables))
+    unknown = [name for name in names if name not in MODEL_REGISTRY]
+    if unknown:
+        raise ValueError(
+            f"Model not found: {', '.join(unknown)}. "
+            f"Available models: {', '.join(MODEL_REGISTRY)}"
+        )
+    return names
+
+
+def encode_schema(
+    tables: Optional[Iterable[str]] = None,
+    row_counts: Optional[Dict[str, int]] = None,
+) -> str:
+    """
+    Returns the compact schema as a JSON string, optionally limited to some tables
+    (see table_names).
+    The table descriptions are encoded once and reused; only 'row_counts' (model
+    name -> estimated rows, added as "rows") is encoded per call.
+
+    Raises:
+        ValueError: If a requested table is not in MODEL_REGISTRY.
+    """
+    if not tables and row_counts is None:
+        return _encoded_schema()
+
+    encoded = _encoded_table_schemas()
+    names = table_names(tables)
+    if row_counts is None:
+        return _join_encoded((name, encoded[name]) for name in names)
+
+    # Splice "rows" into the pre-encoded object instead of re-encoding it
+    return _join_encoded(
+        (name, f'{encoded[name][:-1]},"rows":{int(row_counts.get(name) or 0)}}}')
+        for name in names
+    )
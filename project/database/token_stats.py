@@ -0,0 +1,97 @@
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from project.core.json_codec import encode_json
+from project.core.tool_metrics import BYTES_PER_TOKEN
+from project.database.events import on_table_write
+from project.database.exporter import DEFAULT_MAX_BYTES
+from project.database.model_registry import MODEL_REGISTRY
+from project.database.pagination import estimate_row_count
+
+DEFAULT_SAMPLE_SIZE = 200
+
+
+class TokenEstimator:
+    """
+    Estimates the tokens of a full-database snapshot without scanning tables or
+    calling a remote tokenizer. Each table contributes its planner row count times
+    the average encoded size of a sample of its rows. Both numbers are cached per
+    table until a write tool touches that table.
+    """
+
+    def __init__(self, sample_size: int = DEFAULT_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._table_stats: Dict[str, Tuple[int, float]] = {}
+
+    def invalidate(self, model_name: Optional[str] = None) -> None:
+        """Drops the cached stats of one table, or of every table."""
+        if model_name is None:
+            self._table_stats.clear()
+        else:
+            self._table_stats.pop(model_name, None)
+
+    async def table_stats(
+        self, session: AsyncSession, model_name: str
+    ) -> Tuple[int, float]:
+        """Returns (estimated row count, average encoded row size in bytes)."""
+        if model_name in self._table_stats:
+            return self._table_stats[model_name]
+
+        model_info = MODEL_REGISTRY[model_name]
+        model_class = model_info["model"]
+        fields = list(model_info["fields"].keys())
+        columns = [getattr(model_class, field) for field in fields]
+
+        row_count = await estimate_row_count(session, select(*columns)) or 0
+        sample = (await session.exec(select(*columns).limit(self.sample_size))).all()
+        avg_row_bytes = (
+            sum(
+                len(
+                    encode_json(
+                        {"_table": model_name, **dict(zip(fields, row))}
+                    ).encode()
+                )
+                + 1
+                for row in sample
+            )
+            / len(sample)
+            if sample
+            else 0.0
+        )
+
+        self._table_stats[model_name] = (row_count, avg_row_bytes)
+        return row_count, avg_row_bytes
+
+    async def estimate(self, session: AsyncSession) -> Dict[str, Any]:
+        """
+        Returns the estimated tokens of the whole database, whether they exceed the
+        byte budget of get_full_database (which then truncates its snapshot at
+        "budget_tokens"), and the per-table breakdown.
+        """
+        tables = {}
+        total_bytes = 0.0
+        for model_name in MODEL_REGISTRY:
+            row_count, avg_row_bytes = await self.table_stats(session, model_name)
+            table_bytes = row_count * avg_row_bytes
+            total_bytes += table_bytes
+            tables[model_name] = {
+                "rows": row_count,
+                "tokens": round(table_bytes / BYTES_PER_TOKEN),
+            }
+
+        return {
+            "tokens": round(total_bytes / BYTES_PER_TOKEN),
+            "budget_tokens": round(DEFAULT_MAX_BYTES / BYTES_PER_TOKEN),
+            "exceeds_budget": total_bytes > DEFAULT_MAX_BYTES,
+            "tables": tables,
+        }
+
+
+token_estimator = TokenEstimator()
+
+
+@on_table_write
+def _invalidate_token_stats(model_name: str, *_: Any) -> None:
+    token_estimator.invalidate(model_name)
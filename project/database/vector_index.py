@@ -0,0 +1,380 @@
+import asyncio
+import hashlib
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol, Set, Tuple
+
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from project.core.settings import get_settings
+from project.database.events import on_table_write
+from project.database.fuzzy_index import DEFAULT_MATCHES, trigrams
+from project.database.model_registry import MODEL_REGISTRY
+from project.utils.utils import normalize_texts
+
+# numpy is imported where the vectors are built, so importing the app does not load it
+if TYPE_CHECKING:
+    import numpy as np
+
+# Free-text fields embedded for semantic search, per model; the values of a record
+# are joined into one document
+SEMANTIC_FIELDS: Dict[str, List[str]] = {
+    "insumo": ["descripcion", "presentacion", "linea", "sublinea"],
+    "promocion": ["titulo_promocion", "condiciones"],
+}
+
+SYNC_CHUNK_ROWS = 5000
+# Changed tables are written to disk at most this often, and by flush()
+SAVE_INTERVAL_SECONDS = 30.0
+
+
+class Embedder(Protocol):
+    """Turns texts into L2-normalized vectors. 'name' identifies the vector space."""
+
+    name: str
+    dimension: int
+
+    def __call__(self, texts: List[str]) -> "np.ndarray": ...
+
+
+class HashingEmbedder:
+    """
+    Local embedder that needs no model or network: the words and character trigrams
+    of the normalized text are hashed into a fixed number of signed dimensions.
+    It captures shared vocabulary and near spellings, not synonyms; plug in a real
+    embedding model with VectorIndex.set_embedder() for that.
+    """
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def __call__(self, texts: List[str]) -> "np.ndarray":
+        import numpy as np
+
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(normalize_texts(texts)):
+            for feature in [*text.split(), *trigrams(text)]:
+                digest = zlib.crc32(feature.encode())
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                matrix[row, digest % self.dimension] += sign
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+def _document(values: Tuple[Any, ...]) -> str:
+    return " ".join(str(value) for value in values if value)
+
+
+def _content_hash(document: str) -> str:
+    return hashlib.blake2b(document.encode(), digest_size=8).hexdigest()
+
+
+class VectorTable:
+    """
+    Embeddings of the records of one model, with the hash of each record's text.
+    'generation' is bumped by every change made outside a sync (mark_stale() and
+    the embedding of inserted records): a sync only clears 'stale' if none
+    happened while it read the database.
+    """
+
+    def __init__(self, dimension: int):
+        import numpy as np
+
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.positions: Dict[str, int] = {}
+        self.stale = True
+        self.generation = 0
+
+    def mark_stale(self) -> None:
+        self.stale = True
+        self.generation += 1
+
+    def upsert(self, ids: List[str], hashes: List[str], vectors: "np.ndarray") -> None:
+        import numpy as np
+
+        new_rows = []
+        for record_id, content_hash, vector in zip(ids, hashes, vectors):
+            position = self.positions.get(record_id)
+            if position is None:
+                self.positions[record_id] = len(self.ids)
+                self.ids.append(record_id)
+                self.hashes.append(content_hash)
+                new_rows.append(vector)
+            else:
+                self.hashes[position] = content_hash
+                self.vectors[position] = vector
+        if new_rows:
+            self.vectors = np.vstack([self.vectors, np.asarray(new_rows)])
+
+    def remove(self, ids: set) -> None:
+        keep = [
+            position
+            for position, record_id in enumerate(self.ids)
+            if record_id not in ids
+        ]
+        self.ids = [self.ids[position] for position in keep]
+        self.hashes = [self.hashes[position] for position in keep]
+        self.vectors = self.vectors[keep]
+        self.positions = {
+            record_id: position for position, record_id in enumerate(self.ids)
+        }
+
+    def copy(self) -> "VectorTable":
+        table = VectorTable(self.vectors.shape[1])
+        table.ids = list(self.ids)
+        table.hashes = list(self.hashes)
+        table.vectors = self.vectors.copy()
+        table.positions = dict(self.positions)
+        table.stale = self.stale
+        table.generation = self.generation
+        return table
+
+    def search(self, query_vector: "np.ndarray", limit: int) -> List[Tuple[str, float]]:
+        """Returns up to 'limit' (id, cosine similarity) pairs, best first."""
+        import numpy as np
+
+        if not self.ids:
+            return []
+        scores = self.vectors @ query_vector
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self.ids[position], round(float(scores[position]), 3)) for position in top
+        ]
+
+    def save(self, path: Path, embedder_name: str) -> None:
+        import numpy as np
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                ids=np.array(self.ids, dtype=str),
+                hashes=np.array(self.hashes, dtype=str),
+                vectors=self.vectors,
+                embedder=np.array(embedder_name),
+            )
+
+    @classmethod
+    def load(cls, path: Path, embedder_name: str, dimension: int) -> "VectorTable":
+        """Loads a saved table; an empty one if missing or built by another embedder."""
+        import numpy as np
+
+        table = cls(dimension)
+        if not path.exists():
+            return table
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["embedder"]) != embedder_name:
+                return table
+            table.upsert(
+                [str(record_id) for record_id in data["ids"]],
+                [str(content_hash) for content_hash in data["hashes"]],
+                data["vectors"],
+            )
+        return table
+
+
+class VectorIndex:
+    """
+    Semantic search over the SEMANTIC_FIELDS of each model. Tables are persisted to
+    disk and loaded on first use; they are then synced with the database, embedding
+    only the records whose text changed. Inserted records are embedded as they are
+    written; updates and deletes mark the table for a sync before the next search.
+
+    The embedder and the disk writes run in worker threads, off the event loop.
+    A changed table is saved at most every SAVE_INTERVAL_SECONDS; call flush()
+    before exiting to save the last changes.
+    """
+
+    def __init__(
+        self, embedder: Optional[Embedder] = None, directory: Optional[str] = None
+    ):
+        self._embedder = embedder
+        # None reads the directory from the settings on first use
+        self._directory = directory
+        self._tables: Dict[str, VectorTable] = {}
+        # Tables changed since they were last saved, and the task that saves them
+        self._dirty: Set[str] = set()
+        self._save_task: Optional[asyncio.Task] = None
+        # Embeddings of inserted records still running
+        self._pending: Set[asyncio.Task] = set()
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = HashingEmbedder()
+        return self._embedder
+
+    def set_embedder(self, embedder: Embedder) -> None:
+        """Replaces the embedding function; the tables are re-embedded on next use."""
+        self._embedder = embedder
+        self._tables.clear()
+
+    def _path(self, model_name: str) -> Path:
+        directory = self._directory or get_settings().VECTOR_INDEX_DIR
+        return Path(directory) / f"{model_name}.npz"
+
+    def invalidate(self, model_name: Optional[str] = None) -> None:
+        """Marks the table of one model, or of every model, for a sync."""
+        for name, table in self._tables.items():
+            if model_name is None or name == model_name:
+                table.mark_stale()
+
+    def _mark_dirty(self, model_name: str) -> None:
+        self._dirty.add(model_name)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        await asyncio.sleep(SAVE_INTERVAL_SECONDS)
+        self._save_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Waits for the pending embeddings, then saves the changed tables."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        dirty, self._dirty = self._dirty, set()
+        for model_name in dirty:
+            table = self._tables.get(model_name)
+            if table is not None:
+                # Saved from a copy, as the loop may change the table meanwhile
+                await asyncio.to_thread(
+                    table.copy().save, self._path(model_name), self.embedder.name
+                )
+
+    def add_records(self, model_name: str, records: List[Dict[str, Any]]) -> None:
+        """
+        Embeds new records into the loaded table of their model. Within an event
+        loop the embedding runs in the background; searches wait for it.
+        """
+        table = self._tables.get(model_name)
+        if table is None or not records:
+            return
+        fields = SEMANTIC_FIELDS[model_name]
+        documents = [
+            _document(tuple(record.get(field) for field in fields))
+            for record in records
+        ]
+        ids = [str(record["id"]) for record in records]
+        hashes = [_content_hash(document) for document in documents]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            table.upsert(ids, hashes, self.embedder(documents))
+            table.save(self._path(model_name), self.embedder.name)
+            return
+        task = loop.create_task(
+            self._embed_records(model_name, table, ids, hashes, documents)
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _embed_records(
+        self,
+        model_name: str,
+        table: VectorTable,
+        ids: List[str],
+        hashes: List[str],
+        documents: List[str],
+    ) -> None:
+        try:
+            vectors = await asyncio.to_thread(self.embedder, documents)
+        except BaseException:
+            # The next sync embeds the records
+            table.mark_stale()
+            raise
+        table.upsert(ids, hashes, vectors)
+        table.generation += 1
+        self._mark_dirty(model_name)
+
+    async def _sync(
+        self, session: AsyncSession, model_name: str, table: VectorTable
+    ) -> None:
+        model_class = MODEL_REGISTRY[model_name]["model"]
+        columns = [getattr(model_class, field) for field in SEMANTIC_FIELDS[model_name]]
+
+        generation = table.generation
+        seen = set()
+        changed = False
+        result = await session.stream(
+            select(model_class.id, *columns).execution_options(
+                yield_per=SYNC_CHUNK_ROWS
+            )
+        )
+        async for rows in result.partitions():
+            ids, hashes, documents = [], [], []
+            for record_id, *values in rows:
+                record_id = str(record_id)
+                document = _document(tuple(values))
+                content_hash = _content_hash(document)
+                seen.add(record_id)
+                position = table.positions.get(record_id)
+                if position is None or table.hashes[position] != content_hash:
+                    ids.append(record_id)
+                    hashes.append(content_hash)
+                    documents.append(document)
+            if documents:
+                vectors = await asyncio.to_thread(self.embedder, documents)
+                table.upsert(ids, hashes, vectors)
+                changed = True
+
+        removed = set(table.ids) - seen
+        if removed:
+            table.remove(removed)
+            changed = True
+
+        # A write during the sync may be missing from what it read
+        if table.generation == generation:
+            table.stale = False
+        if changed:
+            self._mark_dirty(model_name)
+
+    async def table(self, session: AsyncSession, model_name: str) -> VectorTable:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        table = self._tables.get(model_name)
+        if table is None:
+            table = VectorTable.load(
+                self._path(model_name), self.embedder.name, self.embedder.dimension
+            )
+            self._tables[model_name] = table
+        if table.stale:
+            await self._sync(session, model_name, table)
+        return table
+
+    async def search(
+        self,
+        session: AsyncSession,
+        model_name: str,
+        query: str,
+        limit: int = DEFAULT_MATCHES,
+    ) -> List[Tuple[str, float]]:
+        table = await self.table(session, model_name)
+        query_vector = (await asyncio.to_thread(self.embedder, [query]))[0]
+        return table.search(query_vector, limit)
+
+
+vector_index = VectorIndex()
+
+
+@on_table_write
+def _update_vector_index(
+    model_name: str, operation: str, records: Optional[List[Dict[str, Any]]]
+) -> None:
+    if model_name not in SEMANTIC_FIELDS:
+        return
+    if operation == "insert" and records is not None:
+        vector_index.add_records(model_name, records)
+    else:
+        vector_index.invalidate(model_name)
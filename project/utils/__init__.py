@@ -1,7 +1,17 @@
-from .utils import normalize_text, process_and_print_streaming_response, run_demo_loop
+from .utils import (
+    normalize_text,
+    normalize_texts,
+    normalized_sql,
+    parse_date,
+    process_and_print_streaming_response,
+    run_demo_loop,
+)
 
 __all__ = [
     "run_demo_loop",
     "process_and_print_streaming_response",
     "normalize_text",
+    "normalize_texts",
+    "normalized_sql",
+    "parse_date",
 ]
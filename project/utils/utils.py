@@ -1,5 +1,14 @@
 import json
-from typing import Any
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import func, text
+
+# Accented characters and their plain letters. Uppercase ones are listed too
+# because lower() does not fold them in every database locale.
+ACCENTED_CHARACTERS = "áéíóúüñÁÉÍÓÚÜÑ"
+PLAIN_CHARACTERS = "aeiouunaeiouun"
+_ACCENTS_TABLE = str.maketrans(ACCENTED_CHARACTERS, PLAIN_CHARACTERS)
 
 
 def normalize_text(text: Any) -> str:
@@ -15,19 +24,78 @@ def normalize_text(text: Any) -> str:
     if text is None:
         return text
 
-    text = str(text).lower()
-    replacements = {
-        "á": "a",
-        "é": "e",
-        "í": "i",
-        "ó": "o",
-        "ú": "u",
-        "ü": "u",
-        "ñ": "n",
-    }
-    for accented, normal in replacements.items():
-        text = text.replace(accented, normal)
-    return text
+    return str(text).lower().translate(_ACCENTS_TABLE)
+
+
+def normalize_texts(texts: Iterable[Any]) -> List[Optional[str]]:
+    """
+    Batch version of normalize_text for lists of values, keeping None values.
+
+    Args:
+        texts: Values that can be converted to string, or None
+
+    Returns:
+        List[Optional[str]]: The normalized values, in the same order
+    """
+    translate = str.translate
+    return [
+        None if text is None else translate(str(text).lower(), _ACCENTS_TABLE)
+        for text in texts
+    ]
+
+
+def normalized_sql(expression: Any) -> Any:
+    """
+    SQL counterpart of normalize_text: translate(lower(expression)). Both functions
+    are immutable, so expression indexes can be built on the result.
+
+    Args:
+        expression: A column or SQL expression
+
+    Returns:
+        The normalized SQL expression
+    """
+    # Inline literals, not bound parameters: a query only uses an expression index
+    # when its expression is written exactly like the indexed one
+    return func.translate(
+        func.lower(expression),
+        text(f"'{ACCENTED_CHARACTERS}'"),
+        text(f"'{PLAIN_CHARACTERS}'"),
+    )
+
+
+def parse_date(value: Any) -> date:
+    """
+    Converts a date given by the user or the model into a date object.
+
+    Args:
+        value: A date/datetime, an ISO string ("2025-01-02", "2025-01-02T10:00:00")
+            or a day-first string ("02/01/2025")
+
+    Returns:
+        date: The parsed date
+
+    Raises:
+        ValueError: If the value is not a recognizable date
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).date()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(text, "%d/%m/%Y").date()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD") from None
 
 
 def process_and_print_streaming_response(response):
@@ -0,0 +1,96 @@
+"""
+Checks that importing main.py stays within an import-time budget and does not
+build the engines or the AI clients.
+
+Usage:
+    python scripts/check_import_time.py [--budget-ms 5000] [--top 10]
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, so the
+measurement includes every module main.py pulls in. Exits with status 1 when the
+budget is exceeded or a module that is only needed at run time was imported.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = 5000
+
+# Loaded only when an engine, a client or the vector index is first used
+LAZY_MODULES = ("asyncpg", "psycopg2", "psycopg", "numpy")
+
+# Printed by the child once main.py is imported, after the -X importtime lines
+MARKER = "LOADED_MODULES:"
+
+
+def measure() -> tuple[dict[str, int], list[str]]:
+    """Returns the cumulative import time (us) of each module and the lazy modules loaded."""
+    code = (
+        "import sys, main; "
+        f"print({MARKER!r} + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    # The settings must not be needed to import main.py, so none are passed
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("DB_CONNECTION", "OPENAI_API_KEY")
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        sys.exit(f"Importing main.py failed:\n{completed.stderr}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.rstrip()] = int(cumulative)
+
+    loaded = completed.stdout.rsplit(MARKER, 1)[-1].strip()
+    return timings, [module for module in loaded.split(",") if module]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    timings, lazy_loaded = measure()
+    total_ms = timings.get(" main", 0) / 1000
+
+    # Modules imported directly by main.py are indented by two spaces
+    direct = {
+        name.strip(): us
+        for name, us in timings.items()
+        if name.startswith("   ") and not name.startswith("    ")
+    }
+    print(f"import main: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, us in sorted(direct.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(
+            f"FAIL: import time exceeds the budget by {total_ms - args.budget_ms:.0f} ms"
+        )
+        failed = True
+    if lazy_loaded:
+        print(f"FAIL: modules loaded at import time: {', '.join(lazy_loaded)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
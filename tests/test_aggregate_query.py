@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from project.core.agents_tools.database_tools import _aggregate_query
+from project.database.query_builder import MODEL_META
+
+VENTA = MODEL_META["venta"]
+
+
+def sql(query):
+    return str(query.compile(dialect=postgresql.dialect())).replace("\n", "")
+
+
+def test_aggregates_are_grouped_and_ordered_by_the_group_fields():
+    query, params = _aggregate_query(
+        VENTA,
+        [{"function": "count"}, {"function": "SUM", "field": "monto"}],
+        ["empleado_id"],
+        [{"field": "monto", "operator": "gt", "value": "10"}],
+    )
+
+    assert sql(query) == (
+        "SELECT venta.empleado_id, count(*) AS count, sum(venta.monto) AS sum_monto "
+        "FROM venta WHERE venta.monto > %(c0)s "
+        "GROUP BY venta.empleado_id ORDER BY venta.empleado_id"
+    )
+    assert params == {"c0": 10.0}
+
+
+def test_aggregates_without_group_by_return_one_row():
+    query, params = _aggregate_query(
+        VENTA, [{"function": "max", "field": "fecha"}], [], []
+    )
+    assert sql(query) == "SELECT max(venta.fecha) AS max_fecha FROM venta"
+    assert params == {}
+
+
+@pytest.mark.parametrize(
+    "aggregates, group_by, message",
+    [
+        ([{"function": "median", "field": "monto"}], [], "Invalid aggregate function"),
+        ([{"function": "sum", "field": "color"}], [], "Invalid field 'color'"),
+        ([{"function": "sum", "field": "fecha"}], [], "'sum' requires a numeric"),
+        ([{"function": "avg", "field": "cliente_id"}], [], "'avg' requires a numeric"),
+        ([{"function": "count"}], ["color"], "Invalid fields for group_by: color"),
+        (
+            [{"function": "count"}, {"function": "count"}],
+            [],
+            "'count' is requested more than once",
+        ),
+        (
+            [
+                {"function": "sum", "field": "monto"},
+                {"function": "SUM", "field": "monto"},
+            ],
+            [],
+            "'sum_monto' is requested more than once",
+        ),
+    ],
+)
+def test_invalid_aggregates(aggregates, group_by, message):
+    with pytest.raises(ValueError, match=message):
+        _aggregate_query(VENTA, aggregates, group_by, [])
+
+
+def test_invalid_conditions_are_rejected():
+    with pytest.raises(ValueError, match="Invalid operator 'in'"):
+        _aggregate_query(
+            VENTA,
+            [{"function": "count"}],
+            [],
+            [{"field": "monto", "operator": "in", "value": 1}],
+        )
@@ -0,0 +1,235 @@
+import asyncio
+import json
+
+import pytest
+from agents.tool_context import ToolContext
+from sqlalchemy import ForeignKey
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+from project.core.agents_tools import database_tools
+from project.core.agents_tools.database_tools import (
+    _equality_filters,
+    _requires_orm_delete,
+    delete_a_data,
+    update_data,
+)
+from project.database.query_builder import MODEL_META
+
+CLIENTE = MODEL_META["cliente"]
+
+
+def sql(clause):
+    compiled = clause.compile(dialect=postgresql.dialect())
+    return str(compiled).replace("\n", ""), compiled.params
+
+
+def test_equality_filters_normalize_and_bind_their_values():
+    filters = _equality_filters(
+        CLIENTE, {"nombre": "José", "telefono": 3311112222, "num_ext": "12"}
+    )
+
+    clauses = [sql(clause) for clause in filters]
+    assert clauses[0] == (
+        "translate(lower(cliente.nombre), 'áéíóúüñÁÉÍÓÚÜÑ', 'aeiouunaeiouun')"
+        " = %(c0)s::VARCHAR",
+        {"c0": "jose"},
+    )
+    # A number given for a text field is compared as text
+    assert clauses[1][1] == {"c1": "3311112222"}
+    assert clauses[2] == ("cliente.num_ext = %(c2)s::INTEGER", {"c2": 12})
+
+
+def test_equality_filters_check_null_with_is():
+    (clause,) = _equality_filters(CLIENTE, {"contacto": None})
+    assert sql(clause) == ("cliente.contacto IS NULL", {})
+
+
+@pytest.mark.parametrize(
+    "criteria, message",
+    [
+        ({"color": "rojo"}, "Field 'color' does not exist in the model 'cliente'"),
+        ({"num_ext": "doce"}, "Invalid value for field 'num_ext'"),
+    ],
+)
+def test_invalid_criteria(criteria, message):
+    with pytest.raises(ValueError, match=message):
+        _equality_filters(CLIENTE, criteria)
+
+
+class Result:
+    def __init__(self, rows=(), rowcount=1):
+        self.rows = list(rows)
+        self.rowcount = rowcount
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Records the statements of a tool; every write affects 'rowcount' rows."""
+
+    def __init__(self, rows=(), rowcount=1):
+        self.rows = rows
+        self.rowcount = rowcount
+        self.statements = []
+        self.deleted = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+    async def exec(self, statement, params=None):
+        self.statements.append(statement)
+        return Result(self.rows, self.rowcount)
+
+    async def delete(self, record):
+        self.deleted.append(record)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(database_tools, "get_async_engine", lambda: None)
+    monkeypatch.setattr(database_tools, "AsyncSession", lambda engine: session)
+    return session
+
+
+def run(tool, **arguments):
+    context = ToolContext(
+        context=None, tool_name=tool.name, tool_call_id="1", tool_arguments="{}"
+    )
+    return asyncio.run(tool.on_invoke_tool(context, json.dumps(arguments)))
+
+
+def statements(session):
+    return [sql(statement)[0] for statement in session.statements]
+
+
+def test_delete_is_one_statement(session):
+    output = run(
+        delete_a_data,
+        data={"model_name": "cliente", "criteria": {"nombre": "Ana"}},
+    )
+
+    assert output == "Done! 1 records were deleted from cliente."
+    [delete] = statements(session)
+    assert delete.startswith(
+        "DELETE FROM cliente WHERE translate(lower(cliente.nombre)"
+    )
+    assert session.commits == 1
+
+
+def test_update_is_one_statement(session):
+    output = run(
+        update_data,
+        model_and_params={
+            "model_name": "cliente",
+            "identifier": {"num_ext": 12},
+            "updates": {"colonia": "Centro", "telefono": 3311112222},
+        },
+    )
+
+    assert output == "Done! 1 records were updated in cliente."
+    [update] = statements(session)
+    assert update.startswith(
+        "UPDATE cliente SET colonia=%(colonia)s::VARCHAR,"
+        " telefono=%(telefono)s::VARCHAR WHERE cliente.num_ext = %(c0)s::INTEGER"
+    )
+    assert session.statements[0].compile().params["telefono"] == "3311112222"
+
+
+def test_delete_without_matches_is_not_committed(session):
+    session.rowcount = 0
+    output = run(delete_a_data, data={"model_name": "cliente", "criteria": {}})
+    assert output == "No records found in cliente matching all records."
+    assert session.commits == 0
+
+
+def test_delete_of_cascading_models_goes_through_the_orm(session, monkeypatch):
+    monkeypatch.setattr(database_tools, "_requires_orm_delete", lambda model: True)
+    session.rows = ["first", "second"]
+
+    output = run(
+        delete_a_data,
+        data={"model_name": "cliente", "criteria": {"nombre": "Ana"}},
+    )
+
+    assert output == "Done! 2 records were deleted from cliente."
+    [select] = statements(session)
+    assert select.startswith("SELECT cliente.id")
+    assert session.deleted == ["first", "second"]
+
+
+def test_requires_orm_delete_follows_the_cascades():
+    class Base(DeclarativeBase):
+        pass
+
+    class Parent(Base):
+        __tablename__ = "parent"
+        id: Mapped[int] = mapped_column(primary_key=True)
+        children: Mapped[list["Child"]] = relationship(cascade="all, delete-orphan")
+
+    class Child(Base):
+        __tablename__ = "child"
+        id: Mapped[int] = mapped_column(primary_key=True)
+        parent_id: Mapped[int] = mapped_column(ForeignKey("parent.id"))
+
+    assert _requires_orm_delete(Parent)
+    assert not _requires_orm_delete(Child)
+    # No relationship of the registry cascades deletes
+    assert not any(
+        _requires_orm_delete(meta.model_class) for meta in MODEL_META.values()
+    )
+
+
+def test_delete_of_rollup_rows_records_the_deleted_versions(session):
+    run(delete_a_data, data={"model_name": "venta", "criteria": {"monto": "5"}})
+
+    lock, create, delete, *refresh = statements(session)
+    assert "pg_advisory_xact_lock_shared" in lock
+    assert create.startswith("CREATE TEMPORARY TABLE rollup_changed_venta")
+    assert delete.startswith(
+        "WITH deleted AS (DELETE FROM venta WHERE venta.monto = %(c0)s"
+        " RETURNING venta.cliente_id, venta.empleado_id, venta.fecha, venta.id,"
+        " venta.monto) INSERT INTO rollup_changed_venta"
+    )
+    assert refresh
+
+
+def test_versioned_update_returns_the_old_and_new_versions(session):
+    # Each updated record has two versions in the changed rows
+    session.rowcount = 2
+    output = run(
+        update_data,
+        model_and_params={
+            "model_name": "venta",
+            "identifier": {"monto": "5"},
+            "updates": {"monto": "7.5"},
+        },
+    )
+
+    assert output == "Done! 1 records were updated in venta."
+    update = statements(session)[2]
+    assert update.startswith(
+        "WITH updated AS (UPDATE venta SET monto=%(param_1)s"
+        " FROM (SELECT venta.cliente_id AS cliente_id"
+    )
+    assert 'WHERE venta.monto = %(c0)s FOR UPDATE) AS "old"' in update
+    assert (
+        'WHERE venta.id = "old".id RETURNING "old".cliente_id AS old_cliente_id'
+        in update
+    )
+    assert update.endswith(
+        "INSERT INTO rollup_changed_venta (cliente_id, empleado_id, fecha, id, monto)"
+        " SELECT updated.old_cliente_id, updated.old_empleado_id, updated.old_fecha,"
+        " updated.old_id, updated.old_monto FROM updated UNION ALL"
+        " SELECT updated.cliente_id, updated.empleado_id, updated.fecha, updated.id,"
+        " updated.monto FROM updated"
+    )
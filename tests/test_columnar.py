@@ -0,0 +1,107 @@
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from project.core.agents_tools.database_tools import _format_result
+from project.database.columnar import records_to_columnar, to_columnar
+from project.database.exporter import SnapshotExporter
+
+
+def _to_records(table):
+    """Decodes a to_columnar() table back into records."""
+    dictionaries = table.get("dictionaries", {})
+    records = []
+    for row in table["rows"]:
+        record = {}
+        for column, value in zip(table["columns"], row):
+            if column in dictionaries and value is not None:
+                value = dictionaries[column][value]
+            record[column] = value
+        records.append(record)
+    return records
+
+
+def _records(count):
+    linea_ids = [uuid4(), uuid4()]
+    return [
+        {
+            "id": uuid4(),
+            "descripcion": f"insumo {index}",
+            "linea": ["bebidas", "galletas", None][index % 3],
+            "linea_id": linea_ids[index % 2],
+            "fecha": date(2025, 1, 1 + index % 2),
+            "precio": float(index % 2),
+        }
+        for index in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 7, 50])
+@pytest.mark.parametrize("dictionary", [True, False])
+def test_round_trip(count, dictionary):
+    records = _records(count)
+    assert _to_records(records_to_columnar(records, dictionary)) == records
+
+
+def test_repeated_values_are_dictionary_encoded():
+    table = records_to_columnar(_records(10))
+    dictionaries = table["dictionaries"]
+    # Unique ids, free text and numbers are kept as they are
+    assert set(dictionaries) == {"linea", "linea_id", "fecha"}
+    assert dictionaries["linea"] == ["bebidas", "galletas"]
+    position = table["columns"].index("linea")
+    assert [row[position] for row in table["rows"][:3]] == [0, 1, None]
+
+
+def test_values_without_repeats_are_not_encoded():
+    table = to_columnar(["linea"], [["a"], ["b"], ["c"]])
+    assert "dictionaries" not in table
+    assert table == {"columns": ["linea"], "rows": [["a"], ["b"], ["c"]]}
+
+
+def test_input_rows_are_not_modified():
+    rows = [["a"], ["a"], ["a"]]
+    to_columnar(["linea"], rows)
+    assert rows == [["a"], ["a"], ["a"]]
+
+
+def test_format_result_is_a_dict_in_both_formats():
+    records = _records(4)
+    result = {"records": records, "next_cursor": "abc"}
+
+    assert _format_result(result, "records") == {"format": "records", **result}
+
+    columnar = _format_result(result, "columnar")
+    assert columnar["format"] == "columnar"
+    assert columnar["next_cursor"] == "abc"
+    assert "records" not in columnar
+    assert _to_records(columnar) == records
+
+
+def test_columnar_snapshot_chunk_fits_the_budget_with_its_dictionaries():
+    # One-letter values: the dictionaries cost more than the indexes save, so
+    # the rows fit the budget but the encoded chunk does not
+    rows = [("a", "b")] * 6
+    exporter = SnapshotExporter("columnar", max_bytes=110)
+
+    chunk = exporter._encode_partition("t", ["x", "y"], rows)
+
+    table = json.loads(chunk)
+    assert "dictionaries" in table
+    assert 0 < len(table["rows"]) < len(rows)
+    assert exporter.truncated
+    assert exporter.rows_written == len(table["rows"])
+    assert exporter.bytes_written == len(chunk) + 1 <= 110
+
+
+def test_columnar_snapshot_chunk_within_the_budget_is_whole():
+    rows = [("a", "b")] * 6
+    exporter = SnapshotExporter("columnar", max_bytes=400)
+
+    chunk = exporter._encode_partition("t", ["x", "y"], rows)
+
+    assert len(json.loads(chunk)["rows"]) == exporter.rows_written == len(rows)
+    assert not exporter.truncated
+    assert exporter.bytes_written == len(chunk) + 1
@@ -0,0 +1,178 @@
+import logging
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import Date, String
+
+from project.database import migrations
+from project.database.migrations import _convertible, migrate_date_columns
+from project.database.query_builder import MODEL_META, prepare_conditions
+
+VENTA = MODEL_META["venta"]
+
+
+def test_between_binds_both_ends():
+    shape, params = prepare_conditions(
+        VENTA,
+        [
+            {
+                "field": "fecha",
+                "operator": "between",
+                "value": ["2025-01-01", "31/01/2025"],
+            }
+        ],
+    )
+    assert shape == (("fecha", "between"),)
+    assert params == {"c0": date(2025, 1, 1), "c0_end": date(2025, 1, 31)}
+
+
+@pytest.mark.parametrize("value", ["2025-01-01", ["2025-01-01"], [1, 2, 3]])
+def test_between_needs_two_values(value):
+    with pytest.raises(ValueError, match="'between' needs a"):
+        prepare_conditions(
+            VENTA, [{"field": "fecha", "operator": "between", "value": value}]
+        )
+
+
+@pytest.mark.parametrize("value", ["2025-02-01", "01/02/2025", "1/2/2025"])
+def test_date_values_are_bound_as_dates(value):
+    _, params = prepare_conditions(
+        VENTA, [{"field": "fecha", "operator": "gte", "value": value}]
+    )
+    assert params == {"c0": date(2025, 2, 1)}
+
+
+def test_invalid_dates_are_rejected():
+    with pytest.raises(ValueError, match="Invalid value for field 'fecha'"):
+        prepare_conditions(
+            VENTA, [{"field": "fecha", "operator": "eq", "value": "2025-02-30"}]
+        )
+
+
+@pytest.mark.parametrize(
+    "value, convertible",
+    [
+        ("2025-01-31", True),
+        (" 2025-01-31 ", True),
+        ("2025-01-31T10:00:00", True),
+        ("2025-01-31 10:00", True),
+        ("31/01/2025", True),
+        ("1/2/2025", True),
+        ("2025-02-30", False),
+        ("31/13/2025", False),
+        ("01-31-2025", False),
+        ("ayer", False),
+    ],
+)
+def test_text_dates_convertible_by_the_migration(value, convertible):
+    assert _convertible(value) is convertible
+
+
+class FakeResult:
+    def __init__(self, values):
+        self.values = values
+
+    def scalars(self):
+        return iter(self.values)
+
+
+class FakeConnection:
+    """Answers the DISTINCT queries with the text values of each column."""
+
+    def __init__(self, values):
+        self.values = values
+        self.statements = []
+
+    def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        for (table_name, column_name), values in self.values.items():
+            if sql.startswith(f'SELECT DISTINCT "{column_name}" FROM "{table_name}"'):
+                return FakeResult(values)
+        return FakeResult([])
+
+
+class FakeEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    @contextmanager
+    def begin(self):
+        yield self.connection
+
+
+class FakeInspector:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def get_table_names(self):
+        return list(self.columns)
+
+    def get_columns(self, table_name):
+        return [
+            {"name": name, "type": column_type}
+            for name, column_type in self.columns[table_name].items()
+        ]
+
+
+def _migrate(monkeypatch, columns, values):
+    monkeypatch.setattr(migrations, "inspect", lambda engine: FakeInspector(columns))
+    connection = FakeConnection(values)
+    return migrate_date_columns(FakeEngine(connection)), connection.statements
+
+
+def _alters(statements):
+    return [sql for sql in statements if sql.startswith("ALTER TABLE")]
+
+
+def test_text_date_columns_are_converted_with_explicit_formats(monkeypatch):
+    migrated, statements = _migrate(
+        monkeypatch,
+        {"venta": {"id": String(), "fecha": String(), "monto": String()}},
+        {("venta", "fecha"): ["2025-01-31", "31/01/2025"]},
+    )
+
+    assert migrated == ["venta.fecha"]
+    [alter] = _alters(statements)
+    assert alter.startswith('ALTER TABLE "venta" ALTER COLUMN "fecha" TYPE DATE')
+    assert "to_date(left(btrim(\"fecha\"), 10), 'YYYY-MM-DD')" in alter
+    assert "to_date(btrim(\"fecha\"), 'DD/MM/YYYY')" in alter
+
+
+def test_date_columns_are_left_untouched(monkeypatch):
+    migrated, statements = _migrate(
+        monkeypatch,
+        {
+            "venta": {"fecha": Date()},
+            "promocion": {"fecha_inicio": Date(), "fecha_fin": Date()},
+        },
+        {},
+    )
+
+    assert migrated == []
+    assert statements == []
+
+
+def test_missing_tables_are_skipped(monkeypatch):
+    migrated, statements = _migrate(monkeypatch, {}, {})
+    assert migrated == []
+    assert statements == []
+
+
+def test_columns_with_unparseable_values_are_reported_and_kept(monkeypatch, caplog):
+    with caplog.at_level(logging.WARNING, logger=migrations.__name__):
+        migrated, statements = _migrate(
+            monkeypatch,
+            {"promocion": {"fecha_inicio": String(), "fecha_fin": String()}},
+            {
+                ("promocion", "fecha_inicio"): ["2025-01-01", "ayer"],
+                ("promocion", "fecha_fin"): ["2025-12-31"],
+            },
+        )
+
+    # The other columns are still converted
+    assert migrated == ["promocion.fecha_fin"]
+    assert len(_alters(statements)) == 1
+    assert "Not converting promocion.fecha_inicio to DATE" in caplog.text
+    assert "'ayer'" in caplog.text
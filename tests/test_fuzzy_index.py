@@ -0,0 +1,61 @@
+import pytest
+
+from project.database.fuzzy_index import FieldIndex, trigrams
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+
+
+def test_trigrams_of_each_word():
+    assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("") == set()
+
+
+def test_repeated_trigrams_are_counted_once():
+    assert trigrams("aaaa") == {"  a", " aa", "aaa", "aa "}
+
+
+def test_identical_values_score_one():
+    index = FieldIndex()
+    index.add(["Galleta"])
+    assert index.search("galleta", 5, 0.3) == [("Galleta", 1.0)]
+
+
+def test_score_is_the_jaccard_similarity_of_the_trigrams():
+    index = FieldIndex()
+    index.add(["galletas"])
+    query, value = trigrams("galleta"), trigrams("galletas")
+    expected = len(query & value) / len(query | value)
+
+    assert index.search("galleta", 5, 0.0) == [("galletas", round(expected, 3))]
+
+
+def test_matches_ignore_case_and_accents():
+    index = FieldIndex()
+    index.add(["Jabón de Tocador"])
+    assert index.search("JABON DE TOCADOR", 5, 0.3) == [("Jabón de Tocador", 1.0)]
+
+
+def test_results_are_ordered_limited_and_thresholded():
+    index = FieldIndex()
+    index.add(["margarina", "margarita", "mantequilla", "aceite"])
+
+    matches = index.search("margarina", 2, 0.3)
+    assert [value for value, _ in matches] == ["margarina", "margarita"]
+    assert matches[0][1] > matches[1][1]
+
+    assert index.search("margarina", 10, 0.99) == [("margarina", 1.0)]
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_a_query_without_trigrams_matches_nothing(query):
+    index = FieldIndex()
+    index.add(["galleta"])
+    assert index.search(query, 5, 0.0) == []
+
+
+def test_values_are_deduplicated_after_normalization():
+    index = FieldIndex()
+    index.add(["Café", None, "cafe", "CAFÉ"])
+    assert index.values == {"cafe": "Café"}
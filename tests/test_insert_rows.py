@@ -0,0 +1,102 @@
+from datetime import date
+from uuid import UUID, uuid4
+
+import pytest
+
+from project.core.agents_tools.database_tools import _collect_insert_rows
+
+
+def _venta(**overrides):
+    venta = {
+        "fecha": "2025-01-02",
+        "cliente_id": str(uuid4()),
+        "empleado_id": str(uuid4()),
+        "monto": "10.5",
+    }
+    venta.update(overrides)
+    return venta
+
+
+def test_nested_children_point_at_their_parent():
+    insumo_id = uuid4()
+    rows_by_model = {}
+    _collect_insert_rows(
+        "venta",
+        [
+            _venta(
+                detalles=[
+                    {"insumo_id": str(insumo_id), "cantidad": "2", "precio": 5},
+                    {"insumo_id": str(insumo_id), "cantidad": 1, "precio": 3},
+                ]
+            ),
+            _venta(detalles={"insumo_id": str(insumo_id), "cantidad": 4, "precio": 1}),
+        ],
+        rows_by_model,
+    )
+
+    # Parents come first, so they are inserted before their children
+    assert list(rows_by_model) == ["venta", "detalle_venta"]
+    ventas, detalles = rows_by_model["venta"], rows_by_model["detalle_venta"]
+    assert len(ventas) == 2
+    assert [detalle["venta_id"] for detalle in detalles] == [
+        ventas[0]["id"],
+        ventas[0]["id"],
+        ventas[1]["id"],
+    ]
+    assert all("detalles" not in venta for venta in ventas)
+
+
+def test_values_are_coerced():
+    rows_by_model = {}
+    _collect_insert_rows("venta", [_venta(fecha="02/01/2025")], rows_by_model)
+
+    (venta,) = rows_by_model["venta"]
+    assert venta["fecha"] == date(2025, 1, 2)
+    assert venta["monto"] == 10.5
+    assert isinstance(venta["cliente_id"], UUID)
+    assert isinstance(venta["id"], UUID)
+
+
+def test_numbers_given_for_text_fields_are_inserted_as_text():
+    cliente = {
+        "nombre": "Ana",
+        "calle": "Juarez",
+        "num_ext": "12",
+        "colonia": "Centro",
+        "municipio": "Guadalajara",
+        "codigo_postal": 44100,
+        "estado": "Jalisco",
+        "telefono": 3311112222,
+        "nit": "123",
+    }
+    rows_by_model = {}
+    _collect_insert_rows("cliente", [cliente], rows_by_model)
+
+    (row,) = rows_by_model["cliente"]
+    assert row["codigo_postal"] == "44100"
+    assert row["telefono"] == "3311112222"
+    assert row["num_ext"] == 12
+    assert row["contacto"] is None
+
+
+def test_rows_are_appended_to_the_existing_ones():
+    rows_by_model = {"venta": [{"id": "existing"}]}
+    _collect_insert_rows("venta", [_venta()], rows_by_model)
+    assert len(rows_by_model["venta"]) == 2
+
+
+@pytest.mark.parametrize(
+    "records, message",
+    [
+        ([_venta(color="rojo")], "Invalid fields for venta #1: color"),
+        ([_venta(), {"fecha": "2025-01-02"}], "Missing parameters for venta #2"),
+        ([_venta(cliente_id="not-a-uuid")], "Invalid value for cliente_id in venta #1"),
+        (
+            [_venta(detalles=[{"cantidad": 1, "precio": 1}])],
+            "Missing parameters for detalle_venta #1: insumo_id",
+        ),
+    ],
+)
+def test_invalid_records(records, message):
+    with pytest.raises(ValueError, match=message):
+        _collect_insert_rows("venta", records, {})
@@ -0,0 +1,121 @@
+from datetime import date
+from uuid import UUID, uuid4
+
+import pytest
+
+from project.database import models
+from project.database.model_registry import (
+    COERCERS,
+    MODEL_NAMES,
+    MODEL_REGISTRY,
+    registry_name,
+)
+
+
+def test_every_table_model_is_registered_by_its_snake_case_name():
+    assert list(MODEL_REGISTRY) == [
+        "insumo",
+        "cliente",
+        "empleado",
+        "venta",
+        "detalle_venta",
+        "cliente_visita",
+        "cliente_visita_venta",
+        "promocion",
+        "promocion_detalle",
+        "concurso",
+        "concurso_ganadores",
+        "meta_ventas",
+    ]
+    assert registry_name(models.ClienteVisitaVenta) == "cliente_visita_venta"
+    assert MODEL_NAMES[models.DetalleVenta] == "detalle_venta"
+
+
+def test_field_types_follow_the_columns():
+    cliente = MODEL_REGISTRY["cliente"]["fields"]
+    assert {name: field["type"] for name, field in cliente.items()} == {
+        "id": "UUID",
+        "nombre": "str",
+        "calle": "str",
+        "num_ext": "int",
+        "num_int": "int",
+        "colonia": "str",
+        "municipio": "str",
+        "codigo_postal": "str",
+        "estado": "str",
+        "telefono": "str",
+        "nit": "str",
+        "contacto": "str",
+    }
+    venta = MODEL_REGISTRY["venta"]["fields"]
+    assert venta["fecha"]["type"] == "date"
+    assert venta["monto"]["type"] == "float"
+
+
+def test_required_fields_and_defaults():
+    insumo = MODEL_REGISTRY["insumo"]["fields"]
+    assert insumo["descripcion"]["required"]
+    assert "default" not in insumo["descripcion"]
+    assert not insumo["presentacion"]["required"]
+    assert insumo["presentacion"]["default"] is None
+    # A default_factory is not a default the tools can show
+    assert not insumo["id"]["required"]
+    assert "default" not in insumo["id"]
+
+
+def test_foreign_keys_name_their_target():
+    detalle = MODEL_REGISTRY["detalle_venta"]["fields"]
+    assert detalle["venta_id"]["foreign_key"] == "venta.id"
+    assert detalle["venta_id"]["references"] == "venta"
+    assert detalle["insumo_id"]["references"] == "insumo"
+    ganadores = MODEL_REGISTRY["concurso_ganadores"]["fields"]
+    assert ganadores["concurso_id"]["references"] == "concurso"
+    assert "foreign_key" not in detalle["cantidad"]
+
+
+def test_relationships_are_listed():
+    assert set(MODEL_REGISTRY["venta"]["relationships"]) == {
+        "empleado",
+        "cliente",
+        "detalles",
+    }
+
+
+def test_every_coercer_is_used_by_a_column():
+    used = {
+        field["type"]
+        for model_info in MODEL_REGISTRY.values()
+        for field in model_info["fields"].values()
+    }
+    assert set(COERCERS) == used
+
+
+@pytest.mark.parametrize(
+    "model_name, field, value, expected",
+    [
+        ("venta", "id", "6a0e3f4c-5d2b-4b8e-9a39-2f1d2c3b4a59", UUID),
+        ("venta", "fecha", "2025-01-31", date),
+        ("cliente", "num_ext", "12", int),
+        ("venta", "monto", "10.5", float),
+        ("cliente", "codigo_postal", "01234", str),
+    ],
+)
+def test_coerce_converts_text_to_the_field_type(model_name, field, value, expected):
+    coerced = MODEL_REGISTRY[model_name]["fields"][field]["coerce"](value)
+    assert isinstance(coerced, expected)
+    if expected is str:
+        # Postal codes keep their leading zeros
+        assert coerced == value
+
+
+@pytest.mark.parametrize("value, expected", [(44100, "44100"), (None, None)])
+def test_text_fields_coerce_numbers_to_text(value, expected):
+    codigo_postal = MODEL_REGISTRY["cliente"]["fields"]["codigo_postal"]
+    assert codigo_postal["coerce"](value) == expected
+
+
+def test_coerce_keeps_values_already_typed():
+    venta = MODEL_REGISTRY["venta"]["fields"]
+    venta_id = uuid4()
+    assert venta["id"]["coerce"](venta_id) is venta_id
+    assert venta["fecha"]["coerce"](None) is None
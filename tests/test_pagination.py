@@ -0,0 +1,63 @@
+import base64
+import json
+from uuid import uuid4
+
+import pytest
+
+from project.database.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    page_size,
+)
+
+
+def test_cursor_round_trip():
+    last_id = uuid4()
+    assert decode_cursor(encode_cursor(last_id)) == last_id
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(uuid4())
+    assert cursor == base64.urlsafe_b64encode(base64.urlsafe_b64decode(cursor)).decode()
+    assert not set(cursor) & set("+/")
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_missing_cursor_is_the_first_page(cursor):
+    assert decode_cursor(cursor) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        base64.urlsafe_b64encode(b"[1, 2]").decode(),
+        base64.urlsafe_b64encode(json.dumps({"before": "x"}).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps({"after": "not-a-uuid"}).encode()).decode(),
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "limit, expected",
+    [
+        (None, DEFAULT_PAGE_SIZE),
+        (10, 10),
+        ("25", 25),
+        (0, 1),
+        (-5, 1),
+        (MAX_PAGE_SIZE + 1, MAX_PAGE_SIZE),
+    ],
+)
+def test_page_size(limit, expected):
+    assert page_size(limit) == expected
+
+
+def test_page_size_rejects_non_integers():
+    with pytest.raises(ValueError):
+        page_size("ten")
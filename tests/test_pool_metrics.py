@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from project.core.tool_metrics import MetricsRegistry
+from project.database import config
+from project.database.config import asyncpg_url
+from project.database.pool_metrics import (
+    PoolMetrics,
+    register_pool_metrics,
+    timed_pool_class,
+)
+
+
+def _pool(metrics):
+    pool_class = timed_pool_class(QueuePool, metrics)
+    return pool_class(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        pool_size=1,
+        max_overflow=0,
+        timeout=5,
+    )
+
+
+def test_checkouts_that_do_not_block_record_no_wait():
+    metrics = PoolMetrics()
+    pool = _pool(metrics)
+
+    for _ in range(3):
+        pool.connect().close()
+
+    assert metrics.wait_seconds_total == 0.0
+    assert metrics.wait_seconds_max == 0.0
+
+
+def test_a_checkout_waiting_for_a_free_connection_records_the_wait():
+    metrics = PoolMetrics()
+    pool = _pool(metrics)
+    held = pool.connect()
+    waited = []
+
+    def checkout():
+        pool.connect().close()
+        waited.append(True)
+
+    thread = threading.Thread(target=checkout)
+    thread.start()
+    time.sleep(0.1)
+    assert not waited
+    held.close()
+    thread.join(5)
+
+    assert waited
+    assert 0.1 <= metrics.wait_seconds_max == metrics.wait_seconds_total < 5
+
+
+def test_snapshot_and_prometheus_output():
+    metrics = PoolMetrics()
+    pool = _pool(metrics)
+    metrics.record_wait(0.25)
+
+    stats = metrics.snapshot(pool)
+    assert stats["wait_seconds_max"] == 0.25
+    assert stats["size"] == 1
+
+    engines = {"engine": stats}
+    registry = MetricsRegistry()
+    register_pool_metrics(registry, lambda: engines)
+    text = registry.render()
+    assert "# TYPE db_pool_wait_seconds_total counter" in text
+    assert 'db_pool_wait_seconds_max{engine="engine"} 0.25' in text
+    assert 'db_pool_size{engine="engine"} 1' in text
+
+    # Read on each render, and with no series before an engine is built
+    engines.clear()
+    assert "db_pool_size{" not in registry.render()
+
+
+def test_pool_stats_are_exported_with_the_tool_metrics(monkeypatch):
+    stats = {"async_engine": {"checkouts": 7}}
+    monkeypatch.setattr(config, "pool_stats", lambda: stats)
+
+    assert (
+        'db_pool_checkouts_total{engine="async_engine"} 7'
+        in config.tool_metrics.render_prometheus()
+    )
+
+
+def test_asyncpg_url_translates_the_libpq_arguments():
+    url, connect_args = asyncpg_url(
+        make_url(
+            "postgresql://user:secret@db:5432/flux?sslmode=require"
+            "&application_name=agents&connect_timeout=10"
+            "&options=-c%20search_path%3Dflux%20-c%20work_mem%3D64MB"
+            "&keepalives=1&target_session_attrs=read-write"
+        )
+    )
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.database == "flux" and url.password == "secret"
+    assert dict(url.query) == {"ssl": "require", "target_session_attrs": "read-write"}
+    assert connect_args == {
+        "timeout": 10.0,
+        "server_settings": {
+            "application_name": "agents",
+            "search_path": "flux",
+            "work_mem": "64MB",
+        },
+    }
+
+
+def test_asyncpg_url_without_arguments():
+    url, connect_args = asyncpg_url(make_url("postgresql://user@db/flux"))
+    assert url.render_as_string() == "postgresql+asyncpg://user@db/flux"
+    assert connect_args == {}
@@ -0,0 +1,57 @@
+from uuid import uuid4
+
+import pytest
+
+from project.database.query_builder import MODEL_META, prepare_conditions
+
+VENTA = MODEL_META["venta"]
+INSUMO = MODEL_META["insumo"]
+
+
+@pytest.mark.parametrize(
+    "operator, pattern",
+    [("like", "%jabon%"), ("starts_with", "jabon%"), ("ends_with", "%jabon")],
+)
+def test_pattern_operators_normalize_the_text(operator, pattern):
+    shape, params = prepare_conditions(
+        INSUMO, [{"field": "descripcion", "operator": operator, "value": "Jabón"}]
+    )
+    assert shape == (("descripcion", operator),)
+    assert params == {"c0": pattern}
+
+
+def test_pattern_operators_on_numbers_match_their_text():
+    _, params = prepare_conditions(
+        INSUMO, [{"field": "precio", "operator": "starts_with", "value": 1.5}]
+    )
+    assert params == {"c0": "1.5%"}
+
+
+def test_values_are_coerced_and_named_by_position():
+    empleado_id = uuid4()
+    shape, params = prepare_conditions(
+        VENTA,
+        [
+            {"field": "empleado_id", "operator": "eq", "value": str(empleado_id)},
+            {"field": "monto", "operator": "gte", "value": "100"},
+        ],
+        prefix="p",
+    )
+    assert shape == (("empleado_id", "eq"), ("monto", "gte"))
+    assert params == {"p0": empleado_id, "p1": 100.0}
+
+
+@pytest.mark.parametrize(
+    "condition, message",
+    [
+        ({"field": "color", "operator": "eq", "value": 1}, "Invalid field 'color'"),
+        ({"field": "monto", "operator": "in", "value": 1}, "Invalid operator 'in'"),
+        (
+            {"field": "monto", "operator": "gt", "value": "mucho"},
+            "Invalid value for field 'monto'",
+        ),
+    ],
+)
+def test_invalid_conditions(condition, message):
+    with pytest.raises(ValueError, match=message):
+        prepare_conditions(VENTA, [condition])
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import Column
+from sqlalchemy.sql import visitors
+
+from project.core.agents_tools.database_tools import _related_query
+
+# cliente -> venta -> empleado -> venta: 'venta' is at steps 1 and 3
+PATH = ["ventas", "empleado", "ventas"]
+
+
+def _filtered_aliases(query):
+    """The aliases of the models the WHERE clause filters on."""
+    return {
+        element.table
+        for element in visitors.iterate(query.whereclause)
+        if isinstance(element, Column)
+    }
+
+
+def _step_alias(query, step):
+    """The alias of a step, from the id columns the query is ordered by."""
+    return query._order_by_clauses[step].table
+
+
+def test_labels_suffix_the_repeated_models():
+    query, params = _related_query("cliente", PATH, [])
+    labels = [column.key for column in query.selected_columns]
+    assert "venta.monto" in labels
+    assert "venta_2.monto" in labels
+    assert "empleado.nombre" in labels
+    assert params == {}
+
+
+def test_condition_on_a_repeated_model_needs_a_step():
+    condition = {"model": "venta", "field": "monto", "operator": "gt", "value": 10}
+    with pytest.raises(ValueError, match=r"more than once in the path \(steps 1, 3\)"):
+        _related_query("cliente", PATH, [condition])
+
+
+@pytest.mark.parametrize("step", [1, 3])
+def test_step_chooses_the_occurrence_of_the_model(step):
+    condition = {"step": step, "field": "monto", "operator": "gt", "value": 10}
+    query, params = _related_query("cliente", PATH, [condition])
+
+    assert _filtered_aliases(query) == {_step_alias(query, step)}
+    assert params == {"c0_0": 10.0}
+
+
+def test_step_and_model_must_agree():
+    condition = {"step": 2, "model": "venta", "field": "monto", "operator": "gt"}
+    with pytest.raises(ValueError, match="Step 2 of the path is 'empleado'"):
+        _related_query("cliente", PATH, [condition])
+
+
+@pytest.mark.parametrize("step", [-1, 4, "1", True])
+def test_step_must_be_a_position_in_the_path(step):
+    condition = {"step": step, "field": "monto", "operator": "gt", "value": 1}
+    with pytest.raises(ValueError, match="'step' must be a position in the path"):
+        _related_query("cliente", PATH, [condition])
+
+
+def test_conditions_without_model_apply_to_the_start():
+    condition = {"field": "nombre", "operator": "eq", "value": "Ana"}
+    query, _ = _related_query("cliente", PATH, [condition])
+    assert _filtered_aliases(query) == {_step_alias(query, 0)}
+
+
+def test_model_appearing_once_is_found_by_name():
+    condition = {"model": "empleado", "field": "tipo", "operator": "eq", "value": "x"}
+    query, _ = _related_query("cliente", PATH, [condition])
+    assert _filtered_aliases(query) == {_step_alias(query, 2)}
+
+
+def test_unknown_relationship_is_rejected():
+    with pytest.raises(ValueError, match="'cliente' has no relationship 'insumos'"):
+        _related_query("cliente", ["insumos"], [])
+
+
+def test_model_outside_the_path_is_rejected():
+    condition = {"model": "insumo", "field": "linea", "operator": "eq", "value": "x"}
+    with pytest.raises(ValueError, match="'insumo' is not part of the path"):
+        _related_query("cliente", PATH, [condition])
+
+
+def test_steps_are_distinct_aliases():
+    query, _ = _related_query("cliente", PATH, [])
+    aliases = [_step_alias(query, step) for step in range(4)]
+    assert len(set(aliases)) == 4
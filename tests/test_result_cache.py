@@ -0,0 +1,132 @@
+import pytest
+
+from project.core.tool_metrics import MetricsRegistry, tool_metrics
+from project.database import result_cache as result_cache_module
+from project.database.result_cache import MISSING, ResultCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the monotonic clock of the cache with one the test advances."""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_cache_key_ignores_the_order_of_criteria():
+    assert make_cache_key("venta", {"a": 1, "b": 2}) == make_cache_key(
+        "venta", {"b": 2, "a": 1}
+    )
+
+
+def test_hit_and_miss_are_counted():
+    cache = ResultCache(maxsize=10, ttl=60)
+    assert cache.get("key") is MISSING
+    cache.set("key", ["venta"], None)
+    assert cache.get("key") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+
+
+def test_a_write_drops_the_results_that_read_the_table():
+    cache = ResultCache(maxsize=10, ttl=60)
+    cache.set("ventas", ["venta", "cliente"], 1)
+    cache.set("insumos", ["insumo"], 2)
+
+    cache.invalidate("cliente")
+
+    assert cache.get("ventas") is MISSING
+    assert cache.get("insumos") == 2
+
+
+def test_invalidate_without_a_table_drops_everything():
+    cache = ResultCache(maxsize=10, ttl=60)
+    cache.set("ventas", ["venta"], 1)
+    generation = cache.generation(["insumo"])
+
+    cache.invalidate()
+
+    assert cache.get("ventas") is MISSING
+    assert generation != cache.generation(["insumo"])
+
+
+def test_a_write_bumps_only_the_generation_of_its_table():
+    cache = ResultCache(maxsize=10, ttl=60)
+    venta, insumo = cache.generation(["venta"]), cache.generation(["insumo"])
+
+    cache.invalidate("venta")
+
+    assert cache.generation(["venta"]) != venta
+    assert cache.generation(["insumo"]) == insumo
+
+
+def test_a_result_read_before_a_write_is_not_stored():
+    cache = ResultCache(maxsize=10, ttl=60)
+    generation = cache.generation(["venta"])
+    # A write commits while the query runs
+    cache.invalidate("venta")
+
+    cache.set("ventas", ["venta"], "old data", generation)
+
+    assert cache.get("ventas") is MISSING
+
+
+def test_a_result_with_a_current_generation_is_stored():
+    cache = ResultCache(maxsize=10, ttl=60)
+    generation = cache.generation(["venta", "cliente"])
+    cache.invalidate("insumo")
+
+    cache.set("ventas", ["cliente", "venta"], "data", generation)
+
+    assert cache.get("ventas") == "data"
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResultCache(maxsize=10, ttl=30)
+    cache.set("ventas", ["venta"], 1)
+
+    clock[0] += 30
+    assert cache.get("ventas") == 1
+    clock[0] += 0.001
+    assert cache.get("ventas") is MISSING
+    assert cache.stats()["size"] == 0
+
+
+def test_the_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.set("a", ["venta"], 1)
+    cache.set("b", ["venta"], 2)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+
+    cache.set("c", ["venta"], 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_a_zero_maxsize_disables_the_cache():
+    cache = ResultCache(maxsize=0, ttl=60)
+    cache.set("a", ["venta"], 1)
+    assert cache.get("a") is MISSING
+
+
+def test_stats_are_rendered_for_prometheus():
+    cache = ResultCache(maxsize=10, ttl=60)
+    cache.set("a", ["venta"], 1)
+    cache.get("a")
+    cache.get("b")
+
+    registry = MetricsRegistry()
+    cache.register_metrics(registry)
+    lines = registry.render().splitlines()
+
+    assert "result_cache_hits_total 1" in lines
+    assert "result_cache_misses_total 1" in lines
+    assert "result_cache_entries 1" in lines
+
+
+def test_cache_stats_are_exported_with_the_tool_metrics():
+    hits = result_cache_module.result_cache.hits
+
+    assert f"result_cache_hits_total {hits}" in tool_metrics.render_prometheus()
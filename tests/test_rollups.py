@@ -0,0 +1,185 @@
+import asyncio
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from project.database.rollups import (
+    REFRESH_CHUNK_KEYS,
+    ROLLUPS,
+    changed_rows_table,
+    ensure_rollups_fresh,
+    rollup_state,
+)
+
+EMPLEADO = ROLLUPS["empleado"]
+INSUMO = ROLLUPS["insumo"]
+
+
+def sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect())).replace("\n", "")
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Records the statements, answering each with the next queued rows."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def exec(self, statement):
+        self.statements.append(statement)
+        return Result(self.results.pop(0) if self.results else [])
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_upsert_overwrites_the_measures_of_existing_keys():
+    statement = sql(EMPLEADO._upsert())
+    assert statement.startswith(
+        "INSERT INTO rollup_ventas_empleado_dia (empleado_id, fecha, ventas, monto)"
+        " SELECT venta.empleado_id, venta.fecha, count(*)"
+    )
+    assert "GROUP BY venta.empleado_id, venta.fecha" in statement
+    assert (
+        "ON CONFLICT (empleado_id, fecha) DO UPDATE SET"
+        " ventas = excluded.ventas, monto = excluded.monto"
+    ) in statement
+
+
+def test_delete_vanished_keeps_the_keys_with_base_rows():
+    statement = sql(EMPLEADO._delete_vanished())
+    assert statement.startswith("DELETE FROM rollup_ventas_empleado_dia WHERE NOT")
+    assert (
+        "venta.empleado_id = rollup_ventas_empleado_dia.empleado_id"
+        " AND venta.fecha = rollup_ventas_empleado_dia.fecha"
+    ) in statement
+
+
+def test_changed_rows_table_has_the_tracked_columns_only():
+    changed = changed_rows_table("venta", [EMPLEADO, INSUMO])
+    assert [column.name for column in changed.columns] == [
+        "empleado_id",
+        "fecha",
+        "id",
+        "monto",
+    ]
+    statement = sql(CreateTable(changed))
+    assert statement.startswith("CREATE TEMPORARY TABLE rollup_changed_venta")
+    assert statement.endswith("ON COMMIT DROP")
+
+
+def test_keys_over_reads_the_changed_rows_in_place_of_the_table():
+    changed = changed_rows_table("venta", [INSUMO])
+    statement = sql(INSUMO._keys_over(INSUMO.sources["venta"].table, changed))
+    assert statement == (
+        "SELECT DISTINCT detalleventa.insumo_id, rollup_changed_venta.fecha "
+        "FROM detalleventa JOIN rollup_changed_venta"
+        " ON detalleventa.venta_id = rollup_changed_venta.id"
+    )
+
+
+def test_lock_keys_locks_each_key_in_key_order():
+    changed = changed_rows_table("venta", [EMPLEADO])
+    statement = sql(
+        EMPLEADO.lock_keys(
+            EMPLEADO._keys_over(EMPLEADO.sources["venta"].table, changed)
+        )
+    )
+    assert "count(pg_advisory_xact_lock(hashtext(" in statement
+    assert "concat_ws(" in statement
+    assert (
+        "ORDER BY rollup_changed_venta.empleado_id, rollup_changed_venta.fecha"
+        in statement
+    )
+
+
+def test_refresh_locks_each_chunk_of_keys_before_recomputing_it():
+    keys = [(uuid4(), date(2025, 1, 1)) for _ in range(REFRESH_CHUNK_KEYS + 1)]
+    session = FakeSession()
+
+    asyncio.run(EMPLEADO.refresh(session, keys))
+
+    statements = [sql(statement) for statement in session.statements]
+    assert len(statements) == 6
+    for lock, delete, upsert in zip(*[iter(statements)] * 3):
+        assert "pg_advisory_xact_lock" in lock
+        assert delete.startswith("DELETE FROM rollup_ventas_empleado_dia")
+        assert upsert.startswith("INSERT INTO rollup_ventas_empleado_dia")
+    # Chunks of the sorted keys, so every writer locks in the same order
+    first = session.statements[0].compile().params
+    assert sorted(keys)[0][0] in first.values()
+
+
+def test_refresh_changed_locks_before_recomputing():
+    changed = changed_rows_table("venta", [EMPLEADO])
+    session = FakeSession()
+
+    asyncio.run(EMPLEADO.refresh_changed(session, "venta", changed))
+
+    lock, delete, upsert = [sql(statement) for statement in session.statements]
+    assert "pg_advisory_xact_lock" in lock
+    assert delete.startswith("DELETE FROM rollup_ventas_empleado_dia")
+    assert upsert.startswith("INSERT INTO rollup_ventas_empleado_dia")
+
+
+def test_affected_keys_chunks_the_ids_and_dedupes_the_keys():
+    key = (uuid4(), date(2025, 1, 1))
+    ids = [uuid4() for _ in range(REFRESH_CHUNK_KEYS + 1)]
+    session = FakeSession([key], [key])
+
+    keys = asyncio.run(INSUMO.affected_keys(session, "detalle_venta", ids))
+
+    assert keys == [key]
+    assert len(session.statements) == 2
+    assert "WHERE detalleventa.id IN" in sql(session.statements[0])
+
+
+def test_fresh_rollups_are_not_rebuilt():
+    session = FakeSession([(name, False) for name in ROLLUPS])
+
+    assert asyncio.run(ensure_rollups_fresh(session)) == []
+    assert len(session.statements) == 1
+    assert session.commits == 0
+
+
+def test_stale_rollups_are_rebuilt_under_the_exclusive_lock():
+    states = [("empleado", False), ("cliente", True)]
+    session = FakeSession(states, [], states)
+
+    rebuilt = asyncio.run(ensure_rollups_fresh(session))
+
+    # A rollup without a state row has never been built
+    assert rebuilt == ["cliente", "insumo"]
+    statements = [sql(statement) for statement in session.statements]
+    assert "pg_advisory_xact_lock(" in statements[1]
+    assert statements[3].startswith("DELETE FROM rollup_ventas_cliente_dia")
+    assert statements[4].startswith("INSERT INTO rollup_ventas_cliente_dia")
+    assert statements[5].startswith("DELETE FROM rollup_insumo_dia")
+    assert statements[6].startswith("INSERT INTO rollup_insumo_dia")
+    assert statements[7].startswith(f"INSERT INTO {rollup_state.name}")
+    assert session.statements[7].compile().params == {
+        "name_m0": "cliente",
+        "stale_m0": False,
+        "name_m1": "insumo",
+        "stale_m1": False,
+    }
+    assert session.commits == 1
+
+
+def test_a_rebuild_done_while_waiting_is_not_repeated():
+    session = FakeSession([], [], [(name, False) for name in ROLLUPS])
+
+    assert asyncio.run(ensure_rollups_fresh(session)) == []
+    assert session.commits == 1
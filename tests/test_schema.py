@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+from agents.tool_context import ToolContext
+
+from project.core.agents_tools.database_tools import database_tables_info
+from project.database.model_registry import MODEL_REGISTRY
+from project.database.schema import encode_schema, table_names, table_schemas
+
+
+def test_schema_describes_fields_foreign_keys_and_relationships():
+    venta = table_schemas()["venta"]
+    assert venta["fields"] == {
+        "id": "UUID?",
+        "fecha": "date",
+        "cliente_id": "UUID",
+        "monto": "float",
+        "empleado_id": "UUID",
+    }
+    assert venta["fk"] == {"cliente_id": "cliente", "empleado_id": "empleado"}
+    assert venta["rel"] == {
+        "empleado": "empleado",
+        "cliente": "cliente",
+        "detalles": "detalle_venta[]",
+    }
+    # Tables without foreign keys leave "fk" out
+    assert "fk" not in table_schemas()["insumo"]
+
+
+def test_whole_schema_is_compact_json():
+    encoded = encode_schema()
+    assert json.loads(encoded) == table_schemas()
+    assert ", " not in encoded and ": " not in encoded
+
+
+def test_requested_tables_keep_their_order_without_repeats():
+    encoded = encode_schema(["Venta", "cliente", "venta"])
+    assert list(json.loads(encoded)) == ["venta", "cliente"]
+    assert encoded.count('"venta":') == 1
+
+
+def test_row_counts_are_spliced_into_the_encoded_tables():
+    schema = json.loads(encode_schema(["venta", "insumo"], {"venta": 120}))
+
+    assert schema["venta"] == {**table_schemas()["venta"], "rows": 120}
+    # A table without a count has no rows
+    assert schema["insumo"]["rows"] == 0
+
+
+def test_row_counts_of_every_table():
+    counts = {name: index for index, name in enumerate(MODEL_REGISTRY)}
+    schema = json.loads(encode_schema(row_counts=counts))
+    assert {name: table["rows"] for name, table in schema.items()} == counts
+
+
+@pytest.mark.parametrize("tables", [["ventas"], [None], [3]])
+def test_unknown_tables_are_rejected(tables):
+    with pytest.raises(ValueError, match="Model not found"):
+        table_names(tables)
+    with pytest.raises(ValueError, match="Model not found"):
+        encode_schema(tables)
+
+
+def test_no_tables_means_every_table():
+    assert table_names() == list(MODEL_REGISTRY)
+    assert table_names([]) == list(MODEL_REGISTRY)
+
+
+def test_tables_info_reports_invalid_tables_before_counting_rows():
+    context = ToolContext(
+        context=None,
+        tool_name="database_tables_info",
+        tool_call_id="1",
+        tool_arguments="{}",
+    )
+    output = asyncio.run(
+        database_tables_info.on_invoke_tool(
+            context,
+            json.dumps({"tables": ["Venta", "ventas"], "include_row_counts": True}),
+        )
+    )
+    assert output.startswith("Error: Model not found: ventas.")
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from project.database.query_builder import (
+    MODEL_META,
+    StatementCache,
+    filtered_statement,
+    page_statement,
+    prepare_conditions,
+)
+
+INSUMO = MODEL_META["insumo"]
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_same_shape_for_different_values():
+    conditions = [{"field": "descripcion", "operator": "eq", "value": "a"}]
+    other = [{"field": "descripcion", "operator": "eq", "value": "b"}]
+    assert (
+        prepare_conditions(INSUMO, conditions)[0]
+        == (prepare_conditions(INSUMO, other)[0])
+    )
+
+
+@pytest.mark.parametrize(
+    "operator, expected", [("eq", "is_null"), ("neq", "is_not_null")]
+)
+def test_null_comparisons_change_the_shape(operator, expected):
+    shape, params = prepare_conditions(
+        INSUMO, [{"field": "presentacion", "operator": operator, "value": None}]
+    )
+    assert shape == (("presentacion", expected),)
+    assert params == {}
+
+
+def test_null_comparisons_get_their_own_statement():
+    null_shape, _ = prepare_conditions(
+        INSUMO, [{"field": "presentacion", "operator": "eq", "value": None}]
+    )
+    value_shape, _ = prepare_conditions(
+        INSUMO, [{"field": "presentacion", "operator": "eq", "value": "caja"}]
+    )
+
+    null_statement = filtered_statement(INSUMO, null_shape)
+    assert null_statement is not filtered_statement(INSUMO, value_shape)
+    assert "insumo.presentacion IS NULL" in _sql(null_statement)
+
+
+def test_statements_are_built_once_per_shape():
+    cache = StatementCache()
+    built = []
+
+    def build():
+        built.append(True)
+        return object()
+
+    first = cache.get_or_build(("filtered", "insumo", ()), build)
+    assert cache.get_or_build(("filtered", "insumo", ()), build) is first
+    assert len(built) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_statements_are_dropped():
+    cache = StatementCache(maxsize=2)
+    first = cache.get_or_build("a", object)
+    cache.get_or_build("b", object)
+    # 'a' is used again, so 'b' is the least recently used
+    cache.get_or_build("a", object)
+    cache.get_or_build("c", object)
+
+    assert cache.get_or_build("a", object) is first
+    misses = cache.misses
+    cache.get_or_build("b", object)
+    assert cache.misses == misses + 1
+
+
+def test_pages_after_a_cursor_are_cached_apart():
+    shape, _ = prepare_conditions(
+        INSUMO, [{"field": "linea", "operator": "eq", "value": "bebidas"}]
+    )
+    fields = ("descripcion",)
+
+    first_page = page_statement(INSUMO, shape, False, fields)
+    next_page = page_statement(INSUMO, shape, True, fields)
+
+    assert page_statement(INSUMO, shape, False, fields) is first_page
+    assert next_page is not first_page
+    assert "insumo.id > %(after)s" in _sql(next_page)
+    assert "%(after)s" not in _sql(first_page)
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from project.core.json_codec import encode_json
+from project.core.tool_metrics import BYTES_PER_TOKEN
+from project.database.events import notify_table_write
+from project.database.exporter import DEFAULT_MAX_BYTES
+from project.database.model_registry import MODEL_REGISTRY
+from project.database.pagination import Explain
+from project.database.token_stats import TokenEstimator, token_estimator
+
+
+class Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def all(self):
+        return self.value
+
+
+class FakeSession:
+    """
+    Answers the EXPLAIN of a table with its planner row count and the sample
+    query with its rows, from 'tables' (table name -> (row count, rows)).
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.statements = []
+
+    async def exec(self, statement, params=None):
+        self.statements.append(statement)
+        query = statement.statement if isinstance(statement, Explain) else statement
+        [table] = query.get_final_froms()
+        row_count, rows = self.tables.get(table.name, (0, []))
+        if isinstance(statement, Explain):
+            return Result([{"Plan": {"Plan Rows": row_count}}])
+        return Result(rows[: query._limit])
+
+
+def _insumo_rows(count):
+    fields = list(MODEL_REGISTRY["insumo"]["fields"])
+    return [
+        tuple(f"{field}-{index}" for field in fields) for index in range(count)
+    ], fields
+
+
+def _row_bytes(fields, row):
+    return len(encode_json({"_table": "insumo", **dict(zip(fields, row))}).encode()) + 1
+
+
+def test_table_stats_average_the_encoded_sample():
+    rows, fields = _insumo_rows(3)
+    session = FakeSession({"insumo": (1000, rows)})
+
+    row_count, avg_row_bytes = asyncio.run(
+        TokenEstimator().table_stats(session, "insumo")
+    )
+
+    assert row_count == 1000
+    assert avg_row_bytes == sum(_row_bytes(fields, row) for row in rows) / 3
+
+
+def test_sample_is_limited():
+    rows, _ = _insumo_rows(10)
+    session = FakeSession({"insumo": (10, rows)})
+
+    asyncio.run(TokenEstimator(sample_size=4).table_stats(session, "insumo"))
+
+    assert session.statements[1]._limit == 4
+
+
+def test_empty_tables_have_no_row_size():
+    session = FakeSession({})
+    assert asyncio.run(TokenEstimator().table_stats(session, "venta")) == (0, 0.0)
+
+
+def test_estimate_multiplies_rows_by_row_size():
+    rows, fields = _insumo_rows(2)
+    session = FakeSession({"insumo": (300, rows)})
+
+    estimate = asyncio.run(TokenEstimator().estimate(session))
+
+    table_bytes = 300 * sum(_row_bytes(fields, row) for row in rows) / 2
+    assert estimate["tables"]["insumo"] == {
+        "rows": 300,
+        "tokens": round(table_bytes / BYTES_PER_TOKEN),
+    }
+    assert estimate["tables"]["venta"] == {"rows": 0, "tokens": 0}
+    assert estimate["tokens"] == round(table_bytes / BYTES_PER_TOKEN)
+    assert estimate["budget_tokens"] == round(DEFAULT_MAX_BYTES / BYTES_PER_TOKEN)
+    assert estimate["exceeds_budget"] is (table_bytes > DEFAULT_MAX_BYTES)
+    assert set(estimate["tables"]) == set(MODEL_REGISTRY)
+
+
+def test_estimate_reports_the_uncapped_tokens_over_budget():
+    rows, _ = _insumo_rows(2)
+    session = FakeSession({"insumo": (10_000_000, rows)})
+
+    estimate = asyncio.run(TokenEstimator().estimate(session))
+
+    assert estimate["exceeds_budget"]
+    assert estimate["tokens"] > estimate["budget_tokens"]
+
+
+def test_stats_are_cached_per_table():
+    rows, _ = _insumo_rows(2)
+    session = FakeSession({"insumo": (10, rows)})
+    estimator = TokenEstimator()
+
+    first = asyncio.run(estimator.table_stats(session, "insumo"))
+    session.tables["insumo"] = (20, rows)
+
+    assert asyncio.run(estimator.table_stats(session, "insumo")) == first
+    assert len(session.statements) == 2
+
+
+@pytest.fixture
+def shared_estimator():
+    token_estimator.invalidate()
+    yield token_estimator
+    token_estimator.invalidate()
+
+
+def test_a_write_drops_the_stats_of_its_table_only(shared_estimator):
+    rows, _ = _insumo_rows(2)
+    session = FakeSession({"insumo": (10, rows), "venta": (5, [])})
+    asyncio.run(shared_estimator.table_stats(session, "insumo"))
+    asyncio.run(shared_estimator.table_stats(session, "venta"))
+    session.tables["insumo"] = (20, rows)
+    session.tables["venta"] = (50, [])
+
+    notify_table_write("insumo", "insert", None)
+
+    assert asyncio.run(shared_estimator.table_stats(session, "insumo"))[0] == 20
+    assert asyncio.run(shared_estimator.table_stats(session, "venta"))[0] == 5
+
+
+def test_invalidate_without_a_table_drops_every_table():
+    session = FakeSession({"venta": (5, [])})
+    estimator = TokenEstimator()
+    asyncio.run(estimator.table_stats(session, "venta"))
+    session.tables["venta"] = (7, [])
+
+    estimator.invalidate()
+
+    assert asyncio.run(estimator.table_stats(session, "venta"))[0] == 7
@@ -0,0 +1,190 @@
+import asyncio
+import json
+from datetime import date
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from agents import function_tool
+from agents.tool_context import ToolContext
+from sqlalchemy import create_engine
+
+from project.core.json_codec import encode_json
+from project.core.tool_metrics import (
+    MetricsRegistry,
+    ToolCall,
+    ToolMetrics,
+    _current_call,
+    instrument,
+    tool_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    tool_metrics.reset()
+    yield
+    tool_metrics.reset()
+
+
+def _context(tool_name, agent=None, conversation=None):
+    context = ToolContext(
+        context=None, tool_name=tool_name, tool_call_id="1", tool_arguments="{}"
+    )
+    context.agent = SimpleNamespace(name=agent) if agent else None
+    context.run_config = (
+        SimpleNamespace(group_id=conversation) if conversation else None
+    )
+    return context
+
+
+def _call(tool, agent, conversation, **values):
+    call = ToolCall(tool, agent, conversation)
+    for name, value in values.items():
+        setattr(call, name, value)
+    return call
+
+
+def test_counters_render_one_line_per_series():
+    registry = MetricsRegistry()
+    registry.counter("calls_total", "Calls.", ("tool", "agent"))
+    registry.inc("calls_total", ("b", "x"))
+    registry.inc("calls_total", ("a", 'say "hi"'), 2)
+
+    assert registry.render() == (
+        "# HELP calls_total Calls.\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{tool="a",agent="say \\"hi\\""} 2\n'
+        'calls_total{tool="b",agent="x"} 1\n'
+    )
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = MetricsRegistry()
+    registry.histogram("seconds", "Wall time.", ("tool",), (0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        registry.observe("seconds", ("a",), value)
+
+    assert registry.render().splitlines()[2:] == [
+        'seconds_bucket{tool="a",le="0.1"} 1',
+        'seconds_bucket{tool="a",le="1.0"} 2',
+        'seconds_bucket{tool="a",le="+Inf"} 3',
+        'seconds_sum{tool="a"} 5.55',
+        'seconds_count{tool="a"} 3',
+    ]
+
+
+def test_totals_per_agent_and_per_conversation():
+    metrics = ToolMetrics()
+    metrics.record(_call("find", "Analyzer", "c1", rows_returned=3, seconds=0.5))
+    metrics.record(_call("insert", "Adder", "c1", rows_written=2))
+    metrics.record(_call("find", "Analyzer", "c2", rows_returned=1))
+
+    agents = metrics.agent_totals()
+    assert agents["Analyzer"]["calls"] == 2
+    assert agents["Analyzer"]["rows_returned"] == 4
+    assert agents["Adder"]["rows_written"] == 2
+
+    conversation = metrics.conversation_totals("c1")
+    assert conversation["totals"]["calls"] == 2
+    assert conversation["totals"]["seconds"] == 0.5
+    assert set(conversation["agents"]) == {"Analyzer", "Adder"}
+    assert conversation["tools"]["find"]["rows_returned"] == 3
+    assert metrics.conversation_totals("c3") is None
+
+
+def test_errors_are_counted_by_status():
+    @instrument
+    @function_tool
+    async def failing_tool() -> str:
+        """Reports an error."""
+        return "Error: no such table"
+
+    asyncio.run(
+        failing_tool.on_invoke_tool(_context("failing_tool", "Adder", "c1"), "{}")
+    )
+
+    assert tool_metrics.agent_totals()["Adder"]["errors"] == 1
+    assert tool_metrics.conversation_totals("c1")["totals"]["errors"] == 1
+    assert (
+        'agent_tool_calls_total{tool="failing_tool",agent="Adder",status="error"} 1'
+        in tool_metrics.render_prometheus()
+    )
+
+
+def test_tool_results_are_sent_as_json():
+    result = {"id": uuid4(), "fecha": date(2025, 1, 1), "monto": 1.5}
+
+    @instrument
+    @function_tool
+    async def find_venta() -> dict:
+        """Returns a venta."""
+        return result
+
+    output = asyncio.run(find_venta.on_invoke_tool(_context("find_venta"), "{}"))
+
+    assert output == encode_json(result)
+    assert json.loads(output)["fecha"] == "2025-01-01"
+    totals = tool_metrics.agent_totals()["unknown"]
+    assert totals["errors"] == 0
+    assert totals["result_bytes"] == len(output.encode())
+
+
+def _execute(engine, connection, rowcount, **kinds):
+    """Sends one statement through the engine's cursor events."""
+    context = SimpleNamespace(
+        isinsert=kinds.get("isinsert", False),
+        isupdate=kinds.get("isupdate", False),
+        isdelete=kinds.get("isdelete", False),
+    )
+    cursor = SimpleNamespace(rowcount=rowcount)
+    engine.dispatch.before_cursor_execute(
+        connection, cursor, "SELECT", {}, context, False
+    )
+    engine.dispatch.after_cursor_execute(
+        connection, cursor, "SELECT", {}, context, False
+    )
+
+
+def test_engine_statements_are_added_to_the_running_call():
+    metrics = ToolMetrics()
+    engine = create_engine("sqlite://")
+    metrics.attach(engine)
+    connection = SimpleNamespace(info={})
+    call = ToolCall("find", "Analyzer", "c1")
+
+    # Outside a tool call nothing is recorded
+    _execute(engine, connection, 5)
+    token = _current_call.set(call)
+    try:
+        _execute(engine, connection, 3)
+        _execute(engine, connection, 2, isinsert=True)
+    finally:
+        _current_call.reset(token)
+
+    assert call.statements == 2
+    assert call.rows_returned == 3
+    assert call.rows_written == 2
+    assert call.db_seconds > 0
+    assert connection.info["tool_query_started"] == []
+
+
+def test_callback_metrics_are_read_when_rendered():
+    registry = MetricsRegistry()
+    sizes = {("engine",): 5}
+    registry.callback("pool_size", "gauge", "Pool size.", ("engine",), lambda: sizes)
+    registry.callback("entries", "gauge", "Entries.", (), lambda: {(): 2})
+    registry.clear()
+    sizes[("async",)] = 3
+
+    assert registry.render() == (
+        "# HELP pool_size Pool size.\n"
+        "# TYPE pool_size gauge\n"
+        'pool_size{engine="async"} 3\n'
+        'pool_size{engine="engine"} 5\n'
+        "# HELP entries Entries.\n"
+        "# TYPE entries gauge\n"
+        "entries 2\n"
+    )
+    with pytest.raises(ValueError):
+        registry.callback("seconds", "histogram", "Seconds.", (), dict)
@@ -0,0 +1,85 @@
+import re
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import column
+from sqlalchemy.dialects import postgresql
+
+from project.utils.utils import (
+    normalize_text,
+    normalize_texts,
+    normalized_sql,
+    parse_date,
+)
+
+SAMPLES = ["Jabón", "ÑANDÚ", "Pingüino", "CAFÉ con Leche", "plain", "", "Ü-ü 12"]
+
+
+def _sql_translate(text, source, target):
+    """translate() as Postgres defines it: extra source characters are deleted."""
+    result = []
+    for character in text:
+        if character not in source:
+            result.append(character)
+        elif source.index(character) < len(target):
+            result.append(target[source.index(character)])
+    return "".join(result)
+
+
+def _compiled_tables():
+    sql = str(
+        normalized_sql(column("descripcion")).compile(dialect=postgresql.dialect())
+    )
+    match = re.fullmatch(r"translate\(lower\(descripcion\), '(.*)', '(.*)'\)", sql)
+    assert match, sql
+    return match.group(1), match.group(2)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_normalized_sql_matches_normalize_text(text):
+    source, target = _compiled_tables()
+    assert _sql_translate(text.lower(), source, target) == normalize_text(text)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_normalized_sql_does_not_need_a_unicode_lower(text):
+    # lower() only folds ASCII in some database locales
+    source, target = _compiled_tables()
+    ascii_lower = "".join(c.lower() if c.isascii() else c for c in text)
+    assert _sql_translate(ascii_lower, source, target) == normalize_text(text)
+
+
+def test_normalize_texts_matches_normalize_text():
+    values = [*SAMPLES, None, 42]
+    assert normalize_texts(values) == [
+        None if value is None else normalize_text(value) for value in values
+    ]
+
+
+def test_normalize_text_keeps_none():
+    assert normalize_text(None) is None
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025-01-02",
+        " 2025-01-02 ",
+        "2025-01-02T10:30:00",
+        "2025-01-02 10:30:00",
+        "02/01/2025",
+        "2/1/2025",
+        date(2025, 1, 2),
+        datetime(2025, 1, 2, 23, 59),
+    ],
+)
+def test_parse_date(value):
+    assert parse_date(value) == date(2025, 1, 2)
+
+
+@pytest.mark.parametrize(
+    "value", ["", "tomorrow", "2025-02-30", "31/02/2025", "01-02-2025", None]
+)
+def test_parse_date_rejects_invalid_dates(value):
+    with pytest.raises(ValueError, match="Invalid date"):
+        parse_date(value)
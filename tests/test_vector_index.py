@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from project.database.vector_index import HashingEmbedder, VectorTable
+
+
+@pytest.fixture(scope="module")
+def embedder():
+    return HashingEmbedder(dimension=256)
+
+
+def test_embeddings_are_normalized(embedder):
+    vectors = embedder(["galletas de chocolate", "refresco de cola"])
+    assert vectors.shape == (2, 256)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+
+def test_an_empty_text_embeds_to_zeros(embedder):
+    assert not embedder([""]).any()
+
+
+def test_embeddings_ignore_case_and_accents(embedder):
+    first, second = embedder(["Jabón de Tocador", "jabon de tocador"])
+    assert np.allclose(first, second)
+
+
+def test_shared_words_score_higher(embedder):
+    query, related, unrelated = embedder(
+        ["galletas de chocolate", "galleta chocolatada", "detergente en polvo"]
+    )
+    assert query @ related > query @ unrelated
+
+
+def _table(embedder, documents):
+    table = VectorTable(embedder.dimension)
+    ids = [f"id{position}" for position in range(len(documents))]
+    table.upsert(ids, documents, embedder(documents))
+    return table
+
+
+def test_search_returns_the_top_k_best_first(embedder):
+    documents = [
+        "detergente en polvo",
+        "galletas de chocolate",
+        "chocolate en polvo",
+        "refresco de cola",
+    ]
+    table = _table(embedder, documents)
+    query = embedder(["chocolate en polvo"])[0]
+
+    matches = table.search(query, 2)
+
+    assert [record_id for record_id, _ in matches] == ["id2", "id0"]
+    assert matches[0][1] == pytest.approx(1.0, abs=1e-3)
+    assert matches[0][1] >= matches[1][1]
+
+
+def test_search_with_a_limit_above_the_size(embedder):
+    table = _table(embedder, ["uno", "dos"])
+    assert len(table.search(embedder(["uno"])[0], 10)) == 2
+    assert VectorTable(embedder.dimension).search(embedder(["uno"])[0], 5) == []
+
+
+def test_upsert_replaces_and_remove_compacts(embedder):
+    table = _table(embedder, ["uno", "dos", "tres"])
+
+    table.upsert(["id1"], ["cuatro"], embedder(["cuatro"]))
+    table.remove({"id0"})
+
+    assert table.ids == ["id1", "id2"]
+    assert table.hashes == ["cuatro", "tres"]
+    assert table.positions == {"id1": 0, "id2": 1}
+    assert table.search(embedder(["cuatro"])[0], 1)[0][0] == "id1"
+
+
+def test_mark_stale_bumps_the_generation(embedder):
+    table = VectorTable(embedder.dimension)
+    table.stale = False
+
+    table.mark_stale()
+
+    assert table.stale
+    assert table.generation == 1
+    assert table.copy().generation == 1